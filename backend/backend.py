@@ -1,16 +1,22 @@
-from fastapi import FastAPI, WebSocket
+from fastapi import FastAPI, Request, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
 from pydantic import BaseModel
 from datetime import datetime
+from typing import List, Optional, Union
 from dotenv import load_dotenv
 # from db.mongo import recordings  # REMOVED: Old database import
-from scripts.gesture_control import handle_gesture
-from websocket_server import websocket_endpoint
+from scripts import gesture_control
+from scripts.gesture_control import note_scheduler
+from scripts.engine_control import send_engine_command
+from websocket_server import websocket_endpoint, manager
+from note_dispatch import note_dispatcher
+from scripts.synth_recorder import read_tags, sidecar_path, synth_recorder
+from recording_jobs import job_queue
+from recording_peaks import load_peaks, remove_peaks
+from http_range import range_file_response
 import subprocess
 import os
 import signal
-import uuid
 import threading
 import time
 
@@ -30,21 +36,35 @@ app.add_middleware(
 class Trigger(BaseModel):
     gesture: str
     instrument: str
+    intensity: float = 1.0
+
+class NoteEventIn(Trigger):
+    timestamp: Optional[float] = None  # Client clock in ms; spacing between events is preserved
+
+class TriggerBatch(BaseModel):
+    events: List[NoteEventIn]
 
 @app.post("/play")
-def play_sound(trigger: Trigger):
-    result = handle_gesture(trigger.gesture, trigger.instrument)
+async def play_sound(trigger: Union[TriggerBatch, Trigger]):
+    """Queue one gesture, or a batch of timestamped gestures, for the synth writer thread"""
+    if isinstance(trigger, TriggerBatch):
+        queued = note_dispatcher.submit_batch([event.model_dump() for event in trigger.events])
+        return {"status": "queued", "events": queued}
 
-    entry = {
-        "gesture": trigger.gesture,
-        "instrument": trigger.instrument,
-        "timestamp": datetime.utcnow().isoformat()
-    }
+    note_dispatcher.submit(trigger.gesture, trigger.instrument, trigger.intensity)
 
     # TODO: Connect to new database layer at http://127.0.0.1:8001
     # recordings.insert_one(entry)  # REMOVED: Old database operation
 
-    return {**entry, "status": "ok", "played": result}
+    return {"gesture": trigger.gesture, "instrument": trigger.instrument, "status": "queued"}
+
+@app.get("/play/stats")
+def play_stats():
+    """Note dispatch queue and note-off scheduler counters"""
+    return {
+        "dispatch": note_dispatcher.stats(),
+        "note_offs": note_scheduler.stats(),
+    }
 
 @app.get("/recordings")
 def get_recordings():
@@ -57,8 +77,6 @@ def get_recordings():
 
 # Store the process globally
 gesture_process = None
-recording_process = None
-current_recording_file = None
 
 @app.get("/start-webcam")
 def start_webcam():
@@ -130,6 +148,16 @@ def launch_instrument(instrument: str):
     if instrument not in valid_instruments:
         return {"status": "error", "message": f"Unknown instrument: {instrument}"}
     
+    # Hot-swap inside the running engine: no process restart, camera or SoundFont reload
+    reply = send_engine_command({"command": "switch", "instrument": instrument})
+    if reply and reply.get("status") == "ok":
+        return {
+            "status": "switched",
+            "instrument": instrument,
+            "switch_ms": reply["switch_ms"],
+            "message": f"{instrument.title()} selected in {reply['switch_ms']:.1f} ms."
+        }
+    
     # Stop current process if running with better cleanup
     if gesture_process and gesture_process.poll() is None:
         try:
@@ -184,45 +212,70 @@ def launch_instrument(instrument: str):
         "message": f"{instrument.title()} auto-selected! The Python window will start with {instrument} ready to play."
     }
 
+@app.get("/instrument-engine/stats")
+def instrument_engine_stats():
+    """Active instrument and switch latency from the running instrument engine"""
+    reply = send_engine_command({"command": "stats"})
+    if reply is None:
+        return {"status": "not running", "message": "No instrument engine running"}
+    return reply
+
 # WebSocket endpoint
 @app.websocket("/ws/gesture")
 async def gesture_websocket(websocket: WebSocket):
     await websocket_endpoint(websocket)
 
+@app.get("/ws/gesture/stats")
+def gesture_stats():
+    """Inference pool queue depth, per-stage latency and per-connection frame stats"""
+    return manager.stats()
+
+@app.on_event("shutdown")
+def shutdown_inference_pool():
+    manager.inference_pool.shutdown()
+    note_dispatcher.shutdown()
+    note_scheduler.stop()
+    job_queue.shutdown()
+    recording = synth_recorder.stop()
+    if recording is not None:
+        recording.wait(timeout=2)  # Let the writer finish the WAV header
+
 # Recording endpoints
 class RecordingStart(BaseModel):
     instrument: str
+    session: Optional[str] = None
 
 @app.post("/recording/start")
 def start_recording(data: RecordingStart):
-    global recording_process, current_recording_file
-    
-    # Stop any existing recording
-    if recording_process and recording_process.poll() is None:
-        recording_process.terminate()
-    
-    # Create recordings directory
-    os.makedirs("recordings", exist_ok=True)
+    """Record the synth output bus straight to disk (replaces any running take)"""
+    # The engine started by /start-webcam or /launch-instrument plays through its own synth,
+    # so it records itself; otherwise record this process's synth
+    reply = send_engine_command({"command": "record_start", "instrument": data.instrument,
+                                 "session": data.session})
+    if reply is not None:
+        if reply.get("status") != "ok":
+            return {"status": "error", "message": f"Failed to start recording: {reply.get('message')}"}
+        return {
+            "status": "started",
+            "source": "engine",
+            "filename": reply["filename"],
+            "filepath": reply["filepath"],
+            "instrument": reply["instrument"],
+            "session": reply["session"]
+        }
     
-    # Generate filename
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"recording_{data.instrument}_{timestamp}_{uuid.uuid4().hex[:8]}.wav"
-    filepath = os.path.join("recordings", filename)
-    current_recording_file = filepath
+    if not gesture_control.synths_initialized:
+        return {"status": "error", "message": "Audio engine not initialized"}
     
     try:
-        # Start recording using system audio recording
-        recording_process = subprocess.Popen([
-            "ffmpeg", "-f", "avfoundation", "-i", ":0", 
-            "-t", "300",  # Max 5 minutes
-            filepath
-        ])
-        
+        recording = synth_recorder.start(gesture_control.synth_engine, data.instrument, data.session)
         return {
             "status": "started",
-            "filename": filename,
-            "filepath": filepath,
-            "instrument": data.instrument
+            "source": "backend",
+            "filename": os.path.basename(recording.filepath),
+            "filepath": recording.filepath,
+            "instrument": data.instrument,
+            "session": recording.tags["session"]
         }
     except Exception as e:
         return {
@@ -232,16 +285,18 @@ def start_recording(data: RecordingStart):
 
 @app.post("/recording/stop")
 def stop_recording():
-    global recording_process, current_recording_file
+    reply = send_engine_command({"command": "record_stop"}, timeout=3.0)
+    recording = synth_recorder.stop()
     
-    if recording_process and recording_process.poll() is None:
-        recording_process.terminate()
-        recording_process.wait()  # Wait for process to finish
-        
+    if reply is not None and reply.get("status") == "ok":
+        return {"status": "stopped", "source": "engine", **{k: v for k, v in reply.items() if k != "status"}}
+    if recording is not None:
         return {
             "status": "stopped",
-            "filename": os.path.basename(current_recording_file) if current_recording_file else None,
-            "filepath": current_recording_file
+            "source": "backend",
+            "filename": os.path.basename(recording.filepath),
+            "filepath": recording.filepath,
+            **recording.stats()
         }
     else:
         return {
@@ -249,6 +304,14 @@ def stop_recording():
             "message": "No active recording found"
         }
 
+@app.get("/recording/stats")
+def recording_stats():
+    """Current (or last) take: seconds written, dropped blocks and writer CPU time"""
+    reply = send_engine_command({"command": "record_stats"})
+    if reply is not None and reply.get("status") == "ok" and "filename" in reply:
+        return {"source": "engine", **{k: v for k, v in reply.items() if k != "status"}}
+    return {"source": "backend", **synth_recorder.stats()}
+
 @app.get("/recording/list")
 def list_recordings():
     try:
@@ -265,7 +328,8 @@ def list_recordings():
                     "filename": filename,
                     "size": stat.st_size,
                     "created": datetime.fromtimestamp(stat.st_ctime).isoformat(),
-                    "modified": datetime.fromtimestamp(stat.st_mtime).isoformat()
+                    "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
+                    "tags": read_tags(filepath)
                 })
         
         # Sort by creation time (newest first)
@@ -280,13 +344,14 @@ def list_recordings():
         }
 
 @app.get("/recording/play/{filename}")
-def play_recording(filename: str):
-    """Serve recording file for playback"""
+def play_recording(filename: str, request: Request):
+    """Serve recording file for playback (supports Range requests for seeking)"""
     try:
         filepath = os.path.join("recordings", filename)
         if os.path.exists(filepath):
-            return FileResponse(
-                path=filepath,
+            return range_file_response(
+                filepath,
+                request.headers.get("range"),
                 media_type="audio/wav",
                 headers={"Content-Disposition": f"inline; filename={filename}"}
             )
@@ -295,6 +360,17 @@ def play_recording(filename: str):
     except Exception as e:
         return {"status": "error", "message": f"Failed to serve recording: {str(e)}"}
 
+@app.get("/recording/peaks/{filename}")
+def recording_peaks(filename: str, start: float = 0.0, end: Optional[float] = None, points: int = 2000):
+    """Min/max waveform peaks for start..end seconds (the whole take by default) at any zoom"""
+    try:
+        filepath = os.path.join("recordings", filename)
+        if not os.path.exists(filepath):
+            return {"status": "error", "message": "Recording not found"}
+        return load_peaks(filepath).query(start, end, max(1, min(points, 20000)))
+    except Exception as e:
+        return {"status": "error", "message": f"Failed to read peaks: {str(e)}"}
+
 @app.delete("/recording/delete/{filename}")
 def delete_recording(filename: str):
     """Delete a recording file"""
@@ -302,6 +378,9 @@ def delete_recording(filename: str):
         filepath = os.path.join("recordings", filename)
         if os.path.exists(filepath):
             os.remove(filepath)
+            if os.path.exists(sidecar_path(filepath)):
+                os.remove(sidecar_path(filepath))
+            remove_peaks(filepath)
             return {"status": "success", "message": f"Recording {filename} deleted"}
         else:
             return {"status": "error", "message": "Recording not found"}
@@ -312,53 +391,56 @@ class MixRecordings(BaseModel):
     recordings: list[str]
     output_filename: str
 
-@app.post("/recording/mix")
-def mix_recordings(data: MixRecordings):
-    """Mix multiple recordings together"""
+class JobRequest(BaseModel):
+    kind: str  # mix, normalize, transcode or waveform
+    recordings: List[str]
+    output_filename: Optional[str] = None
+    options: dict = {}
+
+def default_output_filename(kind: str, recordings: List[str], options: dict) -> str:
+    stem = os.path.splitext(recordings[0])[0]
+    if kind == "waveform":
+        return f"{recordings[0]}.waveform.json"
+    if kind == "transcode":
+        return f"{stem}.{options.get('format', 'mp3')}"
+    return f"{stem}_{kind}.wav"
+
+@app.post("/jobs")
+def submit_job(data: JobRequest):
+    """Queue a background job; poll /jobs/{job_id} for progress and the result"""
     try:
-        import numpy as np
-        from scipy.io import wavfile
-        
-        mixed_audio = None
-        sample_rate = None
-        
+        paths = []
         for filename in data.recordings:
             filepath = os.path.join("recordings", filename)
             if not os.path.exists(filepath):
                 return {"status": "error", "message": f"Recording {filename} not found"}
-            
-            rate, audio = wavfile.read(filepath)
-            
-            if sample_rate is None:
-                sample_rate = rate
-                mixed_audio = audio.astype(np.float32)
-            else:
-                if rate != sample_rate:
-                    return {"status": "error", "message": "Sample rates don't match"}
-                
-                # Pad shorter audio with zeros
-                if len(audio) > len(mixed_audio):
-                    mixed_audio = np.pad(mixed_audio, (0, len(audio) - len(mixed_audio)), 'constant')
-                elif len(mixed_audio) > len(audio):
-                    audio = np.pad(audio, (0, len(mixed_audio) - len(audio)), 'constant')
-                
-                mixed_audio += audio.astype(np.float32)
+            paths.append(filepath)
         
-        # Normalize to prevent clipping
-        if mixed_audio is not None:
-            mixed_audio = mixed_audio / len(data.recordings)
-            mixed_audio = np.clip(mixed_audio, -32768, 32767).astype(np.int16)
-            
-            output_path = os.path.join("recordings", data.output_filename)
-            wavfile.write(output_path, sample_rate, mixed_audio)
-            
-            return {
-                "status": "success",
-                "filename": data.output_filename,
-                "message": f"Mixed {len(data.recordings)} recordings"
-            }
+        if not paths:
+            return {"status": "error", "message": "No recordings given"}
         
-        return {"status": "error", "message": "No audio to mix"}
+        output_filename = data.output_filename or default_output_filename(data.kind, data.recordings, data.options)
+        job = job_queue.submit(data.kind, paths, [os.path.join("recordings", output_filename)], data.options)
+        return job.to_dict()
         
     except Exception as e:
-        return {"status": "error", "message": f"Failed to mix recordings: {str(e)}"}
\ No newline at end of file
+        return {"status": "error", "message": f"Failed to submit job: {str(e)}"}
+
+@app.get("/jobs")
+def list_jobs():
+    return {
+        "jobs": [job.to_dict() for job in list(job_queue.jobs.values())],
+        "stats": job_queue.stats()
+    }
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    job = job_queue.get(job_id)
+    if job is None:
+        return {"status": "error", "message": "Job not found"}
+    return job.to_dict()
+
+@app.post("/recording/mix")
+def mix_recordings(data: MixRecordings):
+    """Mix multiple recordings together in the background (returns a job to poll)"""
+    return submit_job(JobRequest(kind="mix", recordings=data.recordings, output_filename=data.output_filename))
\ No newline at end of file
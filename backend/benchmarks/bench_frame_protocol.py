@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark: legacy JSON/base64 video frames vs binary frame protocol.
+
+Compares bytes on the wire per frame and the server-side time to get from the
+received message to a decoded OpenCV image.
+
+Usage (from backend/):
+    python benchmarks/bench_frame_protocol.py [--frames 200] [--width 640] [--height 480]
+"""
+import argparse
+import base64
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frame_protocol import CODEC_JPEG, CODEC_WEBP, decode_frame, encode_frame
+
+
+def make_test_image(width, height):
+    """Synthetic webcam-like frame: smooth gradient, a few shapes and sensor noise."""
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    image = np.stack([np.broadcast_to(x, (height, width)),
+                      np.broadcast_to(y, (height, width)),
+                      np.full((height, width), 128, np.float32)], axis=-1)
+    image = image.astype(np.uint8).copy()
+    cv2.circle(image, (width // 2, height // 2), height // 4, (40, 180, 220), -1)
+    cv2.rectangle(image, (20, 20), (width // 3, height // 3), (200, 60, 60), -1)
+    noise = np.random.default_rng(0).integers(0, 12, image.shape, dtype=np.uint8)
+    return cv2.add(image, noise)
+
+
+def json_message(jpeg_bytes, sequence):
+    data_url = "data:image/jpeg;base64," + base64.b64encode(jpeg_bytes).decode("ascii")
+    return json.dumps({
+        "type": "video_frame",
+        "image": data_url,
+        "instrument": "piano",
+        "timestamp": time.time() * 1000,
+        "seq": sequence,
+    })
+
+
+def decode_json(message):
+    data = json.loads(message)
+    image_bytes = base64.b64decode(data["image"].split(",")[1])
+    return cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+
+
+def decode_binary(message):
+    frame = decode_frame(message)
+    return cv2.imdecode(frame.payload, cv2.IMREAD_COLOR)
+
+
+def time_decode(decoder, messages):
+    start = time.perf_counter()
+    for message in messages:
+        image = decoder(message)
+        assert image is not None
+    return (time.perf_counter() - start) / len(messages) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--quality", type=int, default=50)
+    args = parser.parse_args()
+
+    image = make_test_image(args.width, args.height)
+    _, jpeg = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, args.quality])
+    _, webp = cv2.imencode(".webp", image, [cv2.IMWRITE_WEBP_QUALITY, args.quality])
+    jpeg_bytes, webp_bytes = jpeg.tobytes(), webp.tobytes()
+
+    cases = {
+        "json+base64 (jpeg)": ([json_message(jpeg_bytes, i) for i in range(args.frames)], decode_json),
+        "binary (jpeg)": ([encode_frame(jpeg_bytes, i, time.time() * 1000, CODEC_JPEG)
+                           for i in range(args.frames)], decode_binary),
+        "binary (webp)": ([encode_frame(webp_bytes, i, time.time() * 1000, CODEC_WEBP)
+                           for i in range(args.frames)], decode_binary),
+    }
+
+    print(f"📊 Frame protocol benchmark: {args.width}x{args.height}, quality {args.quality}, "
+          f"{args.frames} frames")
+    print("=" * 64)
+    print(f"{'protocol':<22}{'bytes/frame':>14}{'decode ms/frame':>18}")
+    baseline = None
+    for name, (messages, decoder) in cases.items():
+        size = len(messages[0].encode("utf-8")) if isinstance(messages[0], str) else len(messages[0])
+        decode_ms = time_decode(decoder, messages)
+        baseline = baseline or (size, decode_ms)
+        print(f"{name:<22}{size:>14,}{decode_ms:>18.3f}"
+              f"   ({size / baseline[0]:.0%} size, {decode_ms / baseline[1]:.0%} time)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-landmark Python gesture classification vs the vectorized NumPy classifier.
+
+Runs the legacy per-hand loop (attribute access on MediaPipe-style landmark
+objects), the vectorized classifier per frame, and the batch API over many
+frames, and checks that all three agree.
+
+Usage (from backend/):
+    python benchmarks/bench_hand_classifier.py [--frames 2000] [--hands 2]
+"""
+import argparse
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+from hand_classifier import GESTURE_NAMES, classify_batch, gesture_results, landmarks_to_array
+
+
+def legacy_classify(hand_landmarks):
+    """The original per-finger loop from websocket_server.GestureDetector."""
+    landmarks = hand_landmarks.landmark
+    fingers_up = []
+    confidence = 0.0
+
+    thumb_tip, thumb_ip, wrist = landmarks[4], landmarks[3], landmarks[0]
+    if abs(thumb_tip.x - wrist.x) > abs(thumb_ip.x - wrist.x) * 1.2:
+        fingers_up.append(0)
+        confidence += 0.15
+
+    for i, (tip_id, pip_id) in enumerate(zip([8, 12, 16, 20], [6, 10, 14, 18])):
+        if landmarks[tip_id].y < landmarks[pip_id].y - 0.02:
+            fingers_up.append(i + 1)
+            confidence += 0.2
+
+    if confidence < 0.2:
+        return None
+    count = len(fingers_up)
+    if count == 0:
+        confidence = min(confidence + 0.3, 1.0)
+    elif count == 5:
+        confidence = min(confidence + 0.2, 1.0)
+    return {"name": GESTURE_NAMES[count], "fingers": fingers_up, "count": count,
+            "confidence": min(confidence, 1.0)}
+
+
+def make_frames(count, hands, seed=0):
+    rng = np.random.default_rng(seed)
+    return [rng.uniform(0.0, 1.0, (hands, 21, 3)).astype(np.float32) for _ in range(count)]
+
+
+def as_mediapipe(frame):
+    """Wrap an array in objects shaped like MediaPipe's multi_hand_landmarks."""
+    return [SimpleNamespace(landmark=[SimpleNamespace(x=float(x), y=float(y), z=float(z)) for x, y, z in hand])
+            for hand in frame.tolist()]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--hands", type=int, default=2)
+    args = parser.parse_args()
+
+    frames = make_frames(args.frames, args.hands)
+    mediapipe_frames = [as_mediapipe(frame) for frame in frames]
+
+    legacy, legacy_ms = timed(lambda: [
+        [g for g in (legacy_classify(hand) for hand in hands) if g and g["confidence"] > 0.4]
+        for hands in mediapipe_frames])
+    vectorized, vectorized_ms = timed(lambda: [
+        gesture_results(landmarks_to_array(hands), min_confidence=0.4) for hands in mediapipe_frames])
+    batched, batch_ms = timed(lambda: classify_batch(frames, min_confidence=0.4))
+
+    assert legacy == vectorized == batched, "classifier outputs differ"
+
+    print(f"📊 Hand classifier benchmark: {args.frames} frames x {args.hands} hands")
+    print("=" * 64)
+    for name, total_ms in (("legacy per-landmark loop", legacy_ms),
+                           ("vectorized per frame", vectorized_ms),
+                           ("vectorized batch", batch_ms)):
+        print(f"{name:<28}{total_ms / args.frames * 1000:>10.1f} µs/frame"
+              f"   ({legacy_ms / total_ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-sample Python tone synthesis vs the vectorized instruments.synthesis module.
+
+Renders the fallback sound bank of each instrument with the original
+per-sample loops and with one batched call, checks the deterministic tones
+match, then times full instrument construction (get_instrument) with the new
+code, with an empty and with a warm sample cache. Uses SDL's dummy audio
+driver so it runs headless.
+
+Usage (from backend/):
+    python benchmarks/bench_instrument_synthesis.py [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from instruments import get_instrument
+from instruments.sample_cache import sample_cache
+from instruments.synthesis import (FLUTE_HARMONICS, GUITAR_HARMONICS, PIANO_HARMONICS, SAMPLE_RATE, adsr,
+                                   exponential_decay, render_drum, render_tones, to_pcm16)
+
+PIANO_NOTES = [f * 2 ** octave for octave in range(3)
+               for f in (261.63, 293.66, 329.63, 349.23, 392.00, 440.00, 493.88)]
+GUITAR_NOTES = [261.63, 293.66, 329.63, 349.23, 392.00, 440.00]
+FLUTE_NOTES = [523.25, 587.33, 659.25, 698.46, 783.99, 880.00]
+
+
+def legacy_piano(frequency, duration=0.5):
+    """The original Piano.generate_tone loop."""
+    frames = int(duration * SAMPLE_RATE)
+    arr = np.zeros((frames, 2))
+    for i in range(frames):
+        time_point = i / SAMPLE_RATE
+        wave = np.sin(2 * np.pi * frequency * time_point) * 0.3
+        wave += np.sin(2 * np.pi * frequency * 2 * time_point) * 0.1
+        wave += np.sin(2 * np.pi * frequency * 3 * time_point) * 0.05
+        envelope = 1.0
+        if i < SAMPLE_RATE * 0.01:
+            envelope = i / (SAMPLE_RATE * 0.01)
+        elif i > frames - SAMPLE_RATE * 0.1:
+            envelope = (frames - i) / (SAMPLE_RATE * 0.1)
+        arr[i] = wave * envelope
+    return (arr * 32767).astype(np.int16)
+
+
+def legacy_guitar(frequency, duration=0.8):
+    """The original Guitar.generate_tone loop."""
+    frames = int(duration * SAMPLE_RATE)
+    arr = np.zeros((frames, 2))
+    for i in range(frames):
+        time_point = i / SAMPLE_RATE
+        wave = np.sin(2 * np.pi * frequency * time_point) * 0.3
+        wave += np.sin(2 * np.pi * frequency * 2 * time_point) * 0.15
+        wave += np.sin(2 * np.pi * frequency * 3 * time_point) * 0.1
+        arr[i] = wave * np.exp(-time_point * 2)
+    return (arr * 32767).astype(np.int16)
+
+
+def legacy_flute(frequency, duration=0.6):
+    """The original Flute.generate_tone loop."""
+    frames = int(duration * SAMPLE_RATE)
+    arr = np.zeros((frames, 2))
+    for i in range(frames):
+        time_point = i / SAMPLE_RATE
+        wave = np.sin(2 * np.pi * frequency * time_point) * 0.4
+        wave += np.sin(2 * np.pi * frequency * 2 * time_point) * 0.1
+        attack = min(1.0, time_point * 10)
+        release = min(1.0, (duration - time_point) * 5)
+        arr[i] = wave * attack * release
+    return (arr * 32767).astype(np.int16)
+
+
+def legacy_kick():
+    """The original Drums.generate_drum_sound("kick") loop."""
+    frames = int(0.3 * SAMPLE_RATE)
+    arr = np.zeros((frames, 2))
+    for i in range(frames):
+        time_point = i / SAMPLE_RATE
+        arr[i] = np.sin(2 * np.pi * 60 * time_point) * np.exp(-time_point * 15) * 0.8
+    return np.clip(arr * 32767, -32767, 32767).astype(np.int16)
+
+
+def vectorized_banks():
+    return {
+        "piano": to_pcm16(render_tones(PIANO_NOTES, 0.5, PIANO_HARMONICS,
+                                       adsr(int(0.5 * SAMPLE_RATE), attack=0.01, release=0.1))),
+        "guitar": to_pcm16(render_tones(GUITAR_NOTES, 0.8, GUITAR_HARMONICS,
+                                        exponential_decay(int(0.8 * SAMPLE_RATE), 2))),
+        "flute": to_pcm16(render_tones(FLUTE_NOTES, 0.6, FLUTE_HARMONICS,
+                                       adsr(int(0.6 * SAMPLE_RATE), attack=0.1, release=0.2))),
+        "kick": to_pcm16(render_drum("kick"))[np.newaxis],
+    }
+
+
+def legacy_banks():
+    return {
+        "piano": np.stack([legacy_piano(f) for f in PIANO_NOTES]),
+        "guitar": np.stack([legacy_guitar(f) for f in GUITAR_NOTES]),
+        "flute": np.stack([legacy_flute(f) for f in FLUTE_NOTES]),
+        "kick": legacy_kick()[np.newaxis],
+    }
+
+
+def timed(fn, repeat=1):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    legacy, legacy_ms = timed(legacy_banks)
+    vectorized, vectorized_ms = timed(vectorized_banks, args.repeat)
+
+    for name in legacy:
+        # Off-by-one LSB differences come from float rounding order, not the waveform
+        diff = np.abs(legacy[name].astype(np.int32) - vectorized[name].astype(np.int32)).max()
+        assert diff <= 2, f"{name} tones differ by {diff}"
+
+    print("📊 Instrument synthesis benchmark")
+    print("=" * 64)
+    print(f"{'legacy per-sample loops':<28}{legacy_ms:>10.1f} ms")
+    print(f"{'vectorized batch':<28}{vectorized_ms:>10.1f} ms   ({legacy_ms / vectorized_ms:.0f}x)")
+
+    print("\n⏱️ Instrument construction with vectorized synthesis (cold / sample cache warm)")
+    for name in ("piano", "drums", "guitar", "flute"):
+        sample_cache.invalidate(name)
+        _, cold_ms = timed(lambda: get_instrument(name))
+        _, warm_ms = timed(lambda: get_instrument(name), args.repeat)
+        print(f"{name:<28}{cold_ms:>10.1f} ms{warm_ms:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
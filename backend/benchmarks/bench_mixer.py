@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Benchmark: CPU time per block of the instruments BlockMixer at increasing polyphony.
+
+Keeps the mixer saturated with voices (retriggering as they finish) and
+renders to a NullSink, so the numbers are pure mixing cost. Compare the
+per-block time with the real-time budget to size max_voices for a machine.
+
+Usage (from backend/):
+    python benchmarks/bench_mixer.py [--blocks 2000] [--block-size 256] [--steal oldest]
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from instruments.mixer import BlockMixer, NullSink, as_float_samples
+from instruments.synthesis import PIANO_HARMONICS, SAMPLE_RATE, adsr, render_tones, to_pcm16
+
+
+def make_voices():
+    """One second of piano tones across three octaves, as mixer-ready float32 stereo."""
+    frequencies = [261.63 * 2 ** (step / 12) for step in range(36)]
+    waves = render_tones(frequencies, 1.0, PIANO_HARMONICS, adsr(SAMPLE_RATE, attack=0.01, release=0.1))
+    return [as_float_samples(pcm) for pcm in to_pcm16(waves)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--blocks", type=int, default=2000)
+    parser.add_argument("--block-size", type=int, default=256)
+    parser.add_argument("--steal", choices=("oldest", "quietest"), default="oldest")
+    args = parser.parse_args()
+
+    voices = make_voices()
+    print(f"📊 BlockMixer benchmark: {args.blocks} blocks of {args.block_size} frames, steal={args.steal}")
+    print("=" * 64)
+
+    for polyphony in (8, 16, 32, 64, 128):
+        mixer = BlockMixer(NullSink(), block_size=args.block_size, max_voices=polyphony, steal=args.steal)
+        rng = np.random.default_rng(polyphony)
+        for _ in range(args.blocks):
+            # Top up to the cap, plus one extra trigger per block to exercise stealing
+            for _ in range(polyphony - len(mixer.voices) + 1):
+                mixer.play(voices[rng.integers(len(voices))], "piano", gain=0.2)
+            mixer.render_block()
+
+        cpu = mixer.stats()["block_cpu_ms"]
+        print(f"{polyphony:>4} voices {cpu['avg'] * 1000:>9.1f} µs/block (max {cpu['max'] * 1000:>7.1f})"
+              f"   {cpu['load'] * 100:>5.1f}% of {cpu['budget']:.2f} ms budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Benchmark: offline FluidSynth render throughput (no sound card needed).
+
+Loads the SoundFont without an audio driver, holds a chord on each instrument
+program used by the gesture tables and renders as fast as possible, reporting
+how many times faster than real time the synth runs. Suitable for CI.
+
+Usage (from backend/):
+    python benchmarks/bench_synth_render.py [--seconds 10] [--block-size 512]
+"""
+import argparse
+import os
+import sys
+
+import fluidsynth
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+from audio_backend import SAMPLE_RATE, measure_throughput
+from note_maps import CHORD_MAP, INSTRUMENT_PROGRAMS
+from synth_engine import SF2_PATH
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--block-size", type=int, default=512)
+    parser.add_argument("--soundfont", default=SF2_PATH)
+    args = parser.parse_args()
+
+    synth = fluidsynth.Synth(samplerate=float(SAMPLE_RATE))
+    sfid = synth.sfload(args.soundfont)
+
+    print(f"📊 Synth render benchmark: {args.seconds:.0f}s of audio, {args.block_size}-frame blocks")
+    print("=" * 64)
+    print(f"{'idle':<24}{measure_throughput(synth, args.seconds, args.block_size)['realtime_factor']:>8.1f}x realtime")
+
+    voices = 0
+    for channel, program in enumerate(INSTRUMENT_PROGRAMS.values()):
+        synth.program_select(channel, sfid, 0, program)
+        for note in CHORD_MAP["point"]:
+            synth.noteon(channel, note, 100)
+            voices += 1
+        result = measure_throughput(synth, args.seconds, args.block_size)
+        print(f"{f'{voices} held notes':<24}{result['realtime_factor']:>8.1f}x realtime"
+              f"   ({result['block_ms']:.3f} ms/block)")
+
+    synth.delete()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Binary frame protocol for the /ws/gesture WebSocket.
+
+Clients that opt in with a ``hello`` message send each video frame as a single
+binary WebSocket message: a fixed 16-byte header followed by the raw encoded
+image bytes. This avoids the base64 data-URL overhead (~33%) and the JSON parse
+of the legacy text protocol.
+
+Header layout (little-endian):
+
+    offset  size  field
+    0       1     version      (PROTOCOL_VERSION)
+    1       1     message type (MSG_VIDEO_FRAME, ...)
+    2       1     codec        (CODEC_JPEG, CODEC_WEBP)
+    3       1     flags        (reserved, 0)
+    4       4     sequence     (uint32, wraps)
+    8       8     timestamp    (float64, client clock in ms)
+"""
+import struct
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+PROTOCOL_VERSION = 1
+
+# Message types
+MSG_VIDEO_FRAME = 1
+
+# Codecs
+CODEC_JPEG = 1
+CODEC_WEBP = 2
+
+CODEC_NAMES = {
+    CODEC_JPEG: "jpeg",
+    CODEC_WEBP: "webp",
+}
+
+# Protocol names used during negotiation
+PROTOCOL_JSON = "json"
+PROTOCOL_BINARY = "binary"
+SUPPORTED_PROTOCOLS = [PROTOCOL_BINARY, PROTOCOL_JSON]
+
+FRAME_HEADER = struct.Struct("<BBBBId")
+HEADER_SIZE = FRAME_HEADER.size
+
+
+class FrameProtocolError(ValueError):
+    """Raised when a binary message cannot be parsed."""
+
+
+class BinaryFrame(NamedTuple):
+    """A parsed binary video frame. ``payload`` is a view into the receive buffer."""
+    message_type: int
+    codec: int
+    sequence: int
+    timestamp: float
+    payload: np.ndarray
+
+
+def encode_frame(image_bytes: bytes, sequence: int, timestamp: float,
+                 codec: int = CODEC_JPEG, message_type: int = MSG_VIDEO_FRAME) -> bytes:
+    """Build a binary frame message (used by tests, benchmarks and Python clients)."""
+    header = FRAME_HEADER.pack(PROTOCOL_VERSION, message_type, codec, 0,
+                               sequence & 0xFFFFFFFF, float(timestamp))
+    return header + image_bytes
+
+
+def decode_frame(message: bytes) -> BinaryFrame:
+    """Parse a binary frame message without copying the image payload."""
+    if len(message) <= HEADER_SIZE:
+        raise FrameProtocolError(f"Binary message too short: {len(message)} bytes")
+
+    version, message_type, codec, _flags, sequence, timestamp = FRAME_HEADER.unpack_from(message)
+    if version != PROTOCOL_VERSION:
+        raise FrameProtocolError(f"Unsupported protocol version: {version}")
+    if codec not in CODEC_NAMES:
+        raise FrameProtocolError(f"Unsupported codec: {codec}")
+
+    # np.frombuffer with an offset shares memory with the receive buffer
+    payload = np.frombuffer(message, dtype=np.uint8, offset=HEADER_SIZE)
+    return BinaryFrame(message_type, codec, sequence, timestamp, payload)
+
+
+def negotiate_protocol(requested: Optional[list]) -> str:
+    """Pick the first protocol from the client's list that the server supports."""
+    for protocol in requested or []:
+        if protocol in SUPPORTED_PROTOCOLS:
+            return protocol
+    return PROTOCOL_JSON
+
+
+def describe_protocol() -> dict:
+    """Header description sent to the client in the hello acknowledgement."""
+    return {
+        "version": PROTOCOL_VERSION,
+        "header_size": HEADER_SIZE,
+        "header_format": FRAME_HEADER.format,
+        "codecs": {name: codec for codec, name in CODEC_NAMES.items()},
+        "message_types": {"video_frame": MSG_VIDEO_FRAME},
+    }
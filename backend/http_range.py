@@ -0,0 +1,69 @@
+"""
+HTTP Range support for serving recordings.
+
+The Starlette version pinned with fastapi 0.104 has no Range handling in
+FileResponse, so players had to download a whole take before seeking.
+``range_file_response`` answers a single ``bytes=`` range with 206 Partial
+Content, streaming just that slice of the file. A request without a Range
+header, or asking for several ranges, gets the plain FileResponse
+(advertising Accept-Ranges).
+"""
+import os
+import re
+from typing import Optional, Tuple
+
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+READ_BLOCK = 64 * 1024
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """(first, last) byte offsets, inclusive, for a single range; None if unsatisfiable."""
+    match = _RANGE.match(header.strip())
+    if match is None or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first == "":  # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return None
+        return max(0, size - length), size - 1
+    first = int(first)
+    last = min(int(last), size - 1) if last else size - 1
+    if first >= size or first > last:
+        return None
+    return first, last
+
+
+def _read_slice(path: str, first: int, last: int):
+    with open(path, "rb") as f:
+        f.seek(first)
+        remaining = last - first + 1
+        while remaining > 0:
+            data = f.read(min(READ_BLOCK, remaining))
+            if not data:
+                return
+            remaining -= len(data)
+            yield data
+
+
+def range_file_response(path: str, range_header: Optional[str], media_type: str,
+                        headers: Optional[dict] = None) -> Response:
+    headers = {**(headers or {}), "Accept-Ranges": "bytes"}
+    if not range_header or not _RANGE.match(range_header.strip()):  # Multi-range: send the whole file
+        return FileResponse(path=path, media_type=media_type, headers=headers)
+
+    size = os.path.getsize(path)
+    byte_range = parse_range(range_header, size)
+    if byte_range is None:
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+
+    first, last = byte_range
+    headers.update({
+        "Content-Range": f"bytes {first}-{last}/{size}",
+        "Content-Length": str(last - first + 1),
+    })
+    return StreamingResponse(_read_slice(path, first, last), status_code=206,
+                             media_type=media_type, headers=headers)
@@ -0,0 +1,192 @@
+"""
+Bounded worker pool for frame decoding and hand inference.
+
+MediaPipe's ``Hands`` graph is stateful and not thread-safe, so every worker is
+a single-threaded executor that owns its own detector. Connections are pinned
+to one worker for their lifetime so that tracking state stays with the right
+user, and new connections go to the least-loaded worker.
+
+cv2.imdecode and the MediaPipe graph both release the GIL, so worker threads
+run in parallel and keep the asyncio event loop free for other sockets.
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_QUEUE = 4  # Pending frames per worker before new frames are rejected
+
+
+def default_worker_count() -> int:
+    """Worker count from GESTURE_WORKERS, else one per core (capped at 4)."""
+    configured = os.getenv("GESTURE_WORKERS")
+    if configured:
+        return max(1, int(configured))
+    return max(1, min(4, os.cpu_count() or 1))
+
+
+class LatencyStats:
+    """Rolling latency window reporting count, mean, p95 and max in milliseconds."""
+
+    def __init__(self, window: int = 256):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+
+    def add(self, value_ms: float):
+        self.samples.append(value_ms)
+        self.count += 1
+
+    def summary(self) -> dict:
+        if not self.samples:
+            return {"count": self.count, "avg_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+        ordered = sorted(self.samples)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        return {
+            "count": self.count,
+            "avg_ms": round(sum(ordered) / len(ordered), 3),
+            "p95_ms": round(p95, 3),
+            "max_ms": round(ordered[-1], 3),
+        }
+
+
+class FrameResult:
+    """Output of one decode + inference pass."""
+
+    __slots__ = ("results", "width", "height", "timings")
+
+    def __init__(self, results: dict, width: int, height: int, timings: Dict[str, float]):
+        self.results = results
+        self.width = width
+        self.height = height
+        self.timings = timings
+
+
+class _Worker:
+    """Single-threaded executor owning one detector instance."""
+
+    def __init__(self, index: int, detector_factory: Callable):
+        self.index = index
+        self.detector_factory = detector_factory
+        self.detector = None  # Created lazily on the worker thread
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"gesture-worker-{index}")
+        self.pending = 0
+        self.connections = 0
+        self.processed = 0
+
+    def run(self, encoded: np.ndarray, submitted_at: float) -> Optional[FrameResult]:
+        started = time.perf_counter()
+        if self.detector is None:
+            self.detector = self.detector_factory()
+
+        image = cv2.imdecode(encoded, cv2.IMREAD_COLOR)
+        decoded = time.perf_counter()
+        if image is None:
+            return None
+
+        results = self.detector.detect_gesture_with_landmarks(image)
+        finished = time.perf_counter()
+
+        timings = {
+            "queue_wait": (started - submitted_at) * 1000,
+            "decode": (decoded - started) * 1000,
+            "inference": (finished - decoded) * 1000,
+        }
+        return FrameResult(results, image.shape[1], image.shape[0], timings)
+
+
+class InferencePool:
+    """Pool of inference workers with per-connection affinity."""
+
+    def __init__(self, detector_factory: Callable, num_workers: Optional[int] = None,
+                 max_queue: int = DEFAULT_MAX_QUEUE):
+        self.detector_factory = detector_factory
+        self.num_workers = num_workers
+        self.max_queue = max_queue
+        self.workers: List[_Worker] = []
+        self.assignments: Dict[int, _Worker] = {}
+        self.rejected = 0
+        self.latency = {stage: LatencyStats() for stage in ("queue_wait", "decode", "inference", "total")}
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        # Started lazily so GESTURE_WORKERS can come from .env loaded after import
+        if self.workers:
+            return
+        with self._lock:
+            if not self.workers:
+                count = self.num_workers or default_worker_count()
+                self.workers = [_Worker(i, self.detector_factory) for i in range(count)]
+                logger.info(f"Started gesture inference pool with {count} workers")
+
+    def _worker_for(self, connection_id: int) -> _Worker:
+        worker = self.assignments.get(connection_id)
+        if worker is None:
+            worker = min(self.workers, key=lambda w: (w.connections, w.pending))
+            worker.connections += 1
+            self.assignments[connection_id] = worker
+        return worker
+
+    def release(self, connection_id: int):
+        """Forget a connection's worker assignment."""
+        worker = self.assignments.pop(connection_id, None)
+        if worker is not None:
+            worker.connections -= 1
+
+    async def submit(self, connection_id: int, encoded: np.ndarray) -> Optional[FrameResult]:
+        """Decode and run inference on the connection's worker.
+
+        Returns None when the frame could not be decoded or the worker queue is full.
+        """
+        self._ensure_started()
+        worker = self._worker_for(connection_id)
+        if worker.pending >= self.max_queue:
+            self.rejected += 1
+            return None
+
+        worker.pending += 1
+        submitted_at = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(worker.executor, worker.run, encoded, submitted_at)
+        finally:
+            worker.pending -= 1
+
+        if result is not None:
+            worker.processed += 1
+            for stage, value in result.timings.items():
+                self.latency[stage].add(value)
+            self.latency["total"].add((time.perf_counter() - submitted_at) * 1000)
+        return result
+
+    def queue_depth(self) -> int:
+        return sum(worker.pending for worker in self.workers)
+
+    def stats(self) -> dict:
+        return {
+            "workers": len(self.workers),
+            "max_queue_per_worker": self.max_queue,
+            "queue_depth": self.queue_depth(),
+            "rejected_frames": self.rejected,
+            "per_worker": [{
+                "worker": worker.index,
+                "connections": worker.connections,
+                "pending": worker.pending,
+                "processed": worker.processed,
+            } for worker in self.workers],
+            "latency": {stage: stats.summary() for stage, stats in self.latency.items()},
+        }
+
+    def shutdown(self):
+        for worker in self.workers:
+            worker.executor.shutdown(wait=False, cancel_futures=True)
+        self.workers = []
+        self.assignments.clear()
@@ -9,12 +9,8 @@ class Guitar(BaseInstrument):
     
     def load_sounds(self):
         # Generate guitar-like sounds
-        self.generate_tone("C4", 261.63, 0.8)
-        self.generate_tone("D4", 293.66, 0.8)
-        self.generate_tone("E4", 329.63, 0.8)
-        self.generate_tone("F4", 349.23, 0.8)
-        self.generate_tone("G4", 392.00, 0.8)
-        self.generate_tone("A4", 440.00, 0.8)
+        self.generate_tones([("C4", 261.63), ("D4", 293.66), ("E4", 329.63),
+                             ("F4", 349.23), ("G4", 392.00), ("A4", 440.00)], 0.8)
     
     def setup_parameters(self):
         self.gesture_note_mapping = {
@@ -29,41 +25,30 @@ class Guitar(BaseInstrument):
         return False
     
     def generate_tone(self, sound_name: str, frequency: float, duration: float = 0.8):
+        self.generate_tones([(sound_name, frequency)], duration)
+    
+    def generate_tones(self, notes, duration: float = 0.8):
         try:
-            import numpy as np
-            sample_rate = 44100
-            frames = int(duration * sample_rate)
-            arr = np.zeros((frames, 2))
+            from .synthesis import GUITAR_HARMONICS, SAMPLE_RATE, exponential_decay, render_tones, to_pcm16
+            params = {name: {"frequency": frequency, "duration": duration} for name, frequency in notes}
             
-            for i in range(frames):
-                time_point = i / sample_rate
-                # Guitar-like wave with harmonics
-                wave = np.sin(2 * np.pi * frequency * time_point) * 0.3
-                wave += np.sin(2 * np.pi * frequency * 2 * time_point) * 0.15
-                wave += np.sin(2 * np.pi * frequency * 3 * time_point) * 0.1
-                
-                # Guitar-like decay envelope
-                envelope = np.exp(-time_point * 2)
-                arr[i] = wave * envelope
+            def render(names):
+                # Guitar-like wave with harmonics and a plucked decay
+                envelope = exponential_decay(int(duration * SAMPLE_RATE), 2)
+                frequencies = [params[name]["frequency"] for name in names]
+                return to_pcm16(render_tones(frequencies, duration, GUITAR_HARMONICS, envelope))
             
-            arr = (arr * 32767).astype(np.int16)
-            import pygame
-            sound = pygame.sndarray.make_sound(arr)
-            self.sounds[sound_name] = sound
+            self.render_sounds(params, render)
         except Exception as e:
-            print(f"Error generating guitar tone: {e}")
+            print(f"Error generating guitar tones: {e}")
 
 class Flute(BaseInstrument):
     def __init__(self):
         super().__init__("flute")
     
     def load_sounds(self):
-        self.generate_tone("C5", 523.25, 0.6)
-        self.generate_tone("D5", 587.33, 0.6)
-        self.generate_tone("E5", 659.25, 0.6)
-        self.generate_tone("F5", 698.46, 0.6)
-        self.generate_tone("G5", 783.99, 0.6)
-        self.generate_tone("A5", 880.00, 0.6)
+        self.generate_tones([("C5", 523.25), ("D5", 587.33), ("E5", 659.25),
+                             ("F5", 698.46), ("G5", 783.99), ("A5", 880.00)], 0.6)
     
     def setup_parameters(self):
         self.gesture_note_mapping = {
@@ -78,30 +63,22 @@ class Flute(BaseInstrument):
         return False
     
     def generate_tone(self, sound_name: str, frequency: float, duration: float = 0.6):
+        self.generate_tones([(sound_name, frequency)], duration)
+    
+    def generate_tones(self, notes, duration: float = 0.6):
         try:
-            import numpy as np
-            sample_rate = 44100
-            frames = int(duration * sample_rate)
-            arr = np.zeros((frames, 2))
+            from .synthesis import FLUTE_HARMONICS, SAMPLE_RATE, adsr, render_tones, to_pcm16
+            params = {name: {"frequency": frequency, "duration": duration} for name, frequency in notes}
             
-            for i in range(frames):
-                time_point = i / sample_rate
-                # Flute-like pure tone
-                wave = np.sin(2 * np.pi * frequency * time_point) * 0.4
-                wave += np.sin(2 * np.pi * frequency * 2 * time_point) * 0.1
-                
-                # Smooth envelope
-                attack = min(1.0, time_point * 10)
-                release = min(1.0, (duration - time_point) * 5)
-                envelope = attack * release
-                arr[i] = wave * envelope
+            def render(names):
+                # Flute-like pure tone with a smooth envelope
+                envelope = adsr(int(duration * SAMPLE_RATE), attack=0.1, release=0.2)
+                frequencies = [params[name]["frequency"] for name in names]
+                return to_pcm16(render_tones(frequencies, duration, FLUTE_HARMONICS, envelope))
             
-            arr = (arr * 32767).astype(np.int16)
-            import pygame
-            sound = pygame.sndarray.make_sound(arr)
-            self.sounds[sound_name] = sound
+            self.render_sounds(params, render)
         except Exception as e:
-            print(f"Error generating flute tone: {e}")
+            print(f"Error generating flute tones: {e}")
 
 # Instrument registry
 AVAILABLE_INSTRUMENTS = {
@@ -113,14 +90,17 @@ AVAILABLE_INSTRUMENTS = {
     "saxophone": Flute,  # Use flute as placeholder for saxophone
 }
 
-def get_instrument(name: str) -> BaseInstrument:
-    """Get an instrument instance by name"""
+def get_instrument(name: str, mixer=None) -> BaseInstrument:
+    """Get an instrument instance by name, optionally playing through a BlockMixer"""
     if name in AVAILABLE_INSTRUMENTS:
-        return AVAILABLE_INSTRUMENTS[name]()
+        instrument = AVAILABLE_INSTRUMENTS[name]()
     else:
         # Default to piano if instrument not found
         print(f"Unknown instrument: {name}, defaulting to piano")
-        return Piano()
+        instrument = Piano()
+    if mixer is not None:
+        instrument.attach_mixer(mixer)
+    return instrument
 
 def list_instruments():
     """List all available instruments"""
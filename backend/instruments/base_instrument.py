@@ -4,6 +4,11 @@ import pygame
 import os
 import logging
 
+try:
+    from .sample_cache import sample_cache
+except ImportError:  # NumPy not available: decode sample files directly
+    sample_cache = None
+
 logger = logging.getLogger(__name__)
 
 class BaseInstrument(ABC):
@@ -14,6 +19,8 @@ class BaseInstrument(ABC):
         self.sound_dir = sound_dir or f"sounds/{name}"
         self.sounds = {}
         self.is_initialized = False
+        self.mixer = None  # Optional BlockMixer; pygame.mixer plays the sounds otherwise
+        self._mixer_samples = {}
         
         # Initialize pygame mixer if not already done
         if not pygame.mixer.get_init():
@@ -52,8 +59,10 @@ class BaseInstrument(ABC):
         try:
             filepath = os.path.join(self.sound_dir, filename)
             if os.path.exists(filepath):
-                sound = pygame.mixer.Sound(filepath)
-                self.sounds[sound_name] = sound
+                if sample_cache is not None and sample_cache.enabled:
+                    self.sounds[sound_name] = self._load_cached_file(sound_name, filepath)
+                else:
+                    self.sounds[sound_name] = pygame.mixer.Sound(filepath)
                 return True
             else:
                 logger.warning(f"Sound file not found: {filepath}")
@@ -62,12 +71,52 @@ class BaseInstrument(ABC):
             logger.error(f"Error loading sound {filename}: {e}")
             return False
     
+    def _load_cached_file(self, sound_name: str, filepath: str):
+        """Decode a sample file once; later loads read the mixer-format PCM from the sample cache"""
+        stat = os.stat(filepath)
+        key = sample_cache.key(self.name, sound_name, source=os.path.abspath(filepath), size=stat.st_size,
+                               mtime=stat.st_mtime_ns, mixer=pygame.mixer.get_init())
+        pcm = sample_cache.get(key)
+        if pcm is not None:
+            return pygame.sndarray.make_sound(pcm)
+        sound = pygame.mixer.Sound(filepath)
+        sample_cache.put(key, pygame.sndarray.array(sound))
+        return sound
+
+    def render_sounds(self, params: Dict[str, dict], render) -> None:
+        """Register synthesized sounds, rendering only those missing from the sample cache"""
+        if sample_cache is None:
+            pcm = dict(zip(params, render(list(params))))
+        else:
+            params = {name: {**note_params, "mixer": pygame.mixer.get_init()} for name, note_params in params.items()}
+            pcm = sample_cache.render(self.name, params, render)
+        self.add_generated_sounds(list(pcm), list(pcm.values()))
+
+    def add_generated_sounds(self, names: List[str], pcm) -> None:
+        """Register rendered int16 buffers (one per name, shaped (frames, channels)) as sounds"""
+        for sound_name, samples in zip(names, pcm):
+            self.sounds[sound_name] = pygame.sndarray.make_sound(samples)
+
+    def attach_mixer(self, mixer) -> None:
+        """Route play_sound() through a BlockMixer (voice cap, stealing, per-instrument gain)"""
+        self.mixer = mixer
+        self._mixer_samples = {}
+    
     def play_sound(self, sound_name: str, volume: float = 1.0) -> bool:
         """Play a loaded sound by name"""
         try:
             if sound_name in self.sounds:
+                volume = min(max(volume, 0.0), 1.0)  # Clamp volume 0-1
+                if self.mixer is not None:
+                    samples = self._mixer_samples.get(sound_name)
+                    if samples is None:
+                        from .mixer import as_float_samples
+                        samples = as_float_samples(pygame.sndarray.array(self.sounds[sound_name]))
+                        self._mixer_samples[sound_name] = samples
+                    self.mixer.play(samples, self.name, volume)
+                    return True
                 sound = self.sounds[sound_name]
-                sound.set_volume(min(max(volume, 0.0), 1.0))  # Clamp volume 0-1
+                sound.set_volume(volume)
                 sound.play()
                 return True
             else:
@@ -80,6 +129,9 @@ class BaseInstrument(ABC):
     def stop_all_sounds(self):
         """Stop all currently playing sounds"""
         try:
+            if self.mixer is not None:
+                self.mixer.stop(instrument=self.name)
+                return
             pygame.mixer.stop()
         except Exception as e:
             logger.error(f"Error stopping sounds: {e}")
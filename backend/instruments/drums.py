@@ -1,5 +1,4 @@
 from .base_instrument import BaseInstrument
-import pygame
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,10 +22,12 @@ class Drums(BaseInstrument):
         }
         
         # Load drum samples
-        for sound_name, filename in drum_sounds.items():
-            if not self.load_sound_file(sound_name, filename):
-                # Generate fallback percussion sounds if samples not found
-                self.generate_drum_sound(sound_name)
+        missing = [sound_name for sound_name, filename in drum_sounds.items()
+                   if not self.load_sound_file(sound_name, filename)]
+        
+        # Generate fallback percussion sounds if samples not found
+        if missing:
+            self.generate_drum_sounds(missing)
     
     def setup_parameters(self):
         """Set up drums-specific parameters"""
@@ -66,75 +67,24 @@ class Drums(BaseInstrument):
             return False
     
     def generate_drum_sound(self, drum_type: str):
-        """Generate synthetic drum sounds"""
+        """Generate a synthetic drum sound"""
+        self.generate_drum_sounds([drum_type])
+    
+    def generate_drum_sounds(self, drum_types: list):
+        """Generate synthetic drum sounds for the whole kit in one pass"""
         try:
-            import numpy as np
-            import random
-            
-            sample_rate = 44100
-            
-            if drum_type == "kick":
-                # Low frequency sine wave with quick decay
-                duration = 0.3
-                frequency = 60
-                frames = int(duration * sample_rate)
-                arr = np.zeros((frames, 2))
-                
-                for i in range(frames):
-                    time_point = i / sample_rate
-                    # Exponential decay envelope
-                    envelope = np.exp(-time_point * 15)
-                    wave = np.sin(2 * np.pi * frequency * time_point) * envelope
-                    arr[i] = wave * 0.8
-                    
-            elif drum_type == "snare":
-                # White noise with band-pass filtering
-                duration = 0.15
-                frames = int(duration * sample_rate)
-                arr = np.random.normal(0, 0.1, (frames, 2))
-                
-                # Apply envelope
-                for i in range(frames):
-                    envelope = np.exp(-(i / sample_rate) * 20)
-                    arr[i] *= envelope * 0.6
-                    
-            elif drum_type == "hihat":
-                # High frequency noise
-                duration = 0.1
-                frames = int(duration * sample_rate)
-                arr = np.random.normal(0, 0.05, (frames, 2))
-                
-                # High-pass filter effect (simplified)
-                for i in range(frames):
-                    envelope = np.exp(-(i / sample_rate) * 50)
-                    arr[i] *= envelope * 0.4
-                    
-            else:
-                # Generic percussive sound
-                duration = 0.2
-                frequency = 200 + random.randint(0, 300)
-                frames = int(duration * sample_rate)
-                arr = np.zeros((frames, 2))
-                
-                for i in range(frames):
-                    time_point = i / sample_rate
-                    envelope = np.exp(-time_point * 10)
-                    wave = np.sin(2 * np.pi * frequency * time_point) * envelope
-                    # Add some noise
-                    wave += np.random.normal(0, 0.1) * envelope * 0.3
-                    arr[i] = wave * 0.5
+            from .synthesis import render_drums, to_pcm16
             
-            # Convert to pygame sound
-            arr = np.clip(arr * 32767, -32767, 32767).astype(np.int16)
-            sound = pygame.sndarray.make_sound(arr)
-            self.sounds[drum_type] = sound
+            def render(names):
+                return [to_pcm16(wave) for wave in render_drums(names).values()]
             
-            logger.info(f"Generated synthetic drum sound: {drum_type}")
+            self.render_sounds({drum_type: {"drum": drum_type} for drum_type in drum_types}, render)
+            logger.info(f"Loaded synthetic drum sounds: {', '.join(drum_types)}")
             
         except ImportError:
             logger.warning("NumPy not available, cannot generate synthetic drum sounds")
         except Exception as e:
-            logger.error(f"Error generating drum sound {drum_type}: {e}")
+            logger.error(f"Error generating drum sounds {drum_types}: {e}")
     
     def get_available_gestures(self) -> list:
         """Return list of gestures this drum kit responds to"""
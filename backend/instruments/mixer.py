@@ -0,0 +1,302 @@
+"""
+Block-based NumPy mixer for instrument sounds.
+
+Active voices are mixed into fixed-size float32 stereo blocks. The mix,
+scratch and limiter buffers are allocated once, so rendering a block does no
+allocation beyond the voice slices. Polyphony is capped: when a new voice
+would exceed ``max_voices`` the oldest (or quietest) voice is stolen. Each
+instrument has its own gain, and a soft limiter bends peaks above the
+threshold instead of hard-clipping them. Voices can be float32 or int16
+(e.g. memory-mapped PCM, scaled while mixing) and released with a short
+fade instead of being cut.
+
+Blocks go to a pluggable sink: SoundDeviceSink for playback, WavFileSink for
+offline renders, NullSink for benchmarks. Thread CPU time is measured for
+every block and compared with the block's real-time budget in stats().
+"""
+import itertools
+import logging
+import threading
+import time
+import wave
+from collections import deque
+from typing import Dict
+
+import numpy as np
+
+from .synthesis import SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+BLOCK_SIZE = 256
+MAX_VOICES = 32
+LIMITER_THRESHOLD = 0.8
+
+
+class NullSink:
+    """Discards blocks (benchmarks and dry runs)."""
+
+    paced = False
+
+    def write(self, block: np.ndarray):
+        pass
+
+    def close(self):
+        pass
+
+
+class WavFileSink:
+    """Writes blocks to a 16-bit stereo WAV file."""
+
+    paced = False
+
+    def __init__(self, path: str, sample_rate: int = SAMPLE_RATE):
+        self._wav = wave.open(path, "wb")
+        self._wav.setnchannels(2)
+        self._wav.setsampwidth(2)
+        self._wav.setframerate(sample_rate)
+
+    def write(self, block: np.ndarray):
+        self._wav.writeframes((block * 32767).astype(np.int16).tobytes())
+
+    def close(self):
+        self._wav.close()
+
+
+class SoundDeviceSink:
+    """Plays blocks on the default output device; write() blocks, which paces the mixer."""
+
+    paced = True
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE, block_size: int = BLOCK_SIZE):
+        import sounddevice as sd
+        self._stream = sd.OutputStream(samplerate=sample_rate, channels=2, dtype="float32", blocksize=block_size)
+        self._stream.start()
+
+    def write(self, block: np.ndarray):
+        self._stream.write(block)
+
+    def close(self):
+        self._stream.stop()
+        self._stream.close()
+
+
+class Voice:
+    __slots__ = ("id", "samples", "position", "gain", "instrument", "key", "fade_left", "fade_frames")
+
+    def __init__(self, voice_id: int, samples: np.ndarray, gain: float, instrument: str, key):
+        self.id = voice_id
+        self.samples = samples
+        self.position = 0
+        self.gain = gain / 32768 if samples.dtype == np.int16 else gain
+        self.instrument = instrument
+        self.key = key
+        self.fade_left = None  # Frames left of the release fade
+        self.fade_frames = 0
+
+    @property
+    def finished(self) -> bool:
+        return self.position >= len(self.samples) or self.fade_left == 0
+
+    def level(self, frames: int) -> float:
+        """Peak of the next ``frames`` samples after gain (used to find the quietest voice)."""
+        upcoming = self.samples[self.position:self.position + frames]
+        return float(np.abs(upcoming).max()) * self.gain if len(upcoming) else 0.0
+
+
+def as_float_samples(pcm: np.ndarray) -> np.ndarray:
+    """int16 (frames,) or (frames, channels) PCM -> float32 (frames, 2) in [-1, 1]."""
+    samples = np.asarray(pcm)
+    if samples.dtype == np.int16:
+        samples = samples.astype(np.float32) / 32768
+    else:
+        samples = samples.astype(np.float32, copy=False)
+    if samples.ndim == 1:
+        samples = samples[:, np.newaxis]
+    if samples.shape[1] == 1:
+        samples = np.repeat(samples, 2, axis=1)
+    return np.ascontiguousarray(samples[:, :2])
+
+
+class BlockMixer:
+    """Mixes voices into fixed-size blocks with a polyphony cap, voice stealing and a soft limiter."""
+
+    def __init__(self, sink=None, sample_rate: int = SAMPLE_RATE, block_size: int = BLOCK_SIZE,
+                 max_voices: int = MAX_VOICES, steal: str = "oldest", limiter_threshold: float = LIMITER_THRESHOLD):
+        if steal not in ("oldest", "quietest"):
+            raise ValueError(f"Unknown voice stealing policy: {steal}")
+        self.sink = sink or NullSink()
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.max_voices = max_voices
+        self.steal = steal
+        self.limiter_threshold = limiter_threshold
+        self.gains: Dict[str, float] = {}
+
+        self.voices = []  # Oldest first
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._running = False
+        self.scheduler = None  # Optional; its tick(frames) runs before each block (sample-clocked note-offs)
+
+        # Preallocated per-block buffers
+        self._mix = np.zeros((block_size, 2), dtype=np.float32)
+        self._scratch = np.empty((block_size, 2), dtype=np.float32)
+        self._over = np.empty((block_size, 2), dtype=np.float32)
+        self._mask = np.empty((block_size, 2), dtype=bool)
+
+        self.blocks = 0
+        self.voices_started = 0
+        self.voices_stolen = 0
+        self.peak_voices = 0
+        self.block_cpu_ms = deque(maxlen=1000)
+
+    @property
+    def block_budget_ms(self) -> float:
+        return self.block_size / self.sample_rate * 1000
+
+    def set_gain(self, instrument: str, gain: float):
+        self.gains[instrument] = max(0.0, gain)
+
+    def play(self, samples: np.ndarray, instrument: str = "default", gain: float = 1.0, key=None) -> int:
+        """Start a voice (float32 or int16 (frames, 2) samples); a voice with the same key is restarted."""
+        with self._lock:
+            if key is not None:
+                self.voices = [voice for voice in self.voices if voice.key != key]
+            while len(self.voices) >= self.max_voices:
+                self._steal_locked()
+            voice = Voice(next(self._ids), samples, gain, instrument, key)
+            self.voices.append(voice)
+            self.voices_started += 1
+            self.peak_voices = max(self.peak_voices, len(self.voices))
+            return voice.id
+
+    def _steal_locked(self):
+        if self.steal == "quietest":
+            victim = min(self.voices, key=lambda voice: voice.level(self.block_size))
+            self.voices.remove(victim)
+        else:
+            self.voices.pop(0)
+        self.voices_stolen += 1
+
+    def stop(self, key=None, voice_id: int = None, instrument: str = None):
+        """Stop voices matching a key, a voice id or an instrument (nothing given: all voices)."""
+        with self._lock:
+            self.voices = [voice for voice in self.voices
+                           if not ((key is None and voice_id is None and instrument is None)
+                                   or (key is not None and voice.key == key)
+                                   or (voice_id is not None and voice.id == voice_id)
+                                   or (instrument is not None and voice.instrument == instrument))]
+
+    def release(self, fade_frames: int, key=None, instrument: str = None):
+        """Fade out voices matching a key or an instrument over ``fade_frames``."""
+        with self._lock:
+            for voice in self.voices:
+                if voice.fade_left is None and ((key is not None and voice.key == key)
+                                                or (instrument is not None and voice.instrument == instrument)):
+                    voice.fade_left = voice.fade_frames = max(1, fade_frames)
+
+    def render_block(self) -> np.ndarray:
+        """Mix the next block; the returned array is reused by the next call."""
+        started = time.thread_time()
+        scheduler = self.scheduler
+        if scheduler is not None:
+            scheduler.tick(self.block_size)  # Outside the lock: its actions may release voices
+        mix, scratch = self._mix, self._scratch
+        mix.fill(0.0)
+
+        with self._lock:
+            alive = []
+            for voice in self.voices:
+                count = min(self.block_size, len(voice.samples) - voice.position)
+                if voice.fade_left is not None:
+                    count = min(count, voice.fade_left)
+                if count > 0:
+                    gain = voice.gain * self.gains.get(voice.instrument, 1.0)
+                    np.multiply(voice.samples[voice.position:voice.position + count], gain, out=scratch[:count])
+                    if voice.fade_left is not None:
+                        ramp = np.linspace(voice.fade_left, voice.fade_left - count, count, endpoint=False,
+                                           dtype=np.float32) / voice.fade_frames
+                        scratch[:count] *= ramp[:, np.newaxis]
+                        voice.fade_left -= count
+                    mix[:count] += scratch[:count]
+                    voice.position += count
+                if not voice.finished:
+                    alive.append(voice)
+            self.voices = alive
+
+        self._soft_limit(mix)
+        self.blocks += 1
+        self.block_cpu_ms.append((time.thread_time() - started) * 1000)
+        return mix
+
+    def _soft_limit(self, mix: np.ndarray):
+        """Pass samples below the threshold; compress the excess with tanh so output stays within ±1."""
+        threshold = self.limiter_threshold
+        over, mask = self._over, self._mask
+        np.abs(mix, out=over)
+        np.greater(over, threshold, out=mask)
+        if not mask.any():
+            return
+        headroom = 1.0 - threshold
+        np.subtract(over, threshold, out=over)
+        np.divide(over, headroom, out=over)
+        np.tanh(over, out=over)
+        np.multiply(over, headroom, out=over)
+        np.add(over, threshold, out=over)
+        np.copysign(over, mix, out=over)
+        np.copyto(mix, over, where=mask)
+
+    def render(self, blocks: int):
+        """Render ``blocks`` blocks to the sink synchronously (offline renders, benchmarks)."""
+        for _ in range(blocks):
+            self.sink.write(self.render_block())
+
+    def start(self) -> "BlockMixer":
+        """Render to the sink on a background thread (paced by the sink, or by the clock)."""
+        if self._running:
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="block-mixer", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        period = self.block_size / self.sample_rate
+        next_block = time.monotonic()
+        while self._running:
+            self.sink.write(self.render_block())
+            if not self.sink.paced:
+                next_block += period
+                delay = next_block - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+
+    def stop_rendering(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+        self.sink.close()
+
+    def stats(self) -> dict:
+        cpu = list(self.block_cpu_ms)
+        avg = sum(cpu) / len(cpu) if cpu else 0.0
+        return {
+            "block_size": self.block_size,
+            "sample_rate": self.sample_rate,
+            "max_voices": self.max_voices,
+            "steal": self.steal,
+            "active_voices": len(self.voices),
+            "peak_voices": self.peak_voices,
+            "voices_started": self.voices_started,
+            "voices_stolen": self.voices_stolen,
+            "blocks": self.blocks,
+            "block_cpu_ms": {
+                "avg": round(avg, 4),
+                "max": round(max(cpu), 4) if cpu else 0.0,
+                "budget": round(self.block_budget_ms, 3),
+                "load": round(avg / self.block_budget_ms, 4),
+            },
+        }
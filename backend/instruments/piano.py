@@ -1,6 +1,6 @@
 from .base_instrument import BaseInstrument
-import pygame
 import logging
+from typing import List, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +15,7 @@ class Piano(BaseInstrument):
         # Try to load piano samples, fall back to generated tones
         notes = ["C", "D", "E", "F", "G", "A", "B"]
         octaves = [4, 5, 6]
+        missing = []
         
         for octave in octaves:
             for note in notes:
@@ -23,7 +24,11 @@ class Piano(BaseInstrument):
                 
                 # Try to load file, if not found, generate tone
                 if not self.load_sound_file(sound_name, filename):
-                    self.generate_tone(sound_name, self.note_to_frequency(note, octave))
+                    missing.append((sound_name, self.note_to_frequency(note, octave)))
+        
+        # Synthesize every missing note in one batched call
+        if missing:
+            self.generate_tones(missing)
     
     def setup_parameters(self):
         """Set up piano-specific parameters"""
@@ -74,42 +79,29 @@ class Piano(BaseInstrument):
         return base_freq * (2 ** (octave - 4))
     
     def generate_tone(self, sound_name: str, frequency: float, duration: float = 0.5):
-        """Generate a synthetic tone for missing sound files"""
+        """Generate a synthetic tone for a missing sound file"""
+        self.generate_tones([(sound_name, frequency)], duration)
+    
+    def generate_tones(self, notes: List[Tuple[str, float]], duration: float = 0.5):
+        """Generate synthetic tones for missing sound files, all notes at once"""
         try:
-            import numpy as np
-            
-            # Generate sine wave
-            sample_rate = 44100
-            frames = int(duration * sample_rate)
-            arr = np.zeros((frames, 2))
+            from .synthesis import PIANO_HARMONICS, SAMPLE_RATE, adsr, render_tones, to_pcm16
             
-            for i in range(frames):
-                time_point = i / sample_rate
-                # Add some harmonics for richer sound
-                wave = np.sin(2 * np.pi * frequency * time_point) * 0.3
-                wave += np.sin(2 * np.pi * frequency * 2 * time_point) * 0.1  # Octave
-                wave += np.sin(2 * np.pi * frequency * 3 * time_point) * 0.05  # Fifth
-                
-                # Apply envelope (attack, decay, sustain, release)
-                envelope = 1.0
-                if i < sample_rate * 0.01:  # Attack
-                    envelope = i / (sample_rate * 0.01)
-                elif i > frames - sample_rate * 0.1:  # Release
-                    envelope = (frames - i) / (sample_rate * 0.1)
-                
-                arr[i] = wave * envelope
+            params = {name: {"frequency": frequency, "duration": duration} for name, frequency in notes}
             
-            # Convert to pygame sound
-            arr = (arr * 32767).astype(np.int16)
-            sound = pygame.sndarray.make_sound(arr)
-            self.sounds[sound_name] = sound
+            def render(names):
+                # Harmonics for a richer sound, short attack and release
+                envelope = adsr(int(duration * SAMPLE_RATE), attack=0.01, release=0.1)
+                frequencies = [params[name]["frequency"] for name in names]
+                return to_pcm16(render_tones(frequencies, duration, PIANO_HARMONICS, envelope))
             
-            logger.info(f"Generated synthetic tone for {sound_name} at {frequency:.2f}Hz")
+            self.render_sounds(params, render)
+            logger.info(f"Loaded {len(params)} synthetic piano tones")
             
         except ImportError:
             logger.warning("NumPy not available, cannot generate synthetic tones")
         except Exception as e:
-            logger.error(f"Error generating tone for {sound_name}: {e}")
+            logger.error(f"Error generating piano tones: {e}")
     
     def get_available_gestures(self) -> list:
         """Return list of gestures this piano responds to"""
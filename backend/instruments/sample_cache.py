@@ -0,0 +1,153 @@
+"""
+Persistent on-disk cache of rendered instrument samples.
+
+Rendered tones and decoded sample files are stored as int16 ``.npy`` files,
+one per sound, and read back memory-mapped on later loads. Keys hash the
+instrument, the note, its synthesis parameters and SYNTHESIS_VERSION (or, for
+sample files, the source path, size and mtime), so changing any of them
+simply misses the cache. The directory is kept under a size limit by evicting
+the least recently used files; every hit refreshes the file's mtime.
+"""
+import hashlib
+import json
+import logging
+import os
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .synthesis import SYNTHESIS_VERSION
+
+logger = logging.getLogger(__name__)
+
+CACHE_FORMAT = 1
+CACHE_DIR = os.getenv("SAMPLE_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "vibevirtuoso", "samples"))
+MAX_CACHE_MB = float(os.getenv("SAMPLE_CACHE_MAX_MB", "256"))  # 0 disables the cache
+
+
+class SampleCache:
+    """Size-bounded LRU cache of int16 PCM arrays on disk."""
+
+    def __init__(self, directory: str = CACHE_DIR, max_mb: float = MAX_CACHE_MB):
+        self.directory = directory
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def key(self, instrument: str, note: str, **params) -> str:
+        """Cache key; file names start with the instrument so it can be invalidated on its own."""
+        payload = json.dumps({"format": CACHE_FORMAT, "synthesis": SYNTHESIS_VERSION, **params},
+                             sort_keys=True, default=str)
+        digest = hashlib.sha1(payload.encode()).hexdigest()[:16]
+        return f"{instrument}-{note}-{digest}"
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.npy")
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Memory-mapped array for ``key``, or None on a miss."""
+        if not self.enabled:
+            return None
+        path = self.path(key)
+        try:
+            pcm = np.load(path, mmap_mode="r")
+            os.utime(path)  # Mark as recently used
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return pcm
+
+    def put(self, key: str, pcm: np.ndarray, evict: bool = True):
+        if not self.enabled:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self.path(key)
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, "wb") as f:
+                np.save(f, np.ascontiguousarray(pcm, dtype=np.int16))
+            os.replace(temp_path, path)  # Atomic, so readers never see a partial file
+        except OSError as e:
+            logger.warning(f"Could not write sample cache entry {key}: {e}")
+            return
+        if evict:
+            self.evict()
+
+    def render(self, instrument: str, params: Dict[str, dict],
+               render: Callable[[List[str]], Sequence[np.ndarray]]) -> Dict[str, np.ndarray]:
+        """PCM for every note in ``params``; only cache misses are rendered, in one ``render(names)`` call."""
+        keys = {name: self.key(instrument, name, **note_params) for name, note_params in params.items()}
+        pcm = {name: self.get(key) for name, key in keys.items()}
+
+        missing = [name for name, samples in pcm.items() if samples is None]
+        if missing:
+            for name, samples in zip(missing, render(missing)):
+                pcm[name] = samples
+                self.put(keys[name], samples, evict=False)
+            self.evict()
+            logger.info(f"Rendered {len(missing)} {instrument} samples ({len(params) - len(missing)} cached)")
+        return pcm
+
+    def _entries(self) -> list:
+        entries = []
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.name.endswith(".npy"):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def evict(self) -> int:
+        """Remove least recently used files until the cache fits in ``max_bytes``."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        self.evictions += removed
+        return removed
+
+    def invalidate(self, instrument: Optional[str] = None) -> int:
+        """Delete cached samples for one instrument, or all of them."""
+        removed = 0
+        for _, _, path in self._entries():
+            if instrument is None or os.path.basename(path).startswith(f"{instrument}-"):
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
+
+    def stats(self) -> dict:
+        entries = self._entries()
+        return {
+            "directory": self.directory,
+            "enabled": self.enabled,
+            "files": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+# Global cache shared by all instruments
+sample_cache = SampleCache()
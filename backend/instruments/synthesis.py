@@ -0,0 +1,145 @@
+"""
+Vectorized synthesis for the fallback instrument sounds.
+
+Every buffer is built with whole-array NumPy ops instead of a per-sample
+Python loop. Tones are rendered as a (notes, frames) matrix so all the notes
+of an instrument come out of one call: each harmonic is one np.sin over the
+outer product of frequencies and the time axis, and envelopes are precomputed
+once per duration and broadcast across the notes.
+"""
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+SAMPLE_RATE = 44100
+
+# Bump whenever a renderer's output changes so cached samples are re-rendered
+SYNTHESIS_VERSION = 1
+
+# Timbres as (harmonic multiple, amplitude) pairs
+PIANO_HARMONICS = ((1, 0.3), (2, 0.1), (3, 0.05))
+GUITAR_HARMONICS = ((1, 0.3), (2, 0.15), (3, 0.1))
+FLUTE_HARMONICS = ((1, 0.4), (2, 0.1))
+
+
+def time_axis(frames: int, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    return np.arange(frames) / sample_rate
+
+
+def adsr(frames: int, attack: float = 0.0, decay: float = 0.0, sustain: float = 1.0,
+         release: float = 0.0, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Linear ADSR envelope over ``frames`` samples (times in seconds)."""
+    index = np.arange(frames, dtype=np.float64)
+    envelope = np.full(frames, sustain, dtype=np.float64)
+
+    attack_frames = attack * sample_rate
+    decay_frames = decay * sample_rate
+    release_frames = release * sample_rate
+
+    if decay_frames > 0:
+        decaying = (index >= attack_frames) & (index < attack_frames + decay_frames)
+        envelope[decaying] = 1.0 - (1.0 - sustain) * (index[decaying] - attack_frames) / decay_frames
+    if attack_frames > 0:
+        attacking = index < attack_frames
+        envelope[attacking] = index[attacking] / attack_frames
+    if release_frames > 0:
+        np.minimum(envelope, sustain * (frames - index) / release_frames, out=envelope)
+    return envelope
+
+
+def exponential_decay(frames: int, rate: float, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """exp(-rate * t) envelope."""
+    return np.exp(-rate * time_axis(frames, sample_rate))
+
+
+def additive(frequencies: Sequence[float], frames: int, harmonics: Iterable[Tuple[float, float]],
+             sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Sum of sine harmonics for every frequency at once; returns (len(frequencies), frames)."""
+    phase = 2 * np.pi * np.outer(np.asarray(frequencies, dtype=np.float64), time_axis(frames, sample_rate))
+    out = np.zeros_like(phase)
+    for multiple, amplitude in harmonics:
+        out += amplitude * np.sin(multiple * phase)
+    return out
+
+
+def render_tones(frequencies: Sequence[float], duration: float, harmonics: Iterable[Tuple[float, float]],
+                 envelope: np.ndarray = None, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Render one note per frequency, all sharing ``envelope``; returns (notes, frames) float64."""
+    frames = int(duration * sample_rate)
+    waves = additive(frequencies, frames, harmonics, sample_rate)
+    if envelope is not None:
+        waves *= envelope[:frames]
+    return waves
+
+
+def noise_burst(frames: int, std: float, decay_rate: float, rng: np.random.Generator = None,
+                sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Gaussian noise with an exponential decay envelope."""
+    rng = rng or np.random.default_rng()
+    return rng.normal(0.0, std, frames) * exponential_decay(frames, decay_rate, sample_rate)
+
+
+def highpass(signal: np.ndarray) -> np.ndarray:
+    """First-difference high-pass (removes the low end of a noise burst)."""
+    return np.diff(signal, prepend=0.0)
+
+
+def lowpass(signal: np.ndarray, width: int) -> np.ndarray:
+    """Moving-average low-pass via a cumulative sum (O(n) regardless of ``width``)."""
+    if width <= 1:
+        return signal
+    cumulative = np.cumsum(np.concatenate(([0.0], signal)))
+    out = np.empty_like(signal)
+    out[width:] = (cumulative[width + 1:] - cumulative[1:-width]) / width
+    out[:width] = cumulative[1:width + 1] / width
+    return out
+
+
+def bandpass(signal: np.ndarray, width: int) -> np.ndarray:
+    return highpass(lowpass(signal, width))
+
+
+def render_drum(drum_type: str, rng: np.random.Generator = None, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Render one synthetic drum hit as a mono float64 buffer."""
+    rng = rng or np.random.default_rng()
+
+    if drum_type == "kick":
+        # Low frequency sine wave with quick decay
+        frames = int(0.3 * sample_rate)
+        wave = np.sin(2 * np.pi * 60 * time_axis(frames, sample_rate)) * exponential_decay(frames, 15, sample_rate)
+        return wave * 0.8
+
+    if drum_type == "snare":
+        # Band-passed noise burst
+        frames = int(0.15 * sample_rate)
+        return bandpass(noise_burst(frames, 0.2, 20, rng, sample_rate), 4) * 0.6
+
+    if drum_type == "hihat":
+        # High-passed noise, very short
+        frames = int(0.1 * sample_rate)
+        return highpass(noise_burst(frames, 0.05, 50, rng, sample_rate)) * 0.4
+
+    # Generic percussive sound: random pitch plus a little noise
+    frames = int(0.2 * sample_rate)
+    frequency = 200 + int(rng.integers(0, 301))
+    envelope = exponential_decay(frames, 10, sample_rate)
+    wave = np.sin(2 * np.pi * frequency * time_axis(frames, sample_rate)) * envelope
+    wave += rng.normal(0.0, 0.1, frames) * envelope * 0.3
+    return wave * 0.5
+
+
+def render_drums(drum_types: Iterable[str], seed: Optional[int] = None,
+                 sample_rate: int = SAMPLE_RATE) -> Dict[str, np.ndarray]:
+    """Render a whole kit in one call."""
+    rng = np.random.default_rng(seed)
+    return {drum_type: render_drum(drum_type, rng, sample_rate) for drum_type in drum_types}
+
+
+def to_pcm16(waves: np.ndarray, channels: int = 2) -> np.ndarray:
+    """Float buffer(s) in [-1, 1] -> C-contiguous int16 with ``channels`` columns.
+
+    A (frames,) buffer becomes (frames, channels); a (notes, frames) matrix
+    becomes (notes, frames, channels).
+    """
+    pcm = np.clip(waves * 32767, -32767, 32767).astype(np.int16)
+    return np.ascontiguousarray(np.repeat(pcm[..., np.newaxis], channels, axis=-1))
@@ -0,0 +1,295 @@
+"""
+Background jobs for heavy recording work (mixing, transcoding, normalizing, waveforms).
+
+Jobs run on a process pool (JOB_WORKERS processes, spawned lazily) so long
+mixes never hold an HTTP worker. Every job has an ID with status and
+progress; workers report progress through a queue that a listener thread
+copies onto the Job.
+
+Results are cached by a hash of the job kind, its options, the content of
+its input files and the extensions of its outputs (which pick the format). Finished outputs are copied into JOB_CACHE_DIR/<key>/, so
+a later job overwriting the same output name cannot change what the cache
+serves. A repeated job returns the cached result immediately, with the
+cached files copied to the outputs it asked for.
+A job identical to one still running attaches to it instead of running twice.
+
+If a worker dies (out of memory, a crash in native code) the pool breaks:
+the jobs it was running fail and the next submit starts a fresh pool.
+"""
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = max(1, int(os.getenv("JOB_WORKERS", "2")))
+JOB_CACHE_DIR = os.path.join("recordings", ".jobs")
+MAX_FINISHED_JOBS = 200
+
+_progress_queue = None  # Set in each worker process
+
+
+def _init_worker(progress_queue):
+    global _progress_queue
+    _progress_queue = progress_queue
+
+
+def _run_task(task: Callable, job_id: str, inputs: List[str], outputs: List[str], options: dict) -> dict:
+    """Worker-process entry point: runs ``task`` with a progress reporter bound to the job."""
+    def report(fraction: float):
+        try:
+            _progress_queue.put_nowait((job_id, fraction))
+        except Exception:
+            pass  # Progress is best-effort
+
+    report(0.0)
+    return task(inputs, outputs, options, report)
+
+
+class Job:
+    """One submitted job and its status."""
+
+    def __init__(self, kind: str, inputs: List[str], outputs: List[str], options: dict, cache_key: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.inputs = inputs
+        self.outputs = outputs
+        self.options = options
+        self.cache_key = cache_key
+        self.status = "queued"  # queued -> running -> done | error
+        self.progress = 0.0
+        self.cached = False
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.done = threading.Event()
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": round(self.progress, 4),
+            "cached": self.cached,
+            "outputs": [os.path.basename(path) for path in self.outputs],
+            "result": self.result,
+            "error": self.error,
+            "queued_seconds": round((self.started or self.finished or time.time()) - self.created, 3),
+            "run_seconds": round((self.finished or time.time()) - self.started, 3) if self.started else None,
+        }
+
+
+class JobQueue:
+    """Process-pool job runner with content-hash result caching."""
+
+    def __init__(self, tasks: Dict[str, Callable], max_workers: int = JOB_WORKERS, cache_dir: str = JOB_CACHE_DIR):
+        self.tasks = tasks
+        self.max_workers = max_workers
+        self.cache_dir = cache_dir
+        self.jobs: Dict[str, Job] = {}
+        self._running_by_key: Dict[str, Job] = {}
+        self._file_hashes = {}  # (path, size, mtime_ns) -> sha256
+        self._cache = None
+        self._executor = None
+        self._progress = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> ProcessPoolExecutor:
+        executor = self._executor
+        if executor is not None:
+            return executor
+        with self._lock:
+            if self._executor is None:
+                # Spawned, not forked: the server process has synth and camera threads
+                context = multiprocessing.get_context("spawn")
+                if self._progress is None:
+                    self._progress = context.Queue()
+                    threading.Thread(target=self._listen_progress, name="job-progress", daemon=True).start()
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context,
+                                                     initializer=_init_worker, initargs=(self._progress,))
+                logger.info(f"Started job pool with {self.max_workers} workers")
+            return self._executor
+
+    def _discard_pool(self, executor: ProcessPoolExecutor):
+        """Drop a broken pool so the next submit starts a new one."""
+        with self._lock:
+            if self._executor is not executor:
+                return  # Already replaced
+            self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+        logger.warning("Job pool broke (a worker died); starting a new one")
+
+    def _listen_progress(self):
+        while True:
+            message = self._progress.get()
+            if message is None:
+                return
+            job = self.jobs.get(message[0])
+            if job is None or job.finished is not None:
+                continue
+            if job.status == "queued":  # First report comes from the worker picking the job up
+                job.status, job.started = "running", time.time()
+            job.progress = max(job.progress, min(1.0, message[1]))
+
+    # Result cache
+
+    def _file_hash(self, path: str) -> str:
+        stat = os.stat(path)
+        memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        digest = self._file_hashes.get(memo_key)
+        if digest is None:
+            sha = hashlib.sha256()
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    sha.update(block)
+            digest = self._file_hashes[memo_key] = sha.hexdigest()
+        return digest
+
+    def cache_key(self, kind: str, inputs: List[str], outputs: List[str], options: dict) -> str:
+        payload = json.dumps({"kind": kind, "options": options,
+                              "inputs": [self._file_hash(path) for path in inputs],
+                              "outputs": [os.path.splitext(path)[1].lower() for path in outputs]}, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _cache_path(self) -> str:
+        return os.path.join(self.cache_dir, "cache.json")
+
+    def _load_cache(self) -> dict:
+        if self._cache is None:
+            try:
+                with open(self._cache_path()) as f:
+                    self._cache = json.load(f)
+            except (OSError, ValueError):
+                self._cache = {}
+        return self._cache
+
+    def _save_cache(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_path = f"{self._cache_path()}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(self._cache, f)
+        os.replace(temp_path, self._cache_path())
+
+    def _store_outputs(self, key: str, outputs: List[str]) -> List[str]:
+        """Copy a finished job's outputs into the cache; returns the cached copies."""
+        directory = os.path.join(self.cache_dir, key)
+        os.makedirs(directory, exist_ok=True)
+        files = []
+        for i, path in enumerate(outputs):
+            cached_path = os.path.join(directory, f"{i}{os.path.splitext(path)[1]}")
+            shutil.copyfile(path, f"{cached_path}.tmp")
+            os.replace(f"{cached_path}.tmp", cached_path)
+            files.append(cached_path)
+        return files
+
+    def _cached_result(self, key: str, outputs: List[str]) -> Optional[dict]:
+        entry = self._load_cache().get(key)
+        if entry is None or "files" not in entry or not all(os.path.exists(path) for path in entry["files"]):
+            return None
+        for cached_path, path in zip(entry["files"], outputs):
+            shutil.copyfile(cached_path, path)
+        return entry["result"]
+
+    # Jobs
+
+    def submit(self, kind: str, inputs: List[str], outputs: List[str], options: Optional[dict] = None) -> Job:
+        """Queue a job (or answer it from the cache); returns immediately."""
+        if kind not in self.tasks:
+            raise ValueError(f"Unknown job kind: {kind}")
+        options = options or {}
+        key = self.cache_key(kind, inputs, outputs, options)
+
+        with self._lock:
+            running = self._running_by_key.get(key)
+            if running is not None and running.outputs == outputs:
+                return running
+
+            job = Job(kind, inputs, outputs, options, key)
+            self.jobs[job.id] = job
+            self._trim_finished_locked()
+
+            result = self._cached_result(key, outputs)
+            if result is not None:
+                job.status, job.progress, job.cached, job.result = "done", 1.0, True, result
+                job.started = job.finished = time.time()
+                job.done.set()
+                return job
+            self._running_by_key[key] = job
+
+        for attempt in range(2):
+            executor = self._ensure_started()
+            try:
+                future = executor.submit(_run_task, self.tasks[kind], job.id, inputs, outputs, options)
+                break
+            except BrokenProcessPool as e:
+                self._discard_pool(executor)
+                if attempt:
+                    self._complete(job, None, None, e)
+                    return job
+        future.add_done_callback(lambda f: self._finish(job, executor, f))
+        return job
+
+    def _finish(self, job: Job, executor: ProcessPoolExecutor, future):
+        try:
+            result = future.result()
+            files = self._store_outputs(job.cache_key, job.outputs)
+            error = None
+        except BrokenProcessPool as e:
+            self._discard_pool(executor)
+            result, files, error = None, None, e
+        except Exception as e:
+            result, files, error = None, None, e
+        self._complete(job, result, files, error)
+
+    def _complete(self, job: Job, result: Optional[dict], files: Optional[List[str]], error: Optional[Exception]):
+        with self._lock:
+            self._running_by_key.pop(job.cache_key, None)
+            if error is None:
+                job.result = result
+                job.status, job.progress = "done", 1.0
+                self._load_cache()[job.cache_key] = {"files": files, "result": result}
+                self._save_cache()
+            else:
+                job.status, job.error = "error", str(error)
+                logger.error(f"Job {job.id} ({job.kind}) failed: {error}")
+            job.finished = time.time()
+            job.started = job.started or job.finished
+        job.done.set()
+
+    def _trim_finished_locked(self):
+        finished = [job for job in self.jobs.values() if job.finished is not None]
+        for job in sorted(finished, key=lambda j: j.finished)[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.jobs[job.id]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    def stats(self) -> dict:
+        by_status = {}
+        for job in list(self.jobs.values()):
+            by_status[job.status] = by_status.get(job.status, 0) + 1
+        return {
+            "workers": self.max_workers,
+            "started": self._executor is not None,
+            "jobs": by_status,
+            "cached_results": len(self._load_cache()),
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self._progress is not None:
+            self._progress.put(None)
+            self._progress = None
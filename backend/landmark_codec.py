@@ -0,0 +1,151 @@
+"""
+Compact landmark encoding for gesture_detected responses.
+
+Instead of 21 ``{"x", "y", "z"}`` dicts per hand, landmarks are packed into a
+small binary blob that is either sent as a binary WebSocket message or embedded
+in the JSON response as one base64 string.
+
+Blob layout (little-endian):
+
+    header   <BBBBf : version, format, hand count, flags, scale
+    per hand <I     : bitmask of landmarks included (bit i = landmark i)
+             values : 3 values (x, y, z) per included landmark,
+                      float32 or int16 (value = int16 * scale)
+
+With FLAG_DELTA set, only landmarks that moved more than the connection's
+threshold since the last sent frame are included; the client keeps the rest.
+A full keyframe is sent when the hand count changes and every KEYFRAME_INTERVAL
+responses.
+"""
+import base64
+import math
+import struct
+from typing import Optional
+
+import numpy as np
+
+CODEC_VERSION = 1
+
+FORMAT_JSON = "json"
+FORMAT_FLOAT32 = "float32"
+FORMAT_INT16 = "int16"
+
+FORMAT_IDS = {FORMAT_FLOAT32: 1, FORMAT_INT16: 2}
+FORMAT_DTYPES = {FORMAT_FLOAT32: np.float32, FORMAT_INT16: np.int16}
+
+TRANSPORT_BINARY = "binary"
+TRANSPORT_BASE64 = "base64"
+
+FLAG_DELTA = 0x01
+
+NUM_LANDMARKS = 21
+FULL_MASK = (1 << NUM_LANDMARKS) - 1
+INT16_SCALE = 1.0 / 10000  # 0.0001 resolution, covers normalized coords in [-3.2, 3.2]
+KEYFRAME_INTERVAL = 30
+
+BLOB_HEADER = struct.Struct("<BBBBf")
+HAND_MASK = struct.Struct("<I")
+
+# Binary gesture result message: <BBHI version, message type, reserved, JSON length
+MSG_GESTURE_RESULT = 2
+RESULT_HEADER = struct.Struct("<BBHI")
+
+
+def landmarks_to_dicts(landmark_array: np.ndarray) -> list:
+    """Legacy JSON representation: one list of {"x","y","z"} dicts per hand."""
+    return [[{"x": x, "y": y, "z": z} for x, y, z in hand] for hand in landmark_array.tolist()]
+
+
+class LandmarkEncoder:
+    """Per-connection encoder holding the last landmarks the client has seen."""
+
+    def __init__(self, fmt: str = FORMAT_FLOAT32, transport: str = TRANSPORT_BASE64,
+                 delta_threshold: Optional[float] = None):
+        if fmt not in FORMAT_IDS:
+            raise ValueError(f"Unsupported landmark format: {fmt}")
+        if transport not in (TRANSPORT_BINARY, TRANSPORT_BASE64):
+            raise ValueError(f"Unsupported landmark transport: {transport}")
+        self.format = fmt
+        self.transport = transport
+        if delta_threshold is not None:
+            try:
+                delta_threshold = float(delta_threshold)
+            except (TypeError, ValueError):
+                raise ValueError(f"Invalid delta threshold: {delta_threshold!r}")
+            if not math.isfinite(delta_threshold) or delta_threshold < 0:
+                raise ValueError(f"Invalid delta threshold: {delta_threshold!r}")
+        self.delta_threshold = delta_threshold
+        self.last_sent: Optional[np.ndarray] = None
+        self.since_keyframe = 0
+
+    def encode(self, landmark_array: np.ndarray) -> bytes:
+        """Encode a (hands, 21, 3) array, as a delta when possible."""
+        current = np.asarray(landmark_array, dtype=np.float32).reshape(-1, NUM_LANDMARKS, 3)
+        hands = current.shape[0]
+
+        use_delta = (
+            self.delta_threshold is not None
+            and self.last_sent is not None
+            and self.last_sent.shape == current.shape
+            and self.since_keyframe < KEYFRAME_INTERVAL
+        )
+
+        if use_delta:
+            moved = np.abs(current - self.last_sent).max(axis=2) > self.delta_threshold
+            # Client state only changes for landmarks we actually send
+            sent = self.last_sent.copy()
+            sent[moved] = current[moved]
+            self.last_sent = sent
+            self.since_keyframe += 1
+        else:
+            moved = np.ones((hands, NUM_LANDMARKS), dtype=bool)
+            self.last_sent = current.copy()
+            self.since_keyframe = 0
+
+        flags = FLAG_DELTA if use_delta else 0
+        scale = INT16_SCALE if self.format == FORMAT_INT16 else 1.0
+        parts = [BLOB_HEADER.pack(CODEC_VERSION, FORMAT_IDS[self.format], hands, flags, scale)]
+
+        bit_weights = 1 << np.arange(NUM_LANDMARKS, dtype=np.uint32)
+        for hand in range(hands):
+            mask = int((moved[hand] * bit_weights).sum())
+            values = current[hand][moved[hand]]
+            if self.format == FORMAT_INT16:
+                values = np.clip(np.rint(values / INT16_SCALE), -32768, 32767).astype("<i2")
+            else:
+                values = values.astype("<f4")
+            parts.append(HAND_MASK.pack(mask))
+            parts.append(values.tobytes())
+        return b"".join(parts)
+
+    def encode_base64(self, landmark_array: np.ndarray) -> str:
+        return base64.b64encode(self.encode(landmark_array)).decode("ascii")
+
+
+def decode_landmarks(blob: bytes, previous: Optional[np.ndarray] = None) -> np.ndarray:
+    """Decode a blob into a (hands, 21, 3) float32 array (reference implementation for clients)."""
+    version, format_id, hands, flags, scale = BLOB_HEADER.unpack_from(blob)
+    if version != CODEC_VERSION:
+        raise ValueError(f"Unsupported landmark codec version: {version}")
+    dtype = np.dtype("<i2") if format_id == FORMAT_IDS[FORMAT_INT16] else np.dtype("<f4")
+
+    if flags & FLAG_DELTA and previous is not None:
+        result = np.array(previous, dtype=np.float32, copy=True)
+    else:
+        result = np.zeros((hands, NUM_LANDMARKS, 3), dtype=np.float32)
+
+    offset = BLOB_HEADER.size
+    for hand in range(hands):
+        (mask,) = HAND_MASK.unpack_from(blob, offset)
+        offset += HAND_MASK.size
+        indices = [i for i in range(NUM_LANDMARKS) if mask & (1 << i)]
+        count = len(indices) * 3
+        values = np.frombuffer(blob, dtype=dtype, count=count, offset=offset).reshape(-1, 3)
+        offset += count * dtype.itemsize
+        result[hand, indices] = values.astype(np.float32) * scale
+    return result
+
+
+def pack_result_message(metadata: bytes, blob: bytes) -> bytes:
+    """Binary gesture result: header + JSON metadata + landmark blob."""
+    return RESULT_HEADER.pack(CODEC_VERSION, MSG_GESTURE_RESULT, 0, len(metadata)) + metadata + blob
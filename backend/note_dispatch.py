@@ -0,0 +1,141 @@
+"""
+Single-writer dispatch of note events to the synth.
+
+HTTP /play requests, batched events and gestures detected on /ws/gesture all
+put NoteEvents on one queue. Callers never block and never touch the synth.
+A single writer thread owns every handle_gesture() call, so the module-level
+note state in gesture_control is only ever mutated from one thread.
+
+Batched events keep their relative timing: the first event plays immediately
+and later ones are delayed by their timestamp offset (client clock, ms).
+"""
+import heapq
+import itertools
+import logging
+import queue
+import threading
+import time
+from typing import Callable, List, NamedTuple, Optional
+
+from inference_pool import LatencyStats
+from scripts.gesture_control import handle_gesture
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_SPAN = 2.0  # seconds; later events in a batch are clamped to this offset
+
+_STOP = object()
+
+
+class NoteEvent(NamedTuple):
+    due: float          # time.monotonic() deadline
+    sequence: int       # Tie-breaker keeping submission order for equal deadlines
+    gesture: str
+    instrument: str
+    intensity: float
+    source: str         # "http", "batch" or "ws"
+    submitted: float
+
+
+class NoteDispatcher:
+    """Queue of note events drained by one writer thread."""
+
+    def __init__(self, play: Callable[[str, str, float], str] = handle_gesture):
+        self.play = play
+        self._queue = queue.SimpleQueue()
+        self._sequence = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.played = 0
+        self.errors = 0
+        self.by_source = {}
+        self.dispatch_latency = LatencyStats()
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="note-dispatch", daemon=True)
+                self._thread.start()
+
+    def submit(self, gesture: str, instrument: str, intensity: float = 1.0,
+               delay: float = 0.0, source: str = "http"):
+        """Queue one note event; returns immediately."""
+        self._ensure_started()
+        now = time.monotonic()
+        self._queue.put(NoteEvent(now + max(0.0, delay), next(self._sequence), gesture, instrument,
+                                  intensity, source, now))
+        self.submitted += 1
+        self.by_source[source] = self.by_source.get(source, 0) + 1
+
+    def submit_batch(self, events: List[dict]) -> int:
+        """Queue timestamped events, preserving their spacing relative to the earliest one."""
+        timestamps = [event.get("timestamp") for event in events if event.get("timestamp") is not None]
+        base = min(timestamps) if timestamps else None
+        for event in events:
+            offset = 0.0
+            if base is not None and event.get("timestamp") is not None:
+                offset = min((event["timestamp"] - base) / 1000, MAX_BATCH_SPAN)
+            self.submit(event["gesture"], event["instrument"], event.get("intensity", 1.0),
+                        delay=offset, source="batch")
+        return len(events)
+
+    def _run(self):
+        pending = []  # Heap of events waiting for their deadline
+        while True:
+            timeout = max(0.0, pending[0].due - time.monotonic()) if pending else None
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                return
+            if item is not None:
+                heapq.heappush(pending, item)
+                # Drain whatever else arrived so a burst is handled in one pass
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        return
+                    heapq.heappush(pending, item)
+
+            now = time.monotonic()
+            while pending and pending[0].due <= now:
+                self._play(heapq.heappop(pending), now)
+
+    def _play(self, event: NoteEvent, now: float):
+        try:
+            self.play(event.gesture, event.instrument, event.intensity)
+            self.played += 1
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Note dispatch failed for {event.gesture} on {event.instrument}: {e}")
+        self.dispatch_latency.add((now - event.due) * 1000)
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def stats(self) -> dict:
+        return {
+            "submitted": self.submitted,
+            "played": self.played,
+            "errors": self.errors,
+            "queued": self.queue_depth(),
+            "by_source": dict(self.by_source),
+            "dispatch_latency": self.dispatch_latency.summary(),
+        }
+
+    def shutdown(self):
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join(timeout=1)
+            self._thread = None
+
+
+# Global dispatcher shared by /play and /ws/gesture
+note_dispatcher = NoteDispatcher()
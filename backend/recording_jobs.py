@@ -0,0 +1,91 @@
+"""
+Job tasks for recordings, run in job_queue worker processes.
+
+Every task has the signature ``task(inputs, outputs, options, report)`` and
+returns a JSON-serialisable result dict. ``report(fraction)`` sends progress
+back to the server. Audio is processed in chunks straight from memory-mapped
+inputs (recording_mixer.WavSource), so memory use does not grow with length.
+"""
+import json
+import math
+import os
+import subprocess
+
+import numpy as np
+
+from job_queue import JobQueue
+from recording_mixer import CHUNK_FRAMES, WavSource, mix_wav_files, to_channels
+from recording_peaks import load_peaks
+from scripts.wav_stream import StreamingWavWriter
+
+WAVEFORM_POINTS = 2000
+
+
+def mix_task(inputs, outputs, options, report) -> dict:
+    return mix_wav_files(inputs, outputs[0], gains=options.get("gains"), progress=report)
+
+
+def normalize_task(inputs, outputs, options, report) -> dict:
+    """Two passes: find the peak, then write with the gain that puts it at ``target_dbfs``."""
+    source = WavSource(inputs[0])
+    target = 10 ** (options.get("target_dbfs", -1.0) / 20)
+
+    peak = 0.0
+    for start in range(0, source.frames, CHUNK_FRAMES):
+        peak = max(peak, float(np.abs(source.read(start, min(CHUNK_FRAMES, source.frames - start))).max()))
+        report(0.5 * (start + CHUNK_FRAMES) / max(source.frames, 1))
+
+    gain = target / peak if peak > 0 else 1.0
+    writer = StreamingWavWriter(outputs[0], source.sample_rate, source.channels)
+    try:
+        for start in range(0, source.frames, CHUNK_FRAMES):
+            block = source.read(start, min(CHUNK_FRAMES, source.frames - start)) * gain
+            writer.write((np.clip(block, -1.0, 1.0) * 32767).astype(np.int16))
+            report(0.5 + 0.5 * (start + CHUNK_FRAMES) / max(source.frames, 1))
+    finally:
+        writer.close()
+    return {"peak_before": round(peak, 4), "gain_db": round(20 * math.log10(gain), 2) if gain > 0 else None}
+
+
+def transcode_task(inputs, outputs, options, report) -> dict:
+    """WAV targets are resampled/remixed in-process; other formats go through ffmpeg."""
+    if not outputs[0].lower().endswith(".wav"):
+        subprocess.run(["ffmpeg", "-y", "-loglevel", "error", "-i", inputs[0], outputs[0]], check=True)
+        return {"format": os.path.splitext(outputs[0])[1].lstrip("."), "size": os.path.getsize(outputs[0])}
+
+    source = WavSource(inputs[0])
+    rate = int(options.get("sample_rate", source.sample_rate))
+    channels = int(options.get("channels", source.channels))
+    total = math.ceil(source.frames * rate / source.sample_rate)
+
+    writer = StreamingWavWriter(outputs[0], rate, channels)
+    try:
+        for start in range(0, total, CHUNK_FRAMES):
+            count = min(CHUNK_FRAMES, total - start)
+            block = to_channels(source.read_resampled(start, count, rate), channels)
+            writer.write((np.clip(block, -1.0, 1.0) * 32767).astype(np.int16))
+            report((start + count) / total)
+    finally:
+        writer.close()
+    return {"format": "wav", "sample_rate": rate, "channels": channels, "duration_seconds": round(total / rate, 3)}
+
+
+def waveform_task(inputs, outputs, options, report) -> dict:
+    """Min/max envelope of the file at ``points`` buckets, written as JSON (from the peak index)."""
+    peaks = load_peaks(inputs[0], progress=report)
+    waveform = peaks.query(0.0, None, int(options.get("points", WAVEFORM_POINTS)))
+    with open(outputs[0], "w") as f:
+        json.dump(waveform, f)
+    return {"points": waveform["points"], "frames_per_point": waveform["frames_per_point"]}
+
+
+RECORDING_TASKS = {
+    "mix": mix_task,
+    "normalize": normalize_task,
+    "transcode": transcode_task,
+    "waveform": waveform_task,
+}
+
+
+# Global job queue used by the /jobs and /recording/mix endpoints
+job_queue = JobQueue(RECORDING_TASKS)
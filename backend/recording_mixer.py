@@ -0,0 +1,182 @@
+"""
+Streaming, memory-mapped mixer for recordings.
+
+Inputs are memory-mapped WAV files (8/16/24/32-bit PCM or 32/64-bit float,
+mono or multichannel), so nothing is read until a chunk needs it. The mix is
+produced in fixed-size chunks:
+
+- every input chunk is converted to float32 and mapped to the output channel
+  layout (mono is copied to both sides)
+- inputs whose sample rate differs from the output rate are resampled by
+  linear interpolation, computed per output chunk straight from the memory map
+- each track is scaled by an equal-power gain (1/sqrt(N) by default) and
+  the sum goes through a soft limiter instead of being divided by N
+
+Chunks are written to the output WAV as they are produced, so peak memory
+depends on the chunk size, not on the length or number of takes.
+"""
+import logging
+import math
+import struct
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+
+from scripts.wav_stream import StreamingWavWriter
+
+logger = logging.getLogger(__name__)
+
+CHUNK_FRAMES = 65536
+LIMITER_THRESHOLD = 0.9
+
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_IEEE_FLOAT = 3
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+class WavSource:
+    """A WAV file's data chunk, memory-mapped and read as float32 frames."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            riff, _, wave_id = struct.unpack("<4sI4s", f.read(12))
+            if riff != b"RIFF" or wave_id != b"WAVE":
+                raise ValueError(f"{path} is not a WAV file")
+            fmt = None
+            while True:
+                header = f.read(8)
+                if len(header) < 8:
+                    raise ValueError(f"{path} has no data chunk")
+                chunk_id, size = struct.unpack("<4sI", header)
+                if chunk_id == b"fmt ":
+                    fmt = f.read(size)
+                elif chunk_id == b"data":
+                    data_offset = f.tell()
+                    break
+                else:
+                    f.seek(size, 1)
+                if size % 2:
+                    f.seek(1, 1)  # Chunks are word-aligned
+            file_size = f.seek(0, 2)
+
+        if fmt is None:
+            raise ValueError(f"{path} has no fmt chunk")
+        format_tag, self.channels, self.sample_rate, _, block_align, self.bits = struct.unpack("<HHIIHH", fmt[:16])
+        if format_tag == WAVE_FORMAT_EXTENSIBLE:
+            format_tag = struct.unpack("<H", fmt[24:26])[0]  # First two bytes of the sub-format GUID
+
+        # Streaming writers can leave the data size unpatched; trust the file length instead
+        size = min(size, file_size - data_offset) if size else file_size - data_offset
+        self.frames = size // block_align
+        width = self.bits // 8
+
+        if format_tag == WAVE_FORMAT_IEEE_FLOAT and self.bits in (32, 64):
+            dtype, self._scale, self._offset = np.dtype(f"<f{width}"), 1.0, 0.0
+        elif format_tag == WAVE_FORMAT_PCM and self.bits == 8:
+            dtype, self._scale, self._offset = np.dtype(np.uint8), 1 / 128, 128.0
+        elif format_tag == WAVE_FORMAT_PCM and self.bits in (16, 32):
+            dtype, self._scale, self._offset = np.dtype(f"<i{width}"), 1 / 2 ** (self.bits - 1), 0.0
+        elif format_tag == WAVE_FORMAT_PCM and self.bits == 24:
+            dtype, self._scale, self._offset = np.dtype(np.uint8), 1 / 2 ** 23, 0.0
+        else:
+            raise ValueError(f"{path}: unsupported WAV format {format_tag} with {self.bits} bits")
+
+        shape = (self.frames, self.channels, 3) if self.bits == 24 else (self.frames, self.channels)
+        self._data = np.memmap(path, dtype=dtype, mode="r", offset=data_offset, shape=shape) if self.frames else None
+
+    @property
+    def duration(self) -> float:
+        return self.frames / self.sample_rate
+
+    def read(self, start: int, count: int) -> np.ndarray:
+        """Frames [start, start + count) as float32 in [-1, 1]; past the end reads as silence."""
+        out = np.zeros((count, self.channels), dtype=np.float32)
+        end = min(start + count, self.frames)
+        if self._data is None or end <= start:
+            return out
+        raw = self._data[start:end]
+        if self.bits == 24:
+            raw = raw.astype(np.int32)
+            raw = (raw[..., 0] | (raw[..., 1] << 8) | (raw[..., 2] << 16)) << 8 >> 8  # Sign-extend
+        out[:end - start] = (raw.astype(np.float32) - self._offset) * self._scale
+        return out
+
+    def read_resampled(self, out_start: int, count: int, out_rate: int) -> np.ndarray:
+        """Output frames [out_start, out_start + count) at ``out_rate`` (linear interpolation)."""
+        if self.sample_rate == out_rate:
+            return self.read(out_start, count)
+        positions = (out_start + np.arange(count)) * (self.sample_rate / out_rate)
+        first = int(positions[0])
+        source = self.read(first, int(positions[-1]) - first + 2)
+        offsets = np.arange(len(source))
+        return np.stack([np.interp(positions - first, offsets, source[:, c]) for c in range(self.channels)],
+                        axis=1).astype(np.float32)
+
+
+def to_channels(block: np.ndarray, channels: int) -> np.ndarray:
+    if block.shape[1] == channels:
+        return block
+    if block.shape[1] == 1:
+        return np.repeat(block, channels, axis=1)
+    if channels == 1:
+        return block.mean(axis=1, keepdims=True)
+    return block[:, :channels]
+
+
+def soft_limit(mix: np.ndarray, threshold: float = LIMITER_THRESHOLD) -> int:
+    """Bend samples above ``threshold`` with tanh so they stay within ±1; returns how many were limited."""
+    over = np.abs(mix) > threshold
+    limited = int(np.count_nonzero(over))
+    if limited:
+        headroom = 1.0 - threshold
+        excess = (np.abs(mix[over]) - threshold) / headroom
+        mix[over] = np.copysign(threshold + headroom * np.tanh(excess), mix[over])
+    return limited
+
+
+def mix_wav_files(paths: Sequence[str], output_path: str, gains: Optional[List[float]] = None,
+                  chunk_frames: int = CHUNK_FRAMES,
+                  progress: Optional[Callable[[float], None]] = None) -> dict:
+    """Mix WAV files chunk by chunk into a 16-bit WAV at the highest input rate."""
+    sources = [WavSource(path) for path in paths]
+    if not sources:
+        raise ValueError("No recordings to mix")
+
+    out_rate = max(source.sample_rate for source in sources)
+    out_channels = min(max(source.channels for source in sources), 2)
+    total = max(math.ceil(source.frames * out_rate / source.sample_rate) for source in sources)
+    if gains is None:
+        gains = [1 / math.sqrt(len(sources))] * len(sources)  # Equal-power staging
+
+    writer = StreamingWavWriter(output_path, out_rate, out_channels)
+    mix = np.empty((chunk_frames, out_channels), dtype=np.float32)
+    peak, limited = 0.0, 0
+    try:
+        for start in range(0, total, chunk_frames):
+            count = min(chunk_frames, total - start)
+            block = mix[:count]
+            block.fill(0.0)
+            for source, gain in zip(sources, gains):
+                block += to_channels(source.read_resampled(start, count, out_rate), out_channels) * gain
+
+            peak = max(peak, float(np.abs(block).max()))
+            limited += soft_limit(block)
+            writer.write((block * 32767).astype(np.int16))
+
+            if progress is not None:
+                progress((start + count) / total)
+    finally:
+        writer.close()
+
+    resampled = [source.path for source in sources if source.sample_rate != out_rate]
+    logger.info(f"🎚️ Mixed {len(sources)} recordings → {output_path} ({total / out_rate:.1f}s)")
+    return {
+        "tracks": len(sources),
+        "sample_rate": out_rate,
+        "channels": out_channels,
+        "duration_seconds": round(total / out_rate, 3),
+        "resampled": len(resampled),
+        "peak_before_limiter": round(peak, 4),
+        "limited_samples": limited,
+    }
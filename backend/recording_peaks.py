@@ -0,0 +1,184 @@
+"""
+Multi-resolution waveform peaks for recordings.
+
+Drawing a waveform should not need the whole WAV. The first time peaks are
+asked for, the file is scanned once in chunks (memory-mapped through
+recording_mixer.WavSource) and a min/max pair is kept for every
+BASE_FRAMES frames, across all channels. Coarser levels are built from that
+one, each PEAK_LEVEL_FACTOR times coarser, until a level fits in
+MIN_LEVEL_POINTS.
+
+All levels are stored as int16 in one ``<wav>.peaks.npy`` file, with the
+level offsets and the WAV's size/mtime in ``<wav>.peaks.json``. A changed
+WAV is rescanned on the next request. A query picks the coarsest level
+that still has at least one bucket per requested point and reduces it to
+exactly the number of points asked for. Zooms closer than BASE_FRAMES per
+point read the frames straight from the WAV.
+"""
+import json
+import logging
+import math
+import os
+import threading
+from typing import Callable, Optional
+
+import numpy as np
+
+from recording_mixer import CHUNK_FRAMES, WavSource
+
+logger = logging.getLogger(__name__)
+
+BASE_FRAMES = 256
+PEAK_LEVEL_FACTOR = 4
+MIN_LEVEL_POINTS = 1024
+PEAKS_VERSION = 1
+
+_build_locks = {}
+_build_locks_lock = threading.Lock()
+
+
+def peaks_paths(filepath: str):
+    """(data, index) paths of the peak files for a recording."""
+    return f"{filepath}.peaks.npy", f"{filepath}.peaks.json"
+
+
+def remove_peaks(filepath: str):
+    for path in peaks_paths(filepath):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _to_int16(values: np.ndarray) -> np.ndarray:
+    return np.clip(np.round(values * 32767), -32768, 32767).astype(np.int16)
+
+
+def _reduce(peaks: np.ndarray, factor: int) -> np.ndarray:
+    """Merge every ``factor`` consecutive (min, max) buckets into one."""
+    count = math.ceil(len(peaks) / factor)
+    padded = np.concatenate([peaks, np.repeat(peaks[-1:], count * factor - len(peaks), axis=0)])
+    grouped = padded.reshape(count, factor, 2)
+    return np.stack([grouped[:, :, 0].min(axis=1), grouped[:, :, 1].max(axis=1)], axis=1)
+
+
+class Peaks:
+    """The peak levels of one recording (memory-mapped)."""
+
+    def __init__(self, filepath: str, index: dict, data: np.ndarray):
+        self.filepath = filepath
+        self.sample_rate = index["sample_rate"]
+        self.channels = index["channels"]
+        self.frames = index["frames"]
+        self.levels = index["levels"]  # [{"frames_per_peak", "offset", "count"}], finest first
+        self._data = data
+
+    @property
+    def duration(self) -> float:
+        return self.frames / self.sample_rate
+
+    def level(self, i: int) -> np.ndarray:
+        level = self.levels[i]
+        return self._data[level["offset"]:level["offset"] + level["count"]]
+
+    def query(self, start: float = 0.0, end: Optional[float] = None, points: int = 2000) -> dict:
+        """``points`` min/max pairs covering ``start``..``end`` seconds, as floats in [-1, 1]."""
+        end = self.duration if end is None else min(end, self.duration)
+        start = max(0.0, min(start, end))
+        first, last = int(start * self.sample_rate), int(math.ceil(end * self.sample_rate))
+        points = max(1, min(points, last - first)) if last > first else 0
+        result = {"sample_rate": self.sample_rate, "start": round(first / self.sample_rate, 6),
+                  "end": round(last / self.sample_rate, 6), "points": points}
+        if points == 0:
+            return {**result, "frames_per_point": 0, "level": None, "min": [], "max": []}
+
+        frames_per_point = (last - first) / points
+        # Point edges in frames; each point covers [edges[i], edges[i + 1])
+        edges = first + np.floor(np.arange(points + 1) * frames_per_point).astype(np.int64)
+
+        if frames_per_point < BASE_FRAMES:
+            block = WavSource(self.filepath).read(first, last - first)
+            values = np.stack([block.min(axis=1), block.max(axis=1)], axis=1)
+            starts, level_index = edges[:-1] - first, None
+        else:
+            level_index = max(i for i, level in enumerate(self.levels)
+                              if level["frames_per_peak"] <= frames_per_point)
+            size = self.levels[level_index]["frames_per_peak"]
+            starts = edges[:-1] // size
+            values = self.level(level_index)[starts[0]:math.ceil(last / size)].astype(np.float32) / 32767
+            starts = starts - starts[0]
+
+        minimums = np.minimum.reduceat(values[:, 0], starts)
+        maximums = np.maximum.reduceat(values[:, 1], starts)
+        return {**result, "frames_per_point": round(frames_per_point, 3), "level": level_index,
+                "min": minimums.round(4).tolist(), "max": maximums.round(4).tolist()}
+
+
+def build_peaks(filepath: str, progress: Optional[Callable[[float], None]] = None) -> Peaks:
+    """Scan the WAV once and write its peak files."""
+    source = WavSource(filepath)
+    stat = os.stat(filepath)
+
+    chunk = CHUNK_FRAMES - CHUNK_FRAMES % BASE_FRAMES  # Whole buckets per chunk
+    base = []
+    for start in range(0, source.frames, chunk):
+        count = min(chunk, source.frames - start)
+        block = source.read(start, math.ceil(count / BASE_FRAMES) * BASE_FRAMES)  # Pads with silence
+        buckets = block.reshape(-1, BASE_FRAMES * source.channels)
+        base.append(np.stack([buckets.min(axis=1), buckets.max(axis=1)], axis=1))
+        if progress is not None:
+            progress((start + count) / source.frames)
+
+    levels = [_to_int16(np.concatenate(base)) if base else np.zeros((0, 2), dtype=np.int16)]
+    while len(levels[-1]) > MIN_LEVEL_POINTS:
+        levels.append(_reduce(levels[-1], PEAK_LEVEL_FACTOR))
+
+    index = {
+        "version": PEAKS_VERSION,
+        "source_size": stat.st_size,
+        "source_mtime_ns": stat.st_mtime_ns,
+        "sample_rate": source.sample_rate,
+        "channels": source.channels,
+        "frames": source.frames,
+        "levels": [],
+    }
+    offset = 0
+    for i, level in enumerate(levels):
+        index["levels"].append({"frames_per_peak": BASE_FRAMES * PEAK_LEVEL_FACTOR ** i,
+                                "offset": offset, "count": len(level)})
+        offset += len(level)
+
+    data_path, index_path = peaks_paths(filepath)
+    np.save(f"{data_path}.tmp.npy", np.concatenate(levels))
+    os.replace(f"{data_path}.tmp.npy", data_path)
+    with open(f"{index_path}.tmp", "w") as f:
+        json.dump(index, f)
+    os.replace(f"{index_path}.tmp", index_path)  # Written last: marks the data as complete
+
+    logger.info(f"📈 Built {len(levels)} peak levels for {filepath}")
+    return Peaks(filepath, index, np.load(data_path, mmap_mode="r"))
+
+
+def _load_index(filepath: str) -> Optional[dict]:
+    data_path, index_path = peaks_paths(filepath)
+    try:
+        with open(index_path) as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    stat = os.stat(filepath)
+    if (index.get("version") != PEAKS_VERSION or index.get("source_size") != stat.st_size
+            or index.get("source_mtime_ns") != stat.st_mtime_ns or not os.path.exists(data_path)):
+        return None
+    return index
+
+
+def load_peaks(filepath: str, progress: Optional[Callable[[float], None]] = None) -> Peaks:
+    """Peaks for a recording, built on first use and rebuilt if the WAV changed."""
+    index = _load_index(filepath)
+    if index is None:
+        with _build_locks_lock:
+            lock = _build_locks.setdefault(os.path.abspath(filepath), threading.Lock())
+        with lock:  # One build per file; concurrent requests wait for it
+            index = _load_index(filepath)
+            if index is None:
+                return build_peaks(filepath, progress)
+    return Peaks(filepath, index, np.load(peaks_paths(filepath)[0], mmap_mode="r"))
@@ -0,0 +1,239 @@
+# audio_backend.py
+"""
+Audio output selection for the synth layer.
+
+AUDIO_DRIVER (env, or the ``driver`` argument) picks how the shared synth
+reaches the speakers:
+
+- a FluidSynth driver name (pulseaudio, alsa, jack, coreaudio, ...): FluidSynth
+  runs its own audio thread
+- "sounddevice": a render thread writes blocks to the PortAudio output
+- "file": blocks are rendered to a WAV file (AUDIO_FILE)
+- "null": blocks are rendered and discarded, so the synth still does all of
+  its work on machines without a sound card
+- "auto" (default): sounddevice, then the platform's usual drivers, then "null"
+
+A comma-separated list ("pulseaudio,alsa,null") is tried in order. For the
+render outputs (sounddevice, file, null) every block also goes to the
+registered taps, and render time is measured against real time.
+"""
+import os
+import sys
+import threading
+import time
+import wave
+
+import numpy as np
+
+AUDIO_DRIVER = os.getenv("AUDIO_DRIVER", "auto")
+AUDIO_FILE = os.getenv("AUDIO_FILE", os.path.join("recordings", "synth_output.wav"))
+SAMPLE_RATE = 44100
+BLOCK_SIZE = 512
+
+PLATFORM_DRIVERS = {
+    "darwin": ["coreaudio"],
+    "linux": ["pulseaudio", "pipewire", "alsa", "jack"],
+    "win32": ["wasapi", "dsound"],
+}
+
+def driver_candidates(driver: str = AUDIO_DRIVER) -> list:
+    """Drivers to try, in order."""
+    if not driver or driver == "auto":
+        # Render drivers first so the output can be tapped (scripts/synth_recorder.py)
+        return ["sounddevice"] + PLATFORM_DRIVERS.get(sys.platform, []) + ["null"]
+    return [name.strip() for name in driver.split(",") if name.strip()]
+
+
+class NullSink:
+    """Discards rendered blocks."""
+
+    paced = False
+
+    def write(self, block: np.ndarray):
+        pass
+
+    def close(self):
+        pass
+
+
+class WavSink:
+    """Writes interleaved int16 stereo blocks to a WAV file."""
+
+    paced = False
+
+    def __init__(self, path: str = AUDIO_FILE, sample_rate: int = SAMPLE_RATE):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._wav = wave.open(path, "wb")
+        self._wav.setnchannels(2)
+        self._wav.setsampwidth(2)
+        self._wav.setframerate(sample_rate)
+
+    def write(self, block: np.ndarray):
+        self._wav.writeframes(block.tobytes())
+
+    def close(self):
+        self._wav.close()
+
+
+class SoundDeviceSink:
+    """Plays blocks on the default PortAudio device; write() blocks, which paces rendering."""
+
+    paced = True
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE, block_size: int = BLOCK_SIZE):
+        import sounddevice as sd
+        self._stream = sd.RawOutputStream(samplerate=sample_rate, channels=2, dtype="int16", blocksize=block_size)
+        self._stream.start()
+
+    def write(self, block: np.ndarray):
+        self._stream.write(block.tobytes())
+
+    def close(self):
+        self._stream.stop()
+        self._stream.close()
+
+
+class AudioOutput:
+    """Where the synth's audio goes."""
+
+    driver = ""
+    taps_supported = False
+    scheduler = None  # Render outputs call scheduler.tick(frames) before each block
+
+    def add_tap(self, tap):
+        raise RuntimeError(f"The {self.driver} driver plays directly; use a render driver to tap the output")
+
+    def remove_tap(self, tap):
+        pass
+
+    def stats(self) -> dict:
+        return {"driver": self.driver}
+
+    def close(self):
+        pass
+
+
+class DriverOutput(AudioOutput):
+    """FluidSynth's own audio driver thread plays the synth."""
+
+    def __init__(self, synth, driver: str):
+        synth.start(driver=driver)
+        if getattr(synth, "audio_driver", True) is None:
+            raise RuntimeError(f"FluidSynth could not open the {driver} driver")
+        self.driver = driver
+
+
+class RenderOutput(AudioOutput):
+    """Pulls fixed-size blocks from the synth on a thread and hands them to a sink and to taps.
+
+    Taps are callables receiving each interleaved int16 block.
+    Unless the sink paces itself, rendering is paced to real time when ``paced``;
+    unpaced rendering runs as fast as the synth can go (throughput measurements).
+    """
+
+    taps_supported = True
+
+    def __init__(self, synth, sink, driver: str, block_size: int = BLOCK_SIZE,
+                 sample_rate: int = SAMPLE_RATE, paced: bool = True):
+        self.synth = synth
+        self.sink = sink
+        self.driver = driver
+        self.block_size = block_size
+        self.sample_rate = sample_rate
+        self.paced = paced and not sink.paced
+        self.taps = []
+        self.frames = 0
+        self.render_seconds = 0.0
+        self._started = time.monotonic()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=f"audio-{driver}", daemon=True)
+        self._thread.start()
+
+    def add_tap(self, tap):
+        self.taps = self.taps + [tap]  # Copy-on-write: the render thread iterates without a lock
+
+    def remove_tap(self, tap):
+        self.taps = [t for t in self.taps if t is not tap]
+
+    def render_block(self) -> np.ndarray:
+        scheduler = self.scheduler
+        if scheduler is not None:
+            scheduler.tick(self.block_size)
+        started = time.perf_counter()
+        block = self.synth.get_samples(self.block_size)
+        self.render_seconds += time.perf_counter() - started
+        self.frames += self.block_size
+        return block
+
+    def _run(self):
+        period = self.block_size / self.sample_rate
+        next_block = time.monotonic()
+        while self._running:
+            block = self.render_block()
+            self.sink.write(block)
+            for tap in self.taps:
+                tap(block)
+            if self.paced:
+                next_block += period
+                delay = next_block - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    next_block = time.monotonic()  # Fell behind: don't try to catch up in a burst
+
+    def stats(self) -> dict:
+        audio_seconds = self.frames / self.sample_rate
+        return {
+            "driver": self.driver,
+            "block_size": self.block_size,
+            "paced": self.paced,
+            "rendered_seconds": round(audio_seconds, 3),
+            "render_cpu_seconds": round(self.render_seconds, 3),
+            "realtime_factor": round(audio_seconds / self.render_seconds, 1) if self.render_seconds else 0.0,
+            "uptime_seconds": round(time.monotonic() - self._started, 3),
+        }
+
+    def close(self):
+        self._running = False
+        self._thread.join(timeout=1)
+        self.sink.close()
+
+
+def open_audio_output(synth, driver: str = AUDIO_DRIVER, paced: bool = True) -> AudioOutput:
+    """Start the first driver in ``driver`` that opens successfully."""
+    errors = []
+    for candidate in driver_candidates(driver):
+        try:
+            if candidate == "null":
+                output = RenderOutput(synth, NullSink(), "null", paced=paced)
+            elif candidate == "file":
+                output = RenderOutput(synth, WavSink(), "file", paced=paced)
+            elif candidate == "sounddevice":
+                output = RenderOutput(synth, SoundDeviceSink(), "sounddevice")
+            else:
+                output = DriverOutput(synth, candidate)
+        except Exception as e:
+            errors.append(f"{candidate}: {e}")
+            continue
+        if errors:
+            print(f"⚠️ Audio drivers unavailable ({'; '.join(errors)})")
+        print(f"🔊 Audio output: {output.driver}")
+        return output
+    raise RuntimeError(f"No audio driver could be opened: {'; '.join(errors)}")
+
+
+def measure_throughput(synth, seconds: float = 10.0, block_size: int = BLOCK_SIZE) -> dict:
+    """Render ``seconds`` of audio as fast as possible (no driver, no pacing) and time it."""
+    blocks = int(seconds * SAMPLE_RATE / block_size)
+    started = time.perf_counter()
+    for _ in range(blocks):
+        synth.get_samples(block_size)
+    elapsed = time.perf_counter() - started
+    rendered = blocks * block_size / SAMPLE_RATE
+    return {
+        "rendered_seconds": round(rendered, 3),
+        "wall_seconds": round(elapsed, 3),
+        "realtime_factor": round(rendered / elapsed, 1) if elapsed else 0.0,
+        "block_ms": round(elapsed / blocks * 1000, 4) if blocks else 0.0,
+    }
@@ -0,0 +1,64 @@
+# engine_control.py
+"""
+Control channel for the running instrument engine.
+
+The engine process (scripts/main.py) serves small dict commands on a local Unix
+socket, so the API can switch instruments in place instead of killing and
+respawning the process. The socket is private and authenticated (see
+local_socket.py). Only the standard library is imported here so the FastAPI
+backend can use it without loading cv2, mediapipe or FluidSynth.
+"""
+import os
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener
+from typing import Callable, Optional
+
+try:
+    import local_socket
+except ImportError:  # Imported as scripts.engine_control from the backend
+    from scripts import local_socket
+
+ENGINE_SOCKET = os.getenv("INSTRUMENT_ENGINE_SOCKET") or local_socket.socket_path("engine.sock")
+
+
+def send_engine_command(command: dict, timeout: float = 1.0) -> Optional[dict]:
+    """Send one command to the engine; None if no engine is listening or it did not answer."""
+    try:
+        conn = local_socket.connect(ENGINE_SOCKET)
+    except (OSError, EOFError, AuthenticationError):
+        return None
+    with conn:
+        try:
+            conn.send(command)
+            if not conn.poll(timeout):
+                return None
+            return conn.recv()
+        except (EOFError, OSError):
+            return None  # The engine went away mid-command
+
+
+def serve_engine_commands(handler: Callable[[dict], dict]) -> Listener:
+    """Answer commands with ``handler`` on a background thread; stop with ``stop_engine_commands``."""
+    listener = local_socket.listen(ENGINE_SOCKET)
+
+    def serve():
+        while True:
+            try:
+                conn = local_socket.accept(listener)
+            except OSError:
+                break
+            if conn is None:
+                continue  # Failed authentication
+            with conn:
+                try:
+                    conn.send(handler(conn.recv()))
+                except (EOFError, OSError):
+                    pass
+
+    threading.Thread(target=serve, name="engine-control", daemon=True).start()
+    return listener
+
+
+def stop_engine_commands(listener: Listener):
+    local_socket.close(listener, ENGINE_SOCKET)
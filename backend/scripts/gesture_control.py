@@ -1,88 +1,59 @@
-import fluidsynth
 import os
 
-print("🎹 Initializing FluidSynth audio system...")
+from scripts.note_scheduler import NoteScheduler
+from scripts.note_maps import (CHORD_DURATION, CHORD_MAP, DRUM_DURATION, DRUM_MAP, DRUMS_VOICE, INSTRUMENT_PROGRAMS,
+                               MELODIC_DURATION, MELODY_DURATION, MELODY_MAP, PIANO_VOICE, STRINGS_VOICE)
 
-# Load SoundFont path
-SF2_PATH = os.path.join("sounds", "FluidR3_GM.sf2")
+# "fluidsynth" renders live; "sample_bank" mixes buffers pre-rendered by scripts/sample_bank.py
+PLAYBACK_ENGINE = os.getenv("PLAYBACK_ENGINE", "fluidsynth")
 
-# Global synth instances
+print(f"🎹 Initializing audio system ({PLAYBACK_ENGINE})...")
+
+# Channel handles on the shared synth engine (one SoundFont load for all instruments)
+synth_engine = None
 piano_synth = None
 strings_synth = None
+drum_kit = None
+
+def create_playback_engine():
+    """The shared synth engine, or the sample bank player when configured and built"""
+    if PLAYBACK_ENGINE == "sample_bank":
+        from scripts.sample_bank import SampleBank, SampleBankPlayer
+        if not SampleBank.exists():
+            print("⚠️ Sample bank not built (python -m scripts.sample_bank), falling back to FluidSynth")
+        else:
+            try:
+                return SampleBankPlayer(SampleBank()).start()
+            except Exception as e:
+                print(f"⚠️ Sample bank player failed to start ({e}), falling back to FluidSynth")
+    
+    from scripts.synth_engine import SF2_PATH, get_synth_engine
+    return get_synth_engine(SF2_PATH)
 
 def initialize_synths():
-    """Initialize FluidSynth synthesizers"""
-    global piano_synth, strings_synth
+    """Initialize the playback engine and the piano, strings and drum channels"""
+    global synth_engine, piano_synth, strings_synth, drum_kit
     
     try:
-        # Piano synth
-        piano_synth = fluidsynth.Synth()
-        piano_synth.start(driver="coreaudio")
-        
-        if os.path.exists(SF2_PATH):
-            piano_sf2 = piano_synth.sfload(SF2_PATH)
-            piano_synth.program_select(0, piano_sf2, 0, 0)  # Acoustic Grand Piano
-            print("✅ Piano synth initialized with soundfont")
-        else:
-            print(f"⚠️ Soundfont not found at {SF2_PATH}, using default")
-        
-        # Strings synth for chords
-        strings_synth = fluidsynth.Synth()
-        strings_synth.start(driver="coreaudio")
-        
-        if os.path.exists(SF2_PATH):
-            strings_sf2 = strings_synth.sfload(SF2_PATH)
-            strings_synth.program_select(1, strings_sf2, 0, 48)  # Strings
-            print("✅ Strings synth initialized with soundfont")
-        
+        synth_engine = create_playback_engine()
+        piano_synth = synth_engine.channel("piano", program=PIANO_VOICE[1])      # Acoustic Grand Piano
+        strings_synth = synth_engine.channel("strings", program=STRINGS_VOICE[1])  # Strings
+        drum_kit = synth_engine.channel("drums", program=DRUMS_VOICE[1], bank=DRUMS_VOICE[0])  # Drum kit (channel 9)
+        print("✅ Piano, strings and drum channels ready on the shared engine")
         return True
     except Exception as e:
-        print(f"❌ Failed to initialize FluidSynth: {e}")
+        print(f"❌ Failed to initialize audio engine: {e}")
         return False
 
 # Initialize on module load
 synths_initialized = initialize_synths()
 
-# Piano melody mapping (right hand)
-MELODY_MAP = {
-    "fist": 60,      # C4
-    "point": 62,     # D4
-    "peace": 64,     # E4
-    "three": 65,     # F4
-    "four": 67,      # G4
-    "open_hand": 69  # A4
-}
-
-# Chord mapping (left hand)
-CHORD_MAP = {
-    "point": [60, 64, 67],   # C Major
-    "peace": [62, 65, 69],   # D Minor
-    "three": [65, 69, 72],   # F Major
-    "four": [67, 71, 74],    # G Major
-    "open_hand": [69, 72, 76]  # A Minor
-}
-
-# Drums mapping
-DRUM_MAP = {
-    "fist": 36,      # Kick
-    "point": 38,     # Snare
-    "peace": 42,     # Hi-hat
-    "three": 49,     # Crash
-    "four": 47,      # Tom
-    "open_hand": 51  # Ride
-}
-
-# Instrument programs for FluidSynth
-INSTRUMENT_PROGRAMS = {
-    "piano": 0,      # Acoustic Grand Piano
-    "guitar": 24,    # Acoustic Guitar
-    "flute": 73,     # Flute
-    "violin": 40,    # Violin
-    "saxophone": 64  # Soprano Sax
-}
-
 last_notes = {}  # Track last played notes per instrument
 
+# Note-offs ride the engine's sample clock when its output renders blocks; otherwise one
+# thread serves every pending note-off (no sleeper thread per note)
+note_scheduler = (synth_engine.clocked_scheduler() if synths_initialized else None) or NoteScheduler().start()
+
 def handle_gesture(gesture: str, instrument: str, intensity: float = 1.0) -> str:
     """Handle gesture with ORIGINAL FluidSynth system"""
     
@@ -106,31 +77,24 @@ def handle_piano_gesture(gesture: str, intensity: float) -> str:
     """Handle piano with melody + chords like original"""
     global last_notes
     
-    # Stop previous notes
+    # Stop previous notes (and their pending note-offs)
     if "piano_melody" in last_notes:
-        piano_synth.noteoff(0, last_notes["piano_melody"])
+        note_scheduler.cancel_note_off(piano_synth, last_notes["piano_melody"])
+        piano_synth.noteoff(last_notes["piano_melody"])
     if "piano_chord" in last_notes:
         for note in last_notes["piano_chord"]:
-            strings_synth.noteoff(1, note)
+            note_scheduler.cancel_note_off(strings_synth, note)
+            strings_synth.noteoff(note)
     
     # Play melody note
     if gesture in MELODY_MAP:
         note = MELODY_MAP[gesture]
         velocity = int(120 * intensity)
-        piano_synth.noteon(0, note, velocity)
+        piano_synth.noteon(note, velocity)
         last_notes["piano_melody"] = note
         
         # Auto turn off melody note after short duration
-        import threading
-        def turn_off_melody():
-            import time
-            time.sleep(0.5)  # Shorter piano notes
-            try:
-                piano_synth.noteoff(0, note)
-            except:
-                pass  # Ignore if synth is already stopped
-        
-        threading.Thread(target=turn_off_melody, daemon=True).start()
+        note_scheduler.note_off(piano_synth, note, MELODY_DURATION)
         print(f"🎹 Piano note: {note}")
     
     # Play chord if applicable  
@@ -138,21 +102,12 @@ def handle_piano_gesture(gesture: str, intensity: float) -> str:
         chord = CHORD_MAP[gesture]
         velocity = int(90 * intensity)
         for note in chord:
-            strings_synth.noteon(1, note, velocity)
+            strings_synth.noteon(note, velocity)
         last_notes["piano_chord"] = chord
         
         # Auto turn off chord notes after longer duration
-        import threading
-        def turn_off_chord():
-            import time
-            time.sleep(1.5)  # Shorter chord duration
-            try:
-                for note in chord:
-                    strings_synth.noteoff(1, note)
-            except:
-                pass  # Ignore if synth is already stopped
-        
-        threading.Thread(target=turn_off_chord, daemon=True).start()
+        for note in chord:
+            note_scheduler.note_off(strings_synth, note, CHORD_DURATION)
         print(f"🎻 Piano chord: {chord}")
     
     return f"Played {gesture} on piano"
@@ -163,18 +118,10 @@ def handle_drums_gesture(gesture: str, intensity: float) -> str:
         drum_note = DRUM_MAP[gesture]
         velocity = int(127 * intensity)
         
-        # Use piano synth for drums (channel 9 is drums in GM)
-        piano_synth.program_select(9, 0, 128, 0)  # Drum kit
-        piano_synth.noteon(9, drum_note, velocity)
-        
-        # Add a small delay then turn off for percussive effect
-        import threading
-        def turn_off_drum():
-            import time
-            time.sleep(0.1)
-            piano_synth.noteoff(9, drum_note)
+        drum_kit.noteon(drum_note, velocity)
         
-        threading.Thread(target=turn_off_drum, daemon=True).start()
+        # Turn off shortly after for percussive effect (a retrigger replaces the pending note-off)
+        note_scheduler.note_off(drum_kit, drum_note, DRUM_DURATION)
         
         print(f"🥁 Drum: {drum_note}")
         return f"Played {gesture} on drums"
@@ -185,43 +132,26 @@ def handle_melodic_gesture(gesture: str, instrument: str, intensity: float) -> s
     """Handle other melodic instruments"""
     global last_notes
     
-    # Use different channels for different instruments to avoid conflicts
-    channel_map = {
-        "guitar": 2,
-        "flute": 3, 
-        "violin": 4,
-        "saxophone": 5
-    }
-    
-    channel = channel_map.get(instrument, 2)
+    # Each instrument gets its own channel with its program selected once
+    channel_name = instrument if instrument in INSTRUMENT_PROGRAMS else "guitar"
+    channel = synth_engine.channel(channel_name, program=INSTRUMENT_PROGRAMS[channel_name])
     
     # Stop previous note for this instrument
     if instrument in last_notes:
-        piano_synth.noteoff(channel, last_notes[instrument])
+        note_scheduler.cancel_note_off(channel, last_notes[instrument])
+        channel.noteoff(last_notes[instrument])
     
     if gesture in MELODY_MAP:
         note = MELODY_MAP[gesture]
         velocity = int(120 * intensity)
         
-        # Set instrument program on the correct channel
-        if instrument in INSTRUMENT_PROGRAMS:
-            program = INSTRUMENT_PROGRAMS[instrument]
-            piano_synth.program_select(channel, 0, 0, program)
-            print(f"🎼 Set {instrument} program {program} on channel {channel}")
-        
-        piano_synth.noteon(channel, note, velocity)
+        channel.noteon(note, velocity)
         last_notes[instrument] = note
         
         # Auto turn off note after short duration for cleaner playback
-        import threading
-        def turn_off_note():
-            import time
-            time.sleep(1.5)  # Let note play for 1.5 seconds
-            piano_synth.noteoff(channel, note)
-        
-        threading.Thread(target=turn_off_note, daemon=True).start()
+        note_scheduler.note_off(channel, note, MELODIC_DURATION)
         
-        print(f"🎵 {instrument}: note {note} on channel {channel}")
+        print(f"🎵 {instrument}: note {note} on channel {channel.channel}")
         return f"Played {gesture} on {instrument}"
     
     return f"Unknown gesture for {instrument}: {gesture}"
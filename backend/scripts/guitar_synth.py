@@ -1,19 +1,17 @@
-import fluidsynth
+from synth_engine import get_synth_engine
 
 class GuitarSynth:
     def __init__(self, sf2_path="./sounds/FluidR3_GM.sf2", program=25):  # Steel acoustic
-        self.fs = fluidsynth.Synth()
-        self.fs.start(driver="coreaudio")
-        self.sfid = self.fs.sfload(sf2_path)
-        self.fs.program_select(0, self.sfid, 0, program)
+        self.channel = get_synth_engine(sf2_path).channel("guitar", program=program)
         self.current_note = None
 
     def strum(self, midi_note, velocity=100):
         print(f"🎸 STRUM → MIDI note: {midi_note}")
-        self.fs.noteon(0, midi_note, velocity)
+        self.channel.noteon(midi_note, velocity)
 
     def stop_note(self, midi_note):
-        self.fs.noteoff(0, midi_note)
+        self.channel.noteoff(midi_note)
 
     def delete(self):
-        self.fs.delete()
+        # The shared engine outlives individual instruments
+        self.channel.all_notes_off()
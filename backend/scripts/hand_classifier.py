@@ -0,0 +1,140 @@
+# hand_classifier.py
+"""
+Shared, vectorized hand gesture classifier.
+
+MediaPipe results are converted once into a (hands, 21, 3) NumPy array and
+every rule below runs on all hands (or a whole batch of frames) at once.
+
+Two finger rules are provided because the code base uses both:
+- count_extended_fingers: the simple tip-above-PIP rule used by the
+  gesture_*.py instrument scripts
+- classify_gestures: the confidence-weighted rule used by the WebSocket server
+"""
+import numpy as np
+
+NUM_LANDMARKS = 21
+
+WRIST = 0
+THUMB_IP, THUMB_TIP = 3, 4
+FINGER_TIPS = [8, 12, 16, 20]   # Index, Middle, Ring, Pinky
+FINGER_PIPS = [6, 10, 14, 18]   # Joint two below each tip
+
+GESTURE_NAMES = ["fist", "point", "peace", "three", "four", "open_hand"]
+
+# WebSocket classifier tuning
+THUMB_SPREAD = 1.2         # Thumb tip must be this much further from the wrist than its IP joint
+FINGER_MARGIN = 0.02       # Tip must be this far above the PIP joint
+THUMB_WEIGHT = 0.15
+FINGER_WEIGHT = 0.2
+MIN_CONFIDENCE = 0.2
+FIST_BONUS = 0.3
+OPEN_HAND_BONUS = 0.2
+
+
+def landmarks_to_array(multi_hand_landmarks) -> np.ndarray:
+    """Convert MediaPipe multi_hand_landmarks into a (hands, 21, 3) float32 array."""
+    if not multi_hand_landmarks:
+        return np.zeros((0, NUM_LANDMARKS, 3), dtype=np.float32)
+    return np.array(
+        [[(lm.x, lm.y, lm.z) for lm in hand.landmark] for hand in multi_hand_landmarks],
+        dtype=np.float32,
+    )
+
+
+def handedness_labels(results) -> list:
+    """MediaPipe's "Left"/"Right" label for each detected hand."""
+    if not results.multi_handedness:
+        return []
+    return [hand.classification[0].label for hand in results.multi_handedness]
+
+
+def is_right_hand(landmarks: np.ndarray) -> np.ndarray:
+    """Screen-side handedness (mirrored frame): wrist on the right half of the image."""
+    return np.asarray(landmarks)[..., WRIST, 0] > 0.5
+
+
+def finger_extension(landmarks: np.ndarray) -> np.ndarray:
+    """(..., 5) bool: thumb, index, middle, ring, pinky extended (instrument script rule)."""
+    points = np.asarray(landmarks, dtype=np.float64)
+    thumb = points[..., THUMB_TIP, 0] < points[..., THUMB_IP, 0]
+    fingers = points[..., FINGER_TIPS, 1] < points[..., FINGER_PIPS, 1]
+    return np.concatenate([thumb[..., None], fingers], axis=-1)
+
+
+def count_extended_fingers(landmarks: np.ndarray) -> np.ndarray:
+    """Number of extended fingers per hand (instrument script rule)."""
+    return finger_extension(landmarks).sum(axis=-1)
+
+
+def classify_gestures(landmarks: np.ndarray) -> dict:
+    """Confidence-weighted classification of every hand in ``landmarks``.
+
+    Returns arrays shaped like the leading dimensions of ``landmarks``:
+    ``extended`` (..., 5), ``count``, ``confidence`` and ``valid`` (confidence
+    reached MIN_CONFIDENCE before the fist/open-hand bonus).
+    """
+    points = np.asarray(landmarks, dtype=np.float64)
+    wrist_x = points[..., WRIST, 0]
+
+    thumb = (np.abs(points[..., THUMB_TIP, 0] - wrist_x)
+             > np.abs(points[..., THUMB_IP, 0] - wrist_x) * THUMB_SPREAD)
+    fingers = points[..., FINGER_TIPS, 1] < points[..., FINGER_PIPS, 1] - FINGER_MARGIN
+    extended = np.concatenate([thumb[..., None], fingers], axis=-1)
+
+    # Accumulate in finger order so confidences match the original per-finger loop exactly
+    confidence = np.where(thumb, THUMB_WEIGHT, 0.0)
+    for finger in range(fingers.shape[-1]):
+        confidence = confidence + np.where(fingers[..., finger], FINGER_WEIGHT, 0.0)
+
+    count = extended.sum(axis=-1)
+    valid = confidence >= MIN_CONFIDENCE
+    confidence = np.where(count == 0, np.minimum(confidence + FIST_BONUS, 1.0), confidence)
+    confidence = np.where(count == 5, np.minimum(confidence + OPEN_HAND_BONUS, 1.0), confidence)
+
+    return {
+        "extended": extended,
+        "count": count,
+        "confidence": np.minimum(confidence, 1.0),
+        "valid": valid,
+    }
+
+
+def gesture_results(landmarks: np.ndarray, min_confidence: float = 0.0) -> list:
+    """Gesture dicts ({name, fingers, count, confidence}) for the hands in one frame."""
+    return [gesture for _, gesture in gesture_results_with_index(landmarks, min_confidence)]
+
+
+def classify_batch(frames: list, min_confidence: float = 0.0) -> list:
+    """Classify many frames in one vectorized pass.
+
+    ``frames`` is a list of (hands, 21, 3) arrays (hand count may vary per
+    frame); returns one list of gesture dicts per frame.
+    """
+    if not frames:
+        return []
+    counts = [len(frame) for frame in frames]
+    stacked = np.concatenate([np.asarray(frame, dtype=np.float32).reshape(-1, NUM_LANDMARKS, 3)
+                              for frame in frames])
+    flat = gesture_results_with_index(stacked, min_confidence)
+
+    per_frame = [[] for _ in frames]
+    boundaries = np.cumsum(counts)
+    for hand_index, gesture in flat:
+        per_frame[int(np.searchsorted(boundaries, hand_index, side="right"))].append(gesture)
+    return per_frame
+
+
+def gesture_results_with_index(landmarks: np.ndarray, min_confidence: float = 0.0) -> list:
+    """Like gesture_results, but yields (hand index, gesture dict) pairs."""
+    classified = classify_gestures(landmarks)
+    keep = classified["valid"] & (classified["confidence"] > min_confidence)
+    pairs = []
+    for hand_index in np.flatnonzero(keep).tolist():
+        count = int(classified["count"][hand_index])
+        pairs.append((hand_index, {
+            "name": GESTURE_NAMES[count],
+            "fingers": np.flatnonzero(classified["extended"][hand_index]).tolist(),
+            "count": count,
+            "confidence": float(classified["confidence"][hand_index]),
+        }))
+    return pairs
@@ -0,0 +1,386 @@
+# hand_tracking_service.py
+"""
+Shared camera capture and hand tracking service.
+
+One process opens the webcam and runs MediaPipe Hands once per frame. Each
+frame's landmarks, handedness and finger counts are published as a HandFrame
+to in-process subscribers and, over a private authenticated Unix socket (see
+local_socket.py), to instrument scripts running in other processes. The latest camera images live in a small shared
+memory ring so subscribers can draw a preview without touching the camera.
+
+Run standalone with ``python scripts/hand_tracking_service.py``. Instrument
+scripts call ``open_hand_stream()``, which connects to a running service or
+starts one in-process when there is none.
+"""
+import os
+import queue
+import threading
+import time
+from multiprocessing import AuthenticationError, resource_tracker, shared_memory
+from typing import List, NamedTuple, Optional
+
+import cv2
+import numpy as np
+
+import local_socket
+from hand_classifier import count_extended_fingers, handedness_labels, landmarks_to_array
+
+SOCKET_PATH = os.getenv("HAND_SERVICE_SOCKET") or local_socket.socket_path("hands.sock")
+
+RING_SLOTS = 2           # Writer fills one slot while readers copy the other
+RING_HEADER_BYTES = 8    # int64 sequence of the newest complete image
+
+# MediaPipe's HAND_CONNECTIONS, so subscribers can draw without importing mediapipe
+HAND_CONNECTIONS = [
+    (0, 1), (1, 2), (2, 3), (3, 4),
+    (0, 5), (5, 6), (6, 7), (7, 8),
+    (5, 9), (9, 10), (10, 11), (11, 12),
+    (9, 13), (13, 14), (14, 15), (15, 16),
+    (13, 17), (17, 18), (18, 19), (19, 20), (0, 17),
+]
+
+
+class HandFrame(NamedTuple):
+    """Hand tracking output for one camera frame."""
+    sequence: int
+    timestamp: float
+    width: int
+    height: int
+    landmarks: np.ndarray      # (hands, 21, 3) float32, normalized image coordinates
+    handedness: List[str]      # MediaPipe "Left"/"Right" label per hand
+    finger_counts: List[int]   # Extended fingers per hand (instrument script rule)
+
+
+def draw_hands(image: np.ndarray, landmarks: np.ndarray, colors: Optional[List[tuple]] = None):
+    """Draw landmark arrays onto a BGR image (optionally one color per hand)."""
+    h, w = image.shape[:2]
+    for i, hand in enumerate(landmarks):
+        color = colors[i] if colors else (0, 255, 0)
+        points = [(int(x * w), int(y * h)) for x, y, _ in hand.tolist()]
+        for start, end in HAND_CONNECTIONS:
+            cv2.line(image, points[start], points[end], color, 2)
+        for point in points:
+            cv2.circle(image, point, 2, color, -1)
+
+
+class FrameRing:
+    """Most recent camera images in shared memory, indexed by frame sequence."""
+
+    def __init__(self, shape: tuple, name: Optional[str] = None):
+        self.shape = tuple(shape)
+        self.owner = name is None
+        size = RING_HEADER_BYTES + RING_SLOTS * int(np.prod(self.shape))
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            # Attaching registers the block with this process's resource tracker,
+            # which would unlink it when the subscriber exits
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+        self.header = np.ndarray((1,), dtype=np.int64, buffer=self.shm.buf)
+        self.slots = np.ndarray((RING_SLOTS,) + self.shape, dtype=np.uint8,
+                                buffer=self.shm.buf, offset=RING_HEADER_BYTES)
+        if self.owner:
+            self.header[0] = -1
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def write(self, sequence: int, image: np.ndarray):
+        self.slots[sequence % RING_SLOTS] = image
+        self.header[0] = sequence
+
+    def read(self) -> Optional[np.ndarray]:
+        sequence = int(self.header[0])
+        if sequence < 0:
+            return None
+        return self.slots[sequence % RING_SLOTS].copy()
+
+    def close(self):
+        # Views must be released before the mapping can be closed
+        del self.header, self.slots
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class HandSubscription:
+    """In-process subscriber. Keeps only the newest frame so slow consumers skip instead of lagging."""
+
+    def __init__(self, service: "HandTrackingService"):
+        self.service = service
+        self._mailbox = queue.Queue(maxsize=1)
+        self.dropped = 0
+        self.closed = False
+        self.owns_service = False  # Set when open_hand_stream started the service for this subscriber
+
+    def put(self, frame: Optional[HandFrame]):
+        try:
+            self._mailbox.put_nowait(frame)
+        except queue.Full:
+            try:
+                self._mailbox.get_nowait()
+                self.dropped += 1
+            except queue.Empty:
+                pass
+            self._mailbox.put_nowait(frame)
+
+    def get(self, timeout: Optional[float] = None) -> Optional[HandFrame]:
+        """Next frame, or None on timeout or when the service stops."""
+        try:
+            frame = self._mailbox.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        if frame is None:
+            self.closed = True
+        return frame
+
+    def latest_image(self) -> Optional[np.ndarray]:
+        return self.service.latest_image()
+
+    def share(self) -> "HandSubscription":
+        """Another in-process subscriber on the same service (each gets every frame)."""
+        return self.service.subscribe()
+
+    def close(self):
+        self.closed = True
+        self.service.unsubscribe(self)
+        if self.owns_service:
+            self.service.stop()
+
+    def __iter__(self):
+        while True:
+            frame = self.get()
+            if frame is None:
+                return
+            yield frame
+
+
+class HandEventClient:
+    """Subscriber in another process, connected over the service's Unix socket."""
+
+    def __init__(self, socket_path: str = SOCKET_PATH):
+        self.socket_path = socket_path
+        self.conn = local_socket.connect(socket_path)
+        self.ring: Optional[FrameRing] = None
+        self.closed = False
+
+    def _receive(self) -> Optional[HandFrame]:
+        try:
+            kind, payload = self.conn.recv()
+        except (EOFError, OSError):
+            self.closed = True
+            return None
+        if kind == "ring":
+            name, shape = payload
+            self.ring = FrameRing(shape, name=name)
+            return self._receive()
+        return HandFrame(*payload)
+
+    def get(self, timeout: Optional[float] = None) -> Optional[HandFrame]:
+        """Newest frame, or None on timeout or when the service goes away."""
+        if self.closed or (timeout is not None and not self.conn.poll(timeout)):
+            return None
+        frame = self._receive()
+        # Skip anything that queued up in the socket buffer while we were busy
+        while frame is not None and not self.closed and self.conn.poll(0):
+            frame = self._receive() or frame
+        return frame
+
+    def latest_image(self) -> Optional[np.ndarray]:
+        return self.ring.read() if self.ring else None
+
+    def share(self) -> "HandEventClient":
+        """Another subscriber on the same service (each gets every frame)."""
+        return HandEventClient(self.socket_path)
+
+    def close(self):
+        self.closed = True
+        self.conn.close()
+        if self.ring:
+            self.ring.close()
+            self.ring = None
+
+    def __iter__(self):
+        while True:
+            frame = self.get()
+            if frame is None:
+                return
+            yield frame
+
+
+def service_running(socket_path: str = SOCKET_PATH) -> bool:
+    try:
+        local_socket.connect(socket_path).close()
+        return True
+    except AuthenticationError:
+        return True  # Something is listening there, just not with the current key
+    except (OSError, EOFError):
+        return False
+
+
+class HandTrackingService:
+    """Owns the camera and the MediaPipe graph; publishes a HandFrame per camera frame."""
+
+    def __init__(self, camera_index: int = 0, max_num_hands: int = 2,
+                 min_detection_confidence: float = 0.7, socket_path: Optional[str] = SOCKET_PATH):
+        self.camera_index = camera_index
+        self.max_num_hands = max_num_hands
+        self.min_detection_confidence = min_detection_confidence
+        self.socket_path = socket_path
+        self.subscribers: List[HandSubscription] = []
+        self.latest: Optional[HandFrame] = None
+        self.ring: Optional[FrameRing] = None
+        self.running = False
+        self.fps = 0.0
+        self._lock = threading.Lock()
+        self._listener = None
+        self._capture_thread = None
+
+    def start(self) -> "HandTrackingService":
+        import mediapipe as mp  # Only the service process pays for loading the hand model
+
+        if self.socket_path and service_running(self.socket_path):
+            raise RuntimeError(f"Hand tracking service already running at {self.socket_path}")
+
+        self.cap = cv2.VideoCapture(self.camera_index)
+        if not self.cap.isOpened():
+            raise RuntimeError("Webcam not found")
+        self.hands = mp.solutions.hands.Hands(min_detection_confidence=self.min_detection_confidence,
+                                              max_num_hands=self.max_num_hands)
+        self.running = True
+        self._capture_thread = threading.Thread(target=self._capture_loop, name="hand-capture", daemon=True)
+        self._capture_thread.start()
+        if self.socket_path:
+            self._start_server()
+        print(f"📷 Hand tracking service started (camera {self.camera_index})")
+        return self
+
+    def subscribe(self) -> HandSubscription:
+        subscription = HandSubscription(self)
+        with self._lock:
+            self.subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: HandSubscription):
+        with self._lock:
+            if subscription in self.subscribers:
+                self.subscribers.remove(subscription)
+
+    def latest_image(self) -> Optional[np.ndarray]:
+        return self.ring.read() if self.ring else None
+
+    def _publish(self, frame: Optional[HandFrame]):
+        with self._lock:
+            subscribers = list(self.subscribers)
+        for subscription in subscribers:
+            subscription.put(frame)
+
+    def _capture_loop(self):
+        sequence = 0
+        started = time.perf_counter()
+        while self.running:
+            success, image = self.cap.read()
+            if not success:
+                continue
+
+            image = cv2.flip(image, 1)
+            results = self.hands.process(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+            landmarks = landmarks_to_array(results.multi_hand_landmarks)
+            frame = HandFrame(
+                sequence=sequence,
+                timestamp=time.time(),
+                width=image.shape[1],
+                height=image.shape[0],
+                landmarks=landmarks,
+                handedness=handedness_labels(results),
+                finger_counts=count_extended_fingers(landmarks).tolist(),
+            )
+
+            if self.ring is None:
+                self.ring = FrameRing(image.shape)
+            self.ring.write(sequence, image)
+            self.latest = frame
+            self._publish(frame)
+
+            sequence += 1
+            now = time.perf_counter()
+            self.fps = 0.9 * self.fps + 0.1 / max(now - started, 1e-6)
+            started = now
+
+    def _start_server(self):
+        self._listener = local_socket.listen(self.socket_path)
+        threading.Thread(target=self._accept_loop, name="hand-accept", daemon=True).start()
+
+    def _accept_loop(self):
+        while self.running:
+            try:
+                conn = local_socket.accept(self._listener)
+            except OSError:
+                break
+            if conn is None:
+                continue  # Failed authentication
+            threading.Thread(target=self._serve_client, args=(conn,), daemon=True).start()
+
+    def _serve_client(self, conn):
+        subscription = self.subscribe()
+        ring_sent = False
+        try:
+            for frame in subscription:
+                if not ring_sent and self.ring is not None:
+                    conn.send(("ring", (self.ring.name, self.ring.shape)))
+                    ring_sent = True
+                conn.send(("frame", tuple(frame)))
+        except (BrokenPipeError, ConnectionResetError, EOFError, OSError):
+            pass
+        finally:
+            self.unsubscribe(subscription)
+            conn.close()
+
+    def stats(self) -> dict:
+        return {
+            "fps": round(self.fps, 1),
+            "subscribers": len(self.subscribers),
+            "dropped": {i: s.dropped for i, s in enumerate(self.subscribers)},
+        }
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        self._publish(None)
+        if self._capture_thread:
+            self._capture_thread.join(timeout=2)
+        if self._listener:
+            local_socket.close(self._listener, self.socket_path)
+        self.cap.release()
+        self.hands.close()
+        if self.ring:
+            self.ring.close()
+            self.ring = None
+        print("📷 Hand tracking service stopped")
+
+
+def open_hand_stream(socket_path: str = SOCKET_PATH, **service_options):
+    """Subscribe to the running service, or start one in this process if there is none."""
+    try:
+        return HandEventClient(socket_path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        print("ℹ️ No hand tracking service running, starting one in this process")
+        service = HandTrackingService(socket_path=socket_path, **service_options).start()
+        subscription = service.subscribe()
+        subscription.owns_service = True
+        return subscription
+
+
+if __name__ == "__main__":
+    service = HandTrackingService().start()
+    try:
+        while service.running:
+            time.sleep(5)
+            print(f"📊 {service.stats()}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
@@ -0,0 +1,169 @@
+# instrument_engine.py
+"""
+Long-lived instrument engine.
+
+The shared synth engine loads the SoundFont once and every instrument plugin
+gets its channels and programs set up front. Switching instruments is a note
+release plus a swap of the active gesture→note plugin, with no new
+interpreter, camera or SoundFont load. Switch latency is measured on every
+switch and reported through stats().
+"""
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+from hand_classifier import is_right_hand
+from hand_tracking_service import draw_hands, open_hand_stream
+from instrument_plugins import PLUGINS
+from synth_engine import AUDIO_DRIVER, SF2_PATH, get_synth_engine
+from synth_recorder import synth_recorder
+
+SWITCH_TARGET_MS = 50.0
+
+
+class InstrumentEngine:
+    """Hosts all instrument plugins on one synth and routes hand frames to the active one."""
+
+    def __init__(self, sf2_path: str = SF2_PATH, driver: str = AUDIO_DRIVER):
+        started = time.perf_counter()
+        self.synth_engine = get_synth_engine(sf2_path, driver)
+
+        self.plugins = {name: plugin_class(self.synth_engine) for name, plugin_class in PLUGINS.items()}
+        for plugin in self.plugins.values():
+            plugin.load()
+            plugin.activate()
+
+        self.active = None
+        self.switch_times = deque(maxlen=100)
+        self._lock = threading.Lock()
+        self._stream = None
+        self.startup_ms = (time.perf_counter() - started) * 1000
+        print(f"🎛️ Instrument engine ready in {self.startup_ms:.0f} ms ({len(self.plugins)} instruments)")
+
+    @property
+    def current(self):
+        return self.active.name if self.active else None
+
+    def switch(self, name: str) -> float:
+        """Make ``name`` the active instrument; returns the switch time in milliseconds."""
+        if name not in self.plugins:
+            raise KeyError(f"Unknown instrument: {name}")
+
+        started = time.perf_counter()
+        with self._lock:
+            if self.active is not None:
+                self.active.release()
+            self.active = self.plugins[name]
+            self.active.activate()
+        switch_ms = (time.perf_counter() - started) * 1000
+
+        self.switch_times.append(switch_ms)
+        marker = "✅" if switch_ms < SWITCH_TARGET_MS else "⚠️"
+        print(f"{marker} Switched to {name} in {switch_ms:.2f} ms")
+        return switch_ms
+
+    def on_frame(self, frame):
+        with self._lock:
+            if self.active is not None:
+                self.active.on_frame(frame)
+
+    def annotate(self, image, frame):
+        with self._lock:
+            if self.active is not None:
+                self.active.annotate(image, frame)
+
+    def run(self, stream=None):
+        """Feed hand frames from ``stream`` (or a new subscription) on a background thread."""
+        self._stream = stream or open_hand_stream()
+        threading.Thread(target=self._run, name="instrument-engine", daemon=True).start()
+
+    def _run(self):
+        for frame in self._stream:
+            self.on_frame(frame)
+
+    def stats(self) -> dict:
+        times = list(self.switch_times)
+        return {
+            "instrument": self.current,
+            "instruments": list(self.plugins),
+            "startup_ms": round(self.startup_ms, 1),
+            "synth": self.synth_engine.stats(),
+            "switches": len(times),
+            "switch_ms": {
+                "last": round(times[-1], 3) if times else 0.0,
+                "avg": round(sum(times) / len(times), 3) if times else 0.0,
+                "max": round(max(times), 3) if times else 0.0,
+                "target": SWITCH_TARGET_MS,
+            },
+        }
+
+    def handle_command(self, message: dict) -> dict:
+        """Control-socket handler (see engine_control.py)."""
+        command = message.get("command")
+        try:
+            if command == "switch":
+                instrument = message.get("instrument")
+                if instrument == self.current:
+                    return {"status": "ok", "instrument": instrument, "switch_ms": 0.0}
+                switch_ms = self.switch(instrument)
+                return {"status": "ok", "instrument": instrument, "switch_ms": round(switch_ms, 3)}
+            if command == "stats":
+                return {"status": "ok", **self.stats()}
+            if command == "record_start":
+                # This process's synth is the one playing; record it here (see synth_recorder.py)
+                recording = synth_recorder.start(self.synth_engine, message.get("instrument") or self.current,
+                                                 message.get("session"))
+                return {"status": "ok", "filepath": recording.filepath, **recording.stats()}
+            if command == "record_stop":
+                recording = synth_recorder.stop()
+                if recording is None:
+                    return {"status": "not_recording"}
+                recording.wait(timeout=2)  # Let the writer finish the WAV header
+                return {"status": "ok", "filepath": recording.filepath, **recording.stats()}
+            if command == "record_stats":
+                return {"status": "ok", **synth_recorder.stats()}
+            return {"status": "error", "message": f"Unknown command: {command}"}
+        except (KeyError, RuntimeError, OSError) as e:
+            return {"status": "error", "message": str(e)}
+
+    def shutdown(self):
+        recording = synth_recorder.stop()
+        if recording is not None:
+            recording.wait(timeout=2)
+        with self._lock:
+            if self.active is not None:
+                self.active.release()
+            self.active = None
+        if self._stream is not None:
+            self._stream.close()
+        self.synth_engine.delete()
+
+
+def run_standalone(instrument: str, window: str = None):
+    """Play a single instrument without the controller (used by the gesture_*.py scripts)."""
+    engine = InstrumentEngine()
+    engine.switch(instrument)
+    stream = open_hand_stream()
+    try:
+        for frame in stream:
+            engine.on_frame(frame)
+            if window:
+                image = stream.latest_image()
+                if image is None:
+                    image = np.zeros((frame.height, frame.width, 3), dtype=np.uint8)
+                draw_hands(image, frame.landmarks,
+                           [(0, 255, 0) if right else (128, 0, 128)
+                            for right in is_right_hand(frame.landmarks).tolist()])
+                engine.annotate(image, frame)
+                cv2.imshow(window, image)
+                if cv2.waitKey(1) & 0xFF == 27:
+                    break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stream.close()
+        engine.shutdown()
+        cv2.destroyAllWindows()
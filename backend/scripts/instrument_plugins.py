@@ -0,0 +1,328 @@
+# instrument_plugins.py
+"""
+Instrument plugins for the long-lived instrument engine.
+
+Each plugin maps HandFrame events to MIDI on its own channels of the shared
+synth engine (synth_engine.py). Channels and programs are set up once at load
+time, so switching instruments is only release() on the old plugin and
+activate() on the new one.
+"""
+import time
+
+import cv2
+
+from hand_classifier import is_right_hand
+
+
+class InstrumentPlugin:
+    """Base plugin: owns a set of channels and turns hand frames into notes."""
+
+    name = ""
+    voices = {}  # synth engine channel name -> (bank, program)
+
+    def __init__(self, synth_engine):
+        self.synth_engine = synth_engine
+        self.channels = {}
+
+    def load(self):
+        """Get this instrument's channels from the synth engine (once, at engine start)."""
+        for channel_name, (bank, program) in self.voices.items():
+            self.channels[channel_name] = self.synth_engine.channel(channel_name, program=program, bank=bank)
+
+    def activate(self):
+        """Reset per-performance state when the instrument becomes active."""
+
+    def release(self):
+        """Silence everything this instrument is playing."""
+        for channel in self.channels.values():
+            channel.all_notes_off()
+        self.activate()
+
+    def on_frame(self, frame):
+        raise NotImplementedError
+
+    @classmethod
+    def reachable_notes(cls) -> dict:
+        """Every MIDI note this plugin can play, per channel name (for sample_bank.py)."""
+        return {}
+
+    def annotate(self, image, frame):
+        """Draw instrument-specific overlays on the preview image."""
+
+
+class MonophonicPlugin(InstrumentPlugin):
+    """One note at a time on a single channel (flute, violin, sax)."""
+
+    def load(self):
+        super().load()
+        self.channel = self.channels[self.name]
+
+    def activate(self):
+        self.last_note = None
+        self.last_note_played = -1
+
+    def play_note(self, midi_note, velocity=120):
+        if self.last_note is not None:
+            self.channel.noteoff(self.last_note)
+        self.channel.noteon(midi_note, velocity)
+        self.last_note = midi_note
+
+    def stop(self):
+        if self.last_note is not None:
+            self.channel.noteoff(self.last_note)
+            self.last_note = None
+
+
+class FlutePlugin(MonophonicPlugin):
+    name = "flute"
+    voices = {"flute": (0, 73)}  # Flute (GM 74)
+
+    # 🔢 Map finger counts to notes (base C4 range)
+    NOTE_BASE = {0: 60, 1: 62, 2: 64, 3: 65, 4: 67, 5: 69}
+
+    @classmethod
+    def reachable_notes(cls):
+        return {cls.name: {note + 12 for note in cls.NOTE_BASE.values()}}
+
+    def on_frame(self, frame):
+        finger_count = frame.finger_counts[0] if frame.finger_counts else -1
+
+        # 🎶 Play flute note (always high pitch)
+        if finger_count in self.NOTE_BASE:
+            midi_note = self.NOTE_BASE[finger_count] + 12  # Force high octave
+            if finger_count != self.last_note_played:
+                print(f"🎶 Flute MIDI Note: {midi_note}")
+                self.play_note(midi_note)
+                self.last_note_played = finger_count
+        else:
+            self.stop()
+            self.last_note_played = -1
+
+
+class ViolinPlugin(MonophonicPlugin):
+    name = "violin"
+    voices = {"violin": (0, 40)}
+    emoji = "🎻"
+
+    # Violin range: A3 to G5
+    NOTE_BASE = {1: 57, 2: 60, 3: 64, 4: 67, 5: 79}
+
+    @classmethod
+    def reachable_notes(cls):
+        return {cls.name: {note + shift for note in cls.NOTE_BASE.values() for shift in (-12, 0, 12)}}
+
+    def on_frame(self, frame):
+        finger_count = frame.finger_counts[0] if frame.finger_counts else -1
+        hand_y = float(frame.landmarks[0, 0, 1]) if frame.finger_counts else None
+
+        if hand_y is not None and finger_count in self.NOTE_BASE:
+            base_note = self.NOTE_BASE[finger_count]
+
+            # Octave adjustment by wrist height
+            if hand_y < 1 / 3:
+                midi_note = base_note + 12  # High
+            elif hand_y > 2 / 3:
+                midi_note = base_note - 12  # Low
+            else:
+                midi_note = base_note       # Mid
+
+            if finger_count != self.last_note_played:
+                print(f"{self.emoji} {self.name.title()} MIDI Note: {midi_note}")
+                self.play_note(midi_note, velocity=127)
+                self.last_note_played = finger_count
+        else:
+            self.stop()
+            self.last_note_played = -1
+
+
+class SaxPlugin(ViolinPlugin):
+    name = "saxophone"
+    voices = {"saxophone": (0, 65)}  # Alto Sax
+    emoji = "🎷"
+
+    # Lower register for Tenor Sax feel
+    NOTE_BASE = {1: 57, 2: 60, 3: 62, 4: 64, 5: 67}
+
+
+class DrumsPlugin(InstrumentPlugin):
+    name = "drums"
+    voices = {"drums": (128, 0)}  # Bank 128 = Drum Kit (channel 9)
+
+    MIDI_DRUM_MAP = {
+        0: (35, "Kick Drum"),
+        1: (38, "Snare Drum"),
+        2: (42, "Closed Hi-Hat"),
+        3: (46, "Open Hi-Hat"),
+        4: (45, "Low Tom"),
+        5: (49, "Crash Cymbal"),
+    }
+
+    @classmethod
+    def reachable_notes(cls):
+        return {"drums": {note for note, _ in cls.MIDI_DRUM_MAP.values()}}
+
+    def activate(self):
+        self.last_drum = -1
+
+    def on_frame(self, frame):
+        if not frame.finger_counts:
+            self.last_drum = -1
+            return
+
+        finger_count = frame.finger_counts[0]  # One hand plays the kit
+        if finger_count in self.MIDI_DRUM_MAP:
+            note, drum_name = self.MIDI_DRUM_MAP[finger_count]
+            if finger_count != self.last_drum:
+                self.channels["drums"].noteon(note, 120)
+                print(f"🥁 MIDI Drum: {drum_name} ({note})")
+                self.last_drum = finger_count
+        else:
+            self.last_drum = -1
+
+
+class GuitarPlugin(InstrumentPlugin):
+    name = "guitar"
+    voices = {"guitar": (0, 25)}  # Steel acoustic
+
+    NOTE_MAP = {0: 52, 1: 55, 2: 57, 3: 59, 4: 60, 5: 64}
+    STRUM_COOLDOWN = 0.4  # seconds
+
+    @classmethod
+    def reachable_notes(cls):
+        return {"guitar": set(cls.NOTE_MAP.values())}
+
+    def activate(self):
+        self.last_chosen_note = None
+        self.last_strum_time = 0
+
+    def on_frame(self, frame):
+        right_hand_y = None
+
+        for i, label in enumerate(frame.handedness):
+            finger_count = frame.finger_counts[i]
+            if label == "Left":
+                if finger_count in self.NOTE_MAP:
+                    self.last_chosen_note = self.NOTE_MAP[finger_count]
+            elif label == "Right":
+                right_hand_y = float(frame.landmarks[i, 0, 1])
+
+        # 🎸 Trigger strum if right hand is low
+        now = time.time()
+        if right_hand_y is not None and right_hand_y > 2 / 3:
+            if self.last_chosen_note and now - self.last_strum_time > self.STRUM_COOLDOWN:
+                print(f"🎸 STRUM → MIDI note: {self.last_chosen_note}")
+                self.channels["guitar"].noteon(self.last_chosen_note, 100)
+                self.last_strum_time = now
+
+    def annotate(self, image, frame):
+        h, w = image.shape[:2]
+        cv2.rectangle(image, (0, int(2 * h / 3)), (w, h), (50, 50, 50), 2)
+        if self.last_chosen_note:
+            cv2.putText(image, f"Note: {self.last_chosen_note}", (10, 60),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (200, 255, 200), 2)
+
+
+class PianoPlugin(InstrumentPlugin):
+    name = "piano"
+    voices = {
+        "piano": (0, 0),     # Right hand: Acoustic Grand Piano
+        "strings": (0, 48),  # Left hand: Strings 1
+    }
+
+    # Right Hand Piano Notes
+    MELODY_MAP = {0: 60, 1: 62, 2: 64, 3: 65, 4: 67, 5: 69}
+
+    # Left Hand Chords
+    SYNTH_CHORDS = {
+        1: [60, 64, 67],   # C Major
+        2: [62, 65, 69],   # D Minor
+        3: [65, 69, 72],   # F Major
+        4: [67, 71, 74],   # G Major
+        5: [69, 72, 76],   # A Minor
+    }
+
+    @classmethod
+    def reachable_notes(cls):
+        return {"piano": set(cls.MELODY_MAP.values()),
+                "strings": {note for chord in cls.SYNTH_CHORDS.values() for note in chord}}
+
+    def activate(self):
+        self.last_piano_note = None
+        self.last_synth_fingers = -1
+        self.synth_playing = []
+        self.layer = "-"
+
+    def stop_piano(self):
+        if self.last_piano_note is not None:
+            self.channels["piano"].noteoff(self.last_piano_note)
+            self.last_piano_note = None
+
+    def stop_synth(self):
+        for note in self.synth_playing:
+            self.channels["strings"].noteoff(note)
+        self.synth_playing = []
+
+    def on_frame(self, frame):
+        if not frame.finger_counts:
+            # No hands visible
+            self.stop_piano()
+            self.stop_synth()
+            self.last_synth_fingers = -1
+            return
+
+        right_hands = is_right_hand(frame.landmarks).tolist()
+        for i, finger_count in enumerate(frame.finger_counts):
+            if right_hands[i]:
+                # 🎹 Right hand piano
+                if finger_count in self.MELODY_MAP:
+                    note = self.MELODY_MAP[finger_count]
+                    if note != self.last_piano_note:
+                        self.stop_piano()
+                        self.channels["piano"].noteon(note, 120)
+                        self.last_piano_note = note
+                        print(f"🎹 Piano: {note}")
+                else:
+                    self.stop_piano()
+            elif finger_count != self.last_synth_fingers:
+                # 🎻 Left hand strings + dynamics
+                self.stop_synth()
+                if finger_count in self.SYNTH_CHORDS:
+                    chord = self.SYNTH_CHORDS[finger_count]
+
+                    # 🎚️ More comfortable Y thresholds
+                    wrist_y = float(frame.landmarks[i, 0, 1])
+                    if wrist_y > 0.85:
+                        velocity, self.layer = 50, "Light"
+                    elif wrist_y > 0.6:
+                        velocity, self.layer = 90, "Mid"
+                    else:
+                        velocity, self.layer = 127, "Full"
+
+                    for note in chord:
+                        self.channels["strings"].noteon(note, velocity)
+                    self.synth_playing = chord
+                    print(f"🎻 Strings Chord: {chord} | Layer: {self.layer}")
+
+                self.last_synth_fingers = finger_count
+
+    def annotate(self, image, frame):
+        h, w = image.shape[:2]
+        right_hands = is_right_hand(frame.landmarks).tolist()
+        for i, finger_count in enumerate(frame.finger_counts):
+            wrist_x, wrist_y = frame.landmarks[i, 0, :2].tolist()
+            label, color = ("R", (0, 255, 0)) if right_hands[i] else ("L", (128, 0, 128))
+            cv2.putText(image, f"{label}: {finger_count}", (int(wrist_x * w) + 20, int(wrist_y * h) - 20),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
+
+        cv2.putText(image, "Right: Piano 🎹 | Left: Strings 🎻", (10, 30),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+        if self.synth_playing:
+            cv2.putText(image, f"Layer: {self.layer}", (10, 60),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 220, 180), 2)
+
+
+# Instrument registry
+PLUGINS = {
+    plugin.name: plugin
+    for plugin in (PianoPlugin, DrumsPlugin, GuitarPlugin, FlutePlugin, ViolinPlugin, SaxPlugin)
+}
@@ -0,0 +1,106 @@
+# local_socket.py
+"""
+Private, authenticated Unix sockets for the engine and hand tracking services.
+
+multiprocessing.connection pickles every message, so whoever is on the other
+end of a socket can run code in this process. Sockets therefore live in a
+runtime directory only this user can enter ($XDG_RUNTIME_DIR/vibevirtuoso,
+or a 0700 per-user directory under the temp dir), and connections are
+authenticated with a secret the listener generates on every start. The
+secret is written next to the socket as ``<socket>.key`` (mode 0600), where
+clients run by the same user read it. Only the standard library is imported.
+"""
+import os
+import secrets
+import stat
+import tempfile
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+AUTHKEY_BYTES = 32
+
+
+def _private_dir(path: str) -> str:
+    """Create ``path`` as 0700, or check that an existing one belongs to this user and is private."""
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or stat.S_IMODE(info.st_mode) & 0o077:
+        raise RuntimeError(f"Runtime directory {path} is not a private directory owned by this user")
+    return path
+
+
+def runtime_dir() -> str:
+    """Directory for this user's sockets and keys (created on first use)."""
+    configured = os.getenv("VIBEVIRTUOSO_RUNTIME_DIR")
+    if configured:
+        return _private_dir(configured)
+    xdg = os.getenv("XDG_RUNTIME_DIR")
+    if xdg and os.path.isdir(xdg):
+        return _private_dir(os.path.join(xdg, "vibevirtuoso"))
+    return _private_dir(os.path.join(tempfile.gettempdir(), f"vibevirtuoso-{os.getuid()}"))
+
+
+def socket_path(name: str) -> str:
+    return os.path.join(runtime_dir(), name)
+
+
+def _key_path(path: str) -> str:
+    return f"{path}.key"
+
+
+def _remove_stale_socket(path: str):
+    """Remove a socket left by a run that did not shut down cleanly; refuse anything else."""
+    try:
+        info = os.lstat(path)
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(info.st_mode) or info.st_uid != os.getuid():
+        raise RuntimeError(f"{path} exists and is not a socket owned by this user")
+    os.unlink(path)
+
+
+def listen(path: str) -> Listener:
+    """Listener on ``path`` with a fresh authkey, written to ``<path>.key`` for clients."""
+    _remove_stale_socket(path)
+    authkey = secrets.token_bytes(AUTHKEY_BYTES)
+    temp_path = f"{_key_path(path)}.{os.getpid()}.tmp"
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(authkey)
+    os.replace(temp_path, _key_path(path))
+    return Listener(path, family="AF_UNIX", authkey=authkey)
+
+
+def connect(path: str):
+    """Authenticated connection to the listener on ``path``.
+
+    Raises FileNotFoundError/ConnectionRefusedError (OSError) when nothing is
+    listening, and AuthenticationError when the key does not match.
+    """
+    with open(_key_path(path), "rb") as f:
+        authkey = f.read()
+    return Client(path, family="AF_UNIX", authkey=authkey)
+
+
+def accept(listener: Listener):
+    """Next authenticated connection; None for a client that failed the handshake.
+
+    Raises OSError once the listener is closed.
+    """
+    try:
+        return listener.accept()
+    except (AuthenticationError, EOFError, ConnectionResetError, BrokenPipeError):
+        return None
+
+
+def close(listener: Listener, path: str):
+    """Close a listener and remove its socket and key."""
+    listener.close()
+    for leftover in (path, _key_path(path)):
+        try:
+            os.unlink(leftover)
+        except FileNotFoundError:
+            pass
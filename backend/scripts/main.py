@@ -1,137 +1,60 @@
 import cv2
-import mediapipe as mp
+import numpy as np
 import threading
-import os
-import signal
-import subprocess
-import uuid
 from datetime import datetime
 import speech_recognition as sr
-import time
+from hand_classifier import is_right_hand
+from hand_tracking_service import draw_hands, open_hand_stream
+from instrument_engine import InstrumentEngine
+from instrument_plugins import PLUGINS
+from engine_control import serve_engine_commands, stop_engine_commands
 
-# Instrument scripts
-instrument_scripts = {
-    "flute": os.path.join("scripts", "gesture_flute.py"),
-    "drums": os.path.join("scripts", "gesture_drums.py"),
-    "guitar": os.path.join("scripts", "gesture_guitar.py"),
-    "piano": os.path.join("scripts", "gesture_piano.py"),
-    "saxophone": os.path.join("scripts", "gesture_sax_player.py"),
-    "violin": os.path.join("scripts", "gesture_violin.py"),
-}
+# Instruments are plugins in one long-lived engine; switching never restarts Python
+instrument_names = list(PLUGINS)
+engine = None
+control_listener = None
 
-# MediaPipe + Webcam
-cap = cv2.VideoCapture(0)
-mp_hands = mp.solutions.hands
-hands = mp_hands.Hands(min_detection_confidence=0.7, max_num_hands=2)
-mp_draw = mp.solutions.drawing_utils
-
-current_instrument = None
-current_process = None
-recording_process = None
+# Shared webcam + hand tracking; instrument scripts subscribe to the same service
+hand_stream = None
 
 def initialize_camera():
-    if not cap.isOpened():
-        print("❌ Webcam not found")
-        exit()
-
-def stop_current_instrument():
-    global current_process, recording_process
-    if recording_process:
-        try:
-            recording_process.terminate()
-            recording_process.wait(timeout=3)  # Wait up to 3 seconds
-            print("🛑 Stopped recording.")
-        except subprocess.TimeoutExpired:
-            recording_process.kill()  # Force kill if needed
-            print("🛑 Force-killed recording.")
-        except:
-            pass
-        recording_process = None
-
-    if current_process:
-        try:
-            print(f"🛑 Stopping instrument process (PID: {current_process.pid})")
-            # First try graceful termination
-            os.killpg(os.getpgid(current_process.pid), signal.SIGTERM)
-            current_process.wait(timeout=3)  # Wait up to 3 seconds
-            print("✅ Stopped current instrument gracefully.")
-        except subprocess.TimeoutExpired:
-            # Force kill if graceful didn't work
-            try:
-                os.killpg(os.getpgid(current_process.pid), signal.SIGKILL)
-                print("💀 Force-killed current instrument.")
-            except ProcessLookupError:
-                print("⚠️ Process already terminated.")
-        except ProcessLookupError:
-            print("⚠️ Process already terminated.")
-        current_process = None
-        
-    # Additional cleanup - make sure no old gesture processes are lingering
+    global hand_stream
     try:
-        subprocess.run(['pkill', '-f', 'gesture_piano'], capture_output=True)
-        subprocess.run(['pkill', '-f', 'gesture_drums'], capture_output=True)
-        subprocess.run(['pkill', '-f', 'gesture_guitar'], capture_output=True)
-        subprocess.run(['pkill', '-f', 'gesture_flute'], capture_output=True)
-        subprocess.run(['pkill', '-f', 'gesture_violin'], capture_output=True)
-        subprocess.run(['pkill', '-f', 'gesture_sax'], capture_output=True)
-        print("🧹 Additional cleanup of gesture processes completed")
-    except Exception as e:
-        print(f"⚠️ Cleanup warning: {e}")
-        
-    # Small delay to ensure cleanup
-    time.sleep(0.5)
+        hand_stream = open_hand_stream()
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        exit()
 
-def start_recording(instrument):
-    global recording_process
-    filename = f"{instrument}_{uuid.uuid4().hex}.wav"
-    filepath = os.path.join("recordings", filename)
-    os.makedirs("recordings", exist_ok=True)
-
-    try:
-        recording_process = subprocess.Popen(
-            ["python", "scripts/record_audio.py", filepath],
-            preexec_fn=os.setsid
-        )
-        print(f"🔴 Started recording {instrument} to {filepath}")
-    except Exception as e:
-        print(f"❌ Failed to start recording: {e}")
+def start_engine():
+    global engine, control_listener
+    engine = InstrumentEngine()
+    # Same service as the preview loop: an in-process subscription when the service runs here
+    engine.run(hand_stream.share())
+    control_listener = serve_engine_commands(engine.handle_command)
 
 def switch_instrument(instrument_name):
-    global current_instrument, current_process
-
-    if instrument_name not in instrument_scripts:
+    if instrument_name not in instrument_names:
         print("❌ Invalid instrument name.")
         return
 
-    if instrument_name == current_instrument:
+    if instrument_name == engine.current:
         print(f"ℹ️ Already on {instrument_name}, skipping.")
         return
 
-    stop_current_instrument()
-
     print(f"🎼 Switching to {instrument_name}")
-    current_instrument = instrument_name
-
-    try:
-        current_process = subprocess.Popen(
-            ["python", instrument_scripts[instrument_name]],
-            preexec_fn=os.setsid
-        )
-        print(f"✅ Launched {instrument_name} script (PID: {current_process.pid})")
-        # NOTE: Recording removed - only record when explicitly requested via API
-    except Exception as e:
-        print(f"🚫 Failed to launch {instrument_name}: {e}")
+    engine.switch(instrument_name)
+    # NOTE: Recording removed - only record when explicitly requested via API
 
 def auto_start_instrument(instrument_name):
     """Auto-start with specific instrument (called from web frontend)"""
-    if instrument_name in instrument_scripts:
+    if instrument_name in instrument_names:
         switch_instrument(instrument_name)
     else:
         print(f"❌ Unknown instrument: {instrument_name}")
-        print(f"Available: {list(instrument_scripts.keys())}")
+        print(f"Available: {instrument_names}")
 
 def extract_instrument_name(command):
-    for instrument in instrument_scripts:
+    for instrument in instrument_names:
         if instrument in command:
             return instrument
     return None
@@ -151,7 +74,7 @@ def listen_for_voice_commands():
                 print(f"🗣️ Heard: {command}")
                 instrument = extract_instrument_name(command)
                 if instrument:
-                    threading.Thread(target=switch_instrument, args=(instrument,), daemon=True).start()
+                    switch_instrument(instrument)
                 else:
                     print("⚠️ No valid instrument found in voice command.")
             except sr.UnknownValueError:
@@ -165,33 +88,28 @@ def listen_for_voice_commands():
 
 def process_gestures():
     while True:
-        success, img = cap.read()
-        if not success:
+        hand_frame = hand_stream.get(timeout=1.0)
+        if hand_frame is None:
+            if hand_stream.closed:
+                break
             continue
 
-        img = cv2.flip(img, 1)
-        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        result = hands.process(img_rgb)
+        img = hand_stream.latest_image()
+        if img is None:
+            img = np.zeros((hand_frame.height, hand_frame.width, 3), dtype=np.uint8)
+
+        if hand_frame.finger_counts:
+            # Color code: Green for right hand, Purple for left hand
+            draw_hands(img, hand_frame.landmarks,
+                       [(0, 255, 0) if is_right else (128, 0, 128)
+                        for is_right in is_right_hand(hand_frame.landmarks).tolist()])
 
-        if result.multi_hand_landmarks:
-            for hand_landmarks in result.multi_hand_landmarks:
-                # Determine if it's left or right hand for color coding
-                wrist_x = hand_landmarks.landmark[0].x * img.shape[1]
-                is_right = wrist_x > img.shape[1] / 2
-                
-                # Color code: Green for right hand, Purple for left hand
-                hand_color = (0, 255, 0) if is_right else (128, 0, 128)
-                connection_color = (0, 200, 0) if is_right else (100, 0, 100)
-                
-                mp_draw.draw_landmarks(
-                    img, hand_landmarks, mp_hands.HAND_CONNECTIONS,
-                    landmark_drawing_spec=mp_draw.DrawingSpec(color=hand_color, thickness=2, circle_radius=2),
-                    connection_drawing_spec=mp_draw.DrawingSpec(color=connection_color, thickness=2)
-                )
+        engine.annotate(img, hand_frame)
 
-        if current_instrument:
+        if engine.current:
+            last_switch_ms = engine.switch_times[-1] if engine.switch_times else 0.0
             cv2.putText(
-                img, f"🎹 Instrument: {current_instrument.upper()}",
+                img, f"🎹 Instrument: {engine.current.upper()} (switched in {last_switch_ms:.1f} ms)",
                 (10, img.shape[0] - 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2
             )
 
@@ -213,20 +131,21 @@ def process_gestures():
         if key == 27 or key == ord('q'):
             break
         elif key == ord('1'):
-            threading.Thread(target=switch_instrument, args=("flute",), daemon=True).start()
+            switch_instrument("flute")
         elif key == ord('2'):
-            threading.Thread(target=switch_instrument, args=("drums",), daemon=True).start()
+            switch_instrument("drums")
         elif key == ord('3'):
-            threading.Thread(target=switch_instrument, args=("guitar",), daemon=True).start()
+            switch_instrument("guitar")
         elif key == ord('4'):
-            threading.Thread(target=switch_instrument, args=("piano",), daemon=True).start()
+            switch_instrument("piano")
         elif key == ord('5'):
-            threading.Thread(target=switch_instrument, args=("saxophone",), daemon=True).start()
+            switch_instrument("saxophone")
         elif key == ord('6'):
-            threading.Thread(target=switch_instrument, args=("violin",), daemon=True).start()
+            switch_instrument("violin")
 
-    cap.release()
-    stop_current_instrument()
+    stop_engine_commands(control_listener)
+    engine.shutdown()
+    hand_stream.close()
     cv2.destroyAllWindows()
 
 # ==== Entry Point ====
@@ -239,6 +158,7 @@ def main():
         requested_instrument = sys.argv[1].lower()
         print(f"🎵 Starting with instrument: {requested_instrument}")
         initialize_camera()
+        start_engine()
         
         # Auto-start the requested instrument
         auto_start_instrument(requested_instrument)
@@ -252,6 +172,7 @@ def main():
         # Default behavior - let user choose manually
         print("🎵 Starting with manual instrument selection")
         initialize_camera()
+        start_engine()
         threading.Thread(target=listen_for_voice_commands, daemon=True).start()
         process_gestures()
 
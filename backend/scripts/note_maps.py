@@ -0,0 +1,56 @@
+# note_maps.py
+"""
+Gesture → note tables for the server-side player (gesture_control.py).
+
+Kept free of synth imports so offline tools (sample_bank.py) can read them
+without starting an audio driver.
+"""
+
+# Piano melody mapping (right hand)
+MELODY_MAP = {
+    "fist": 60,      # C4
+    "point": 62,     # D4
+    "peace": 64,     # E4
+    "three": 65,     # F4
+    "four": 67,      # G4
+    "open_hand": 69  # A4
+}
+
+# Chord mapping (left hand)
+CHORD_MAP = {
+    "point": [60, 64, 67],   # C Major
+    "peace": [62, 65, 69],   # D Minor
+    "three": [65, 69, 72],   # F Major
+    "four": [67, 71, 74],    # G Major
+    "open_hand": [69, 72, 76]  # A Minor
+}
+
+# Drums mapping
+DRUM_MAP = {
+    "fist": 36,      # Kick
+    "point": 38,     # Snare
+    "peace": 42,     # Hi-hat
+    "three": 49,     # Crash
+    "four": 47,      # Tom
+    "open_hand": 51  # Ride
+}
+
+# Instrument programs for FluidSynth
+INSTRUMENT_PROGRAMS = {
+    "piano": 0,      # Acoustic Grand Piano
+    "guitar": 24,    # Acoustic Guitar
+    "flute": 73,     # Flute
+    "violin": 40,    # Violin
+    "saxophone": 64  # Soprano Sax
+}
+
+# Channel voices as (bank, program)
+PIANO_VOICE = (0, 0)      # Acoustic Grand Piano
+STRINGS_VOICE = (0, 48)   # Strings
+DRUMS_VOICE = (128, 0)    # Drum kit (channel 9)
+
+# Note lengths in seconds
+MELODY_DURATION = 0.5  # Shorter piano notes
+CHORD_DURATION = 1.5
+DRUM_DURATION = 0.1
+MELODIC_DURATION = 1.5
@@ -0,0 +1,175 @@
+# note_scheduler.py
+"""
+Timed note-off scheduler.
+
+A single thread waits on a min-heap of pending events instead of one sleeper
+thread per note. Events are keyed (by channel and note for note-offs), so
+retriggering a note replaces its pending note-off and explicit cancels are
+cheap. Cancelled entries are dropped lazily when they reach the top of the
+heap.
+
+The scheduler can also be driven from the synth's own clock: a render loop
+(audio_backend.RenderOutput for the render drivers, the BlockMixer behind the
+sample bank player) calls tick() before each block. Events then fire at the
+start of the first block rendered after they fall due: at most one block
+late, with no wall-clock jitter. The engines' clocked_scheduler() sets this
+up when their output renders blocks.
+"""
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, Hashable, Optional
+
+# Entry layout: [due, sequence, action, key, active]
+DUE, SEQUENCE, ACTION, KEY, ACTIVE = range(5)
+
+
+class SampleClock:
+    """Clock in seconds of audio rendered so far, for driving the scheduler from the synth."""
+
+    def __init__(self, sample_rate: int = 44100):
+        self.sample_rate = sample_rate
+        self.frames = 0
+
+    def advance(self, frames: int):
+        self.frames += frames
+
+    def __call__(self) -> float:
+        return self.frames / self.sample_rate
+
+
+class NoteScheduler:
+    """Min-heap of timed actions served by one thread (or by an external clock)."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self._heap = []
+        self._pending = {}
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+        self._stale = 0  # Cancelled entries still sitting in the heap
+
+        self.scheduled = 0
+        self.fired = 0
+        self.cancelled = 0
+        self.late_ms_total = 0.0
+        self.late_ms_max = 0.0
+
+    def schedule(self, delay: float, action: Callable[[], None], key: Optional[Hashable] = None):
+        """Run ``action`` after ``delay`` seconds; a pending event with the same key is replaced."""
+        with self._cond:
+            if key is not None:
+                self._cancel_locked(key)
+            entry = [self.clock() + delay, next(self._sequence), action, key, True]
+            heapq.heappush(self._heap, entry)
+            if key is not None:
+                self._pending[key] = entry
+            self.scheduled += 1
+            if self._heap[0] is entry:
+                self._cond.notify()  # New earliest deadline: wake the thread to re-arm its wait
+        return key
+
+    def note_off(self, channel, note: int, delay: float):
+        """Schedule ``channel.noteoff(note)``; retriggering the same note replaces it."""
+        return self.schedule(delay, lambda: channel.noteoff(note), key=(channel.channel, note))
+
+    def cancel(self, key: Hashable) -> bool:
+        with self._cond:
+            return self._cancel_locked(key)
+
+    def cancel_note_off(self, channel, note: int) -> bool:
+        return self.cancel((channel.channel, note))
+
+    def _cancel_locked(self, key) -> bool:
+        entry = self._pending.pop(key, None)
+        if entry is None or not entry[ACTIVE]:
+            return False
+        entry[ACTIVE] = False
+        self.cancelled += 1
+        self._stale += 1
+        if self._stale > 64 and self._stale > len(self._heap) // 2:
+            self._heap = [e for e in self._heap if e[ACTIVE]]
+            heapq.heapify(self._heap)
+            self._stale = 0
+        return True
+
+    def _pop_due_locked(self, now: float) -> list:
+        due = []
+        while self._heap and self._heap[0][DUE] <= now:
+            entry = heapq.heappop(self._heap)
+            if not entry[ACTIVE]:
+                self._stale -= 1
+                continue
+            entry[ACTIVE] = False
+            if entry[KEY] is not None and self._pending.get(entry[KEY]) is entry:
+                del self._pending[entry[KEY]]
+            due.append(entry)
+        return due
+
+    def tick(self, frames: int):
+        """Render-loop hook: fire what is due at the start of the next block, then advance the SampleClock."""
+        self.fire_due()
+        self.clock.advance(frames)
+
+    def fire_due(self, now: Optional[float] = None) -> int:
+        """Run every event due at ``now`` (default: the scheduler clock); returns how many fired."""
+        now = self.clock() if now is None else now
+        with self._cond:
+            due = self._pop_due_locked(now)
+            if now != float("inf"):  # A flush on stop() is not lateness
+                for entry in due:
+                    late_ms = (now - entry[DUE]) * 1000
+                    self.late_ms_total += late_ms
+                    self.late_ms_max = max(self.late_ms_max, late_ms)
+            self.fired += len(due)
+
+        for entry in due:
+            try:
+                entry[ACTION]()
+            except Exception as e:
+                print(f"⚠️ Scheduled note event failed: {e}")
+        return len(due)
+
+    def start(self) -> "NoteScheduler":
+        with self._cond:
+            if self._running:
+                return self
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name="note-scheduler", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._running:
+                    return
+                timeout = self._heap[0][DUE] - self.clock() if self._heap else None
+                if timeout is None or timeout > 0:
+                    self._cond.wait(timeout)
+            self.fire_due()
+
+    def stop(self, flush: bool = True):
+        """Stop the thread; with ``flush`` every pending note-off runs now so nothing hangs."""
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+        if flush:
+            self.fire_due(float("inf"))
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "scheduled": self.scheduled,
+                "fired": self.fired,
+                "cancelled": self.cancelled,
+                "pending": len(self._heap) - self._stale,
+                "late_ms_avg": round(self.late_ms_total / self.fired, 3) if self.fired else 0.0,
+                "late_ms_max": round(self.late_ms_max, 3),
+            }
@@ -1,35 +1,51 @@
 # scripts/record_audio.py
 
 import sounddevice as sd
-import numpy as np
-from scipy.io.wavfile import write
-import sys
+import argparse
 import os
-import time
+import signal
+import threading
+
+from wav_stream import StreamingRecorder
 
 samplerate = 44100  # 44.1 kHz
 channels = 1
 duration = 30  # Record for 30 seconds max
-filename = sys.argv[1] if len(sys.argv) > 1 else "output.wav"
 
-os.makedirs(os.path.dirname(filename), exist_ok=True)
+parser = argparse.ArgumentParser(description="Record the microphone straight to a WAV file")
+parser.add_argument("filename", nargs="?", default="output.wav")
+parser.add_argument("--duration", type=float, default=duration, help="max seconds to record")
+parser.add_argument("--rotate", type=float, default=None, help="split into parts of this many seconds")
+parser.add_argument("--crash-safe", action="store_true", help="keep the file readable at all times")
+args = parser.parse_args()
+filename = args.filename
+
+os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
 print("🎙️ Recording started...")
 
+# Stop cleanly on terminate (main.py stops recordings with SIGTERM)
+stop = threading.Event()
+signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+
 try:
-    frames = []
-    start = time.time()
+    # Blocks go to a ring buffer and a writer thread streams them to disk
+    recorder = StreamingRecorder(filename, samplerate, channels,
+                                 rotate_seconds=args.rotate, crash_safe=args.crash_safe)
 
     def callback(indata, frames_count, time_info, status):
-        frames.append(indata.copy())
-        if time.time() - start > duration:
-            raise sd.CallbackStop()
-
-    with sd.InputStream(samplerate=samplerate, channels=channels, callback=callback):
-        sd.sleep(int(duration * 1000))  # Keep alive
-
-    audio = np.concatenate(frames, axis=0)
-    write(filename, samplerate, audio)
-    print(f"✅ Recording saved to: {filename}")
+        recorder.push(indata)
+
+    try:
+        with sd.InputStream(samplerate=samplerate, channels=channels, dtype="int16", callback=callback):
+            stop.wait(args.duration)  # Keep alive until the time limit or SIGTERM
+    except KeyboardInterrupt:
+        pass
+
+    paths = recorder.close()
+    seconds = recorder.total_frames / samplerate
+    print(f"✅ Recording saved to: {', '.join(paths)} ({seconds:.1f}s)")
+    if recorder.ring.dropped_frames:
+        print(f"⚠️ Dropped {recorder.ring.dropped_frames} frames (disk too slow)")
 
 except Exception as e:
     print(f"❌ Recording failed: {e}")
@@ -0,0 +1,346 @@
+# sample_bank.py
+"""
+Pre-rendered SoundFont sample bank.
+
+Build step (offline, no audio device needed):
+    python -m scripts.sample_bank [--velocities 50 90 127]
+
+Every note reachable from the gesture tables (note_maps.py and the instrument
+plugins) is rendered from FluidR3_GM.sf2 at a few velocity layers into one
+int16 stereo array (sounds/sample_bank.npy) plus a JSON index of offsets.
+Chords are covered by their notes: voices are mixed additively, so a chord is
+its notes triggered together.
+
+At runtime SampleBank memory-maps the array (startup is a file open, not a
+SoundFont load) and SampleBankPlayer plays the buffers as voices of the
+instruments BlockMixer (voice cap, stealing, release fades, soft limiter).
+Output follows AUDIO_DRIVER like the synth's render drivers: a sounddevice
+stream, a WAV file or a null sink, so a host without PortAudio or an output
+device still runs (headless deployments).
+The player hands out channels with the same interface as synth_engine's
+ChannelHandle, so gesture_control and the note scheduler drive it unchanged.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+
+import numpy as np
+
+from instruments.mixer import BlockMixer, NullSink, WavFileSink
+from scripts.audio_backend import AUDIO_DRIVER, AUDIO_FILE, driver_candidates
+from scripts.note_scheduler import NoteScheduler, SampleClock
+from scripts.note_maps import (CHORD_DURATION, CHORD_MAP, DRUM_DURATION, DRUM_MAP, DRUMS_VOICE, INSTRUMENT_PROGRAMS,
+                               MELODIC_DURATION, MELODY_DURATION, MELODY_MAP, PIANO_VOICE, STRINGS_VOICE)
+
+BANK_PATH = os.path.join("sounds", "sample_bank")  # .npy (PCM) + .json (index)
+SF2_PATH = os.path.join("sounds", "FluidR3_GM.sf2")
+SAMPLE_RATE = 44100
+VELOCITY_LAYERS = (50, 90, 127)
+SUSTAIN_HOLD = 2.0    # seconds held for plugin notes, which sound until the gesture changes
+RELEASE_TAIL = 1.0    # seconds rendered after the note-off
+SILENCE = 8           # int16 level below which the tail is trimmed
+RELEASE_FADE = 0.02   # seconds; fade applied when a voice is released early
+
+DRUM_CHANNEL = 9
+NUM_CHANNELS = 16
+ALL_SOUND_OFF = 120   # MIDI CC
+ALL_NOTES_OFF = 123
+
+
+def voice_key(bank: int, program: int, note: int, velocity: int) -> str:
+    return f"{bank}:{program}:{note}:{velocity}"
+
+
+def reachable_notes() -> dict:
+    """(bank, program) -> [notes, hold seconds] for every gesture table."""
+    voices = defaultdict(lambda: [set(), 0.0])
+
+    def add(voice, notes, hold):
+        voices[voice][0].update(notes)
+        voices[voice][1] = max(voices[voice][1], hold)
+
+    add(PIANO_VOICE, MELODY_MAP.values(), MELODY_DURATION)
+    add(STRINGS_VOICE, {note for chord in CHORD_MAP.values() for note in chord}, CHORD_DURATION)
+    add(DRUMS_VOICE, DRUM_MAP.values(), DRUM_DURATION)
+    for program in INSTRUMENT_PROGRAMS.values():
+        add((0, program), MELODY_MAP.values(), MELODIC_DURATION)
+
+    # The instrument plugins use sibling imports (they run from scripts/)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from instrument_plugins import PLUGINS
+    for plugin in PLUGINS.values():
+        for channel_name, notes in plugin.reachable_notes().items():
+            add(plugin.voices[channel_name], notes, SUSTAIN_HOLD)
+    return voices
+
+
+def build_sample_bank(sf2_path: str = SF2_PATH, path: str = BANK_PATH, velocities=VELOCITY_LAYERS) -> dict:
+    """Render every reachable note at each velocity layer and write the bank."""
+    import fluidsynth
+
+    started = time.perf_counter()
+    synth = fluidsynth.Synth(samplerate=float(SAMPLE_RATE))  # No driver: rendered offline
+    sfid = synth.sfload(sf2_path)
+    if sfid == -1:
+        raise FileNotFoundError(f"Soundfont not found: {sf2_path}")
+
+    chunks, index, offset = [], {}, 0
+    for (bank, program), (notes, hold) in sorted(reachable_notes().items()):
+        channel = DRUM_CHANNEL if bank == 128 else 0
+        synth.program_select(channel, sfid, bank, program)
+        for note in sorted(notes):
+            for velocity in velocities:
+                synth.noteon(channel, note, velocity)
+                held = synth.get_samples(int(hold * SAMPLE_RATE))
+                synth.noteoff(channel, note)
+                tail = synth.get_samples(int(RELEASE_TAIL * SAMPLE_RATE))
+                pcm = np.concatenate([held, tail]).astype(np.int16).reshape(-1, 2)
+
+                # Trim the silent end of the tail
+                loud = np.flatnonzero(np.abs(pcm).max(axis=1) > SILENCE)
+                pcm = pcm[:loud[-1] + 1] if len(loud) else pcm[:1]
+
+                index[voice_key(bank, program, note, velocity)] = [offset, len(pcm)]
+                chunks.append(pcm)
+                offset += len(pcm)
+
+                # Cut the voice and flush reverb so it does not bleed into the next render
+                synth.cc(channel, ALL_SOUND_OFF, 0)
+                synth.get_samples(SAMPLE_RATE // 2)
+    synth.delete()
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    np.save(f"{path}.npy", np.concatenate(chunks))
+    meta = {"sample_rate": SAMPLE_RATE, "velocities": list(velocities), "soundfont": os.path.basename(sf2_path),
+            "voices": index}
+    with open(f"{path}.json", "w") as f:
+        json.dump(meta, f)
+
+    size_mb = offset * 4 / (1024 * 1024)
+    print(f"✅ Sample bank: {len(index)} buffers, {size_mb:.1f} MB in {time.perf_counter() - started:.1f}s → {path}.npy")
+    return meta
+
+
+class SampleBank:
+    """Memory-mapped pre-rendered voices, looked up by (bank, program, note, velocity)."""
+
+    def __init__(self, path: str = BANK_PATH):
+        started = time.perf_counter()
+        with open(f"{path}.json") as f:
+            meta = json.load(f)
+        self.sample_rate = meta["sample_rate"]
+        self.velocities = meta["velocities"]
+        self.index = meta["voices"]
+        self.pcm = np.load(f"{path}.npy", mmap_mode="r")
+        self.load_ms = (time.perf_counter() - started) * 1000
+        print(f"🎼 Sample bank loaded in {self.load_ms:.1f} ms ({len(self.index)} buffers)")
+
+    @staticmethod
+    def exists(path: str = BANK_PATH) -> bool:
+        return os.path.exists(f"{path}.npy") and os.path.exists(f"{path}.json")
+
+    def lookup(self, bank: int, program: int, note: int, velocity: int):
+        """(pcm, gain) from the nearest velocity layer, or (None, 0) if the note was not rendered."""
+        layer = min(self.velocities, key=lambda v: abs(v - velocity))
+        entry = self.index.get(voice_key(bank, program, note, layer))
+        if entry is None:
+            return None, 0.0
+        offset, frames = entry
+        return self.pcm[offset:offset + frames], velocity / layer
+
+
+class BankChannel:
+    """A player channel with the ChannelHandle interface (noteon/noteoff/cc/set_program)."""
+
+    __slots__ = ("player", "name", "channel", "bank", "program")
+
+    def __init__(self, player: "SampleBankPlayer", name: str, channel: int, bank: int, program: int):
+        self.player = player
+        self.name = name
+        self.channel = channel
+        self.bank = bank
+        self.program = program
+
+    def noteon(self, note: int, velocity: int = 100):
+        self.player.trigger(self, note, velocity)
+
+    def noteoff(self, note: int):
+        self.player.release(self, note)
+
+    def cc(self, control: int, value: int):
+        if control in (ALL_SOUND_OFF, ALL_NOTES_OFF):
+            self.all_notes_off()
+
+    def all_notes_off(self):
+        self.player.release(self)
+
+    def set_program(self, program: int, bank: int = None):
+        self.bank = self.bank if bank is None else bank
+        self.program = program
+
+
+RENDER_DRIVERS = ("sounddevice", "file", "null")
+
+
+class TapSink:
+    """Passes mixer blocks to a sink and to the player's taps."""
+
+    def __init__(self, player: "SampleBankPlayer", sink):
+        self.player = player
+        self.sink = sink
+        self.paced = sink.paced
+
+    def write(self, block: np.ndarray):
+        self.sink.write(block)
+        self.player.deliver(block)
+
+    def close(self):
+        self.sink.close()
+
+
+class SampleBankPlayer:
+    """Plays pre-rendered voices through a BlockMixer; no synth on the hot path."""
+
+    def __init__(self, bank: SampleBank, block_size: int = 256, max_voices: int = 48):
+        self.bank = bank
+        self.block_size = block_size
+        self.mixer = BlockMixer(sample_rate=bank.sample_rate, block_size=block_size, max_voices=max_voices)
+        self.channels = {}
+        self._lock = threading.Lock()
+        self._stream = None
+        self.driver = None
+        self.taps = []
+        self.triggered = 0
+        self.missing = 0
+
+    def channel(self, name: str, program: int, bank: int = 0) -> BankChannel:
+        """Same contract as SynthEngine.channel()."""
+        with self._lock:
+            handle = self.channels.get(name)
+            if handle is None:
+                used = {h.channel for h in self.channels.values()}
+                number = DRUM_CHANNEL if bank == 128 else next(
+                    c for c in range(NUM_CHANNELS) if c != DRUM_CHANNEL and c not in used)
+                handle = BankChannel(self, name, number, bank, program)
+                self.channels[name] = handle
+            return handle
+
+    def trigger(self, channel: BankChannel, note: int, velocity: int):
+        pcm, gain = self.bank.lookup(channel.bank, channel.program, note, velocity)
+        if pcm is None:
+            self.missing += 1
+            return
+        # A retrigger restarts the note; the mixer steals the oldest voice past the cap
+        self.mixer.play(pcm, channel.name, gain, key=(channel.channel, note))
+        self.triggered += 1
+
+    def release(self, channel: BankChannel, note: int = None):
+        """Fade out one note (or every note on the channel) over RELEASE_FADE."""
+        fade = int(RELEASE_FADE * self.bank.sample_rate)
+        if note is None:
+            self.mixer.release(fade, instrument=channel.name)
+        else:
+            self.mixer.release(fade, key=(channel.channel, note))
+
+    def start(self, driver: str = AUDIO_DRIVER) -> "SampleBankPlayer":
+        """Start the first render driver in ``driver`` that opens; null when none does."""
+        candidates = [name for name in driver_candidates(driver) if name in RENDER_DRIVERS] or ["null"]
+        errors = []
+        for candidate in candidates:
+            try:
+                if candidate == "sounddevice":
+                    self._open_stream()
+                elif candidate == "file":
+                    os.makedirs(os.path.dirname(AUDIO_FILE) or ".", exist_ok=True)
+                    self.mixer.sink = TapSink(self, WavFileSink(AUDIO_FILE, self.bank.sample_rate))
+                    self.mixer.start()
+                else:
+                    self.mixer.sink = TapSink(self, NullSink())
+                    self.mixer.start()
+            except Exception as e:
+                errors.append(f"{candidate}: {e}")
+                continue
+            self.driver = candidate
+            if errors:
+                print(f"⚠️ Sample bank outputs unavailable ({'; '.join(errors)})")
+            break
+        else:
+            print(f"⚠️ Sample bank output unavailable ({'; '.join(errors)}), mixing to the null sink")
+            self.mixer.sink = TapSink(self, NullSink())
+            self.mixer.start()
+            self.driver = "null"
+        print(f"🔊 Sample bank output: {self.driver}")
+        return self
+
+    def _open_stream(self):
+        """sounddevice stream that mixes a block in each callback."""
+        import sounddevice as sd
+
+        def callback(outdata, frames, time_info, status):
+            block = self.mixer.render_block()  # The stream's blocksize is the mixer's
+            outdata[:] = block
+            self.deliver(block)
+
+        stream = sd.OutputStream(samplerate=self.bank.sample_rate, channels=2, dtype="float32",
+                                 blocksize=self.block_size, callback=callback)
+        stream.start()
+        self._stream = stream
+
+    def deliver(self, block: np.ndarray):
+        taps = self.taps
+        if taps:
+            block = block.copy()  # The mixer reuses its buffer; taps may queue the block
+            for tap in taps:
+                tap(block)
+
+    def clocked_scheduler(self) -> NoteScheduler:
+        """A note scheduler on the mixer's sample clock (ticked before every block)."""
+        if self.mixer.scheduler is None:
+            self.mixer.scheduler = NoteScheduler(SampleClock(self.mixer.sample_rate))
+        return self.mixer.scheduler
+
+    def add_tap(self, tap):
+        """Receive every mixed output block (float32 stereo)."""
+        self.taps = self.taps + [tap]
+
+    def remove_tap(self, tap):
+        self.taps = [t for t in self.taps if t is not tap]
+
+    def all_notes_off(self):
+        self.mixer.stop()
+
+    def stats(self) -> dict:
+        return {
+            "engine": "sample_bank",
+            "driver": self.driver,
+            "load_ms": round(self.bank.load_ms, 1),
+            "buffers": len(self.bank.index),
+            "active_voices": len(self.mixer.voices),
+            "triggered": self.triggered,
+            "missing": self.missing,
+            "mixer": self.mixer.stats(),
+            "channels": {name: {"channel": h.channel, "bank": h.bank, "program": h.program}
+                         for name, h in self.channels.items()},
+        }
+
+    def delete(self):
+        self.all_notes_off()
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+        else:
+            self.mixer.stop_rendering()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-render the gesture note tables into a sample bank")
+    parser.add_argument("--soundfont", default=SF2_PATH)
+    parser.add_argument("--output", default=BANK_PATH)
+    parser.add_argument("--velocities", type=int, nargs="+", default=list(VELOCITY_LAYERS))
+    args = parser.parse_args()
+    build_sample_bank(args.soundfont, args.output, tuple(args.velocities))
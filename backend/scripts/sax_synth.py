@@ -1,27 +1,24 @@
 # sax_synth.py
 
-import fluidsynth
-import pygame
+from synth_engine import get_synth_engine
 
 class SaxSynth:
     def __init__(self, sf2_path="./sounds/FluidR3_GM.sf2"):
-        self.fs = fluidsynth.Synth()
-        self.fs.start(driver="coreaudio")
-        self.sfid = self.fs.sfload(sf2_path)
-        self.fs.program_select(0, self.sfid, 0, 65)  # 73 = Flute (GM 74)
+        # Channel on the shared synth engine; the SoundFont is only loaded once per process
+        self.channel = get_synth_engine(sf2_path).channel("saxophone", program=65)  # 65 = Alto Sax (GM 66)
         self.last_note = None
 
     def play_note(self, midi_note, velocity=120):
         if self.last_note is not None:
-            self.fs.noteoff(0, self.last_note)
-        self.fs.noteon(0, midi_note, velocity)
+            self.channel.noteoff(self.last_note)
+        self.channel.noteon(midi_note, velocity)
         self.last_note = midi_note
 
     def stop(self):
         if self.last_note is not None:
-            self.fs.noteoff(0, self.last_note)
+            self.channel.noteoff(self.last_note)
             self.last_note = None
 
     def delete(self):
+        # The shared engine outlives individual instruments
         self.stop()
-        self.fs.delete()
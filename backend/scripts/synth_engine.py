@@ -0,0 +1,150 @@
+# synth_engine.py
+"""
+One shared FluidSynth engine per process.
+
+The SoundFont is loaded once and one audio driver is started once. Instruments
+ask for a named channel and get a lightweight ChannelHandle bound to their own
+MIDI channel and program. Asking for the same name again returns the same
+handle, so memory and startup time stay flat however many instruments are
+active.
+"""
+import os
+import threading
+import time
+from typing import Optional
+
+import fluidsynth
+
+try:
+    from audio_backend import AUDIO_DRIVER, SAMPLE_RATE, RenderOutput, open_audio_output
+    from note_scheduler import NoteScheduler, SampleClock
+except ImportError:  # Imported as scripts.synth_engine from the backend
+    from scripts.audio_backend import AUDIO_DRIVER, SAMPLE_RATE, RenderOutput, open_audio_output
+    from scripts.note_scheduler import NoteScheduler, SampleClock
+
+SF2_PATH = os.path.join("sounds", "FluidR3_GM.sf2")
+
+DRUM_CHANNEL = 9     # General MIDI percussion channel
+DRUM_BANK = 128
+NUM_CHANNELS = 16
+ALL_NOTES_OFF = 123  # MIDI CC
+
+
+class ChannelHandle:
+    """One MIDI channel on the shared synth, with its program already selected."""
+
+    __slots__ = ("engine", "name", "channel", "bank", "program")
+
+    def __init__(self, engine: "SynthEngine", name: str, channel: int, bank: int, program: int):
+        self.engine = engine
+        self.name = name
+        self.channel = channel
+        self.bank = bank
+        self.program = program
+
+    def noteon(self, note: int, velocity: int = 100):
+        self.engine.synth.noteon(self.channel, note, velocity)
+
+    def noteoff(self, note: int):
+        self.engine.synth.noteoff(self.channel, note)
+
+    def cc(self, control: int, value: int):
+        self.engine.synth.cc(self.channel, control, value)
+
+    def all_notes_off(self):
+        self.cc(ALL_NOTES_OFF, 0)
+
+    def set_program(self, program: int, bank: int = None):
+        """Change this channel's program (cheap: no SoundFont load)."""
+        self.bank = self.bank if bank is None else bank
+        self.program = program
+        self.engine.synth.program_select(self.channel, self.engine.sfid, self.bank, self.program)
+
+    def __repr__(self):
+        return f"ChannelHandle({self.name!r}, channel={self.channel}, program={self.bank}:{self.program})"
+
+
+class SynthEngine:
+    """Owns the process's single fluidsynth.Synth and hands out channels."""
+
+    def __init__(self, sf2_path: str = SF2_PATH, driver: str = AUDIO_DRIVER):
+        started = time.perf_counter()
+        self.sf2_path = sf2_path
+        self.synth = fluidsynth.Synth(samplerate=float(SAMPLE_RATE))
+        self.output = open_audio_output(self.synth, driver)
+        self.driver = self.output.driver
+        self.sfid = self.synth.sfload(sf2_path) if os.path.exists(sf2_path) else -1
+        if self.sfid == -1:
+            print(f"⚠️ Soundfont not found at {sf2_path}, using default")
+        self.channels = {}
+        self._lock = threading.Lock()
+        self.startup_ms = (time.perf_counter() - started) * 1000
+        print(f"🎹 Synth engine ready in {self.startup_ms:.0f} ms ({sf2_path})")
+
+    def channel(self, name: str, program: int, bank: int = 0) -> ChannelHandle:
+        """Channel for ``name``, allocated and programmed on first use."""
+        with self._lock:
+            handle = self.channels.get(name)
+            if handle is None:
+                handle = ChannelHandle(self, name, self._free_channel(bank), bank, program)
+                self.channels[name] = handle
+                handle.set_program(program, bank)
+            return handle
+
+    def _free_channel(self, bank: int) -> int:
+        if bank == DRUM_BANK:
+            return DRUM_CHANNEL
+        used = {handle.channel for handle in self.channels.values()}
+        for channel in range(NUM_CHANNELS):
+            if channel != DRUM_CHANNEL and channel not in used:
+                return channel
+        raise RuntimeError("All MIDI channels are in use")
+
+    def add_tap(self, tap):
+        """Receive every rendered output block (render drivers only)."""
+        self.output.add_tap(tap)
+
+    def remove_tap(self, tap):
+        self.output.remove_tap(tap)
+
+    def clocked_scheduler(self) -> Optional[NoteScheduler]:
+        """A note scheduler on the render loop's sample clock; None when a FluidSynth driver plays on its own."""
+        if not isinstance(self.output, RenderOutput):
+            return None
+        if self.output.scheduler is None:
+            self.output.scheduler = NoteScheduler(SampleClock(self.output.sample_rate))
+        return self.output.scheduler
+
+    def all_notes_off(self):
+        for handle in list(self.channels.values()):
+            handle.all_notes_off()
+
+    def stats(self) -> dict:
+        return {
+            "soundfont": self.sf2_path,
+            "driver": self.driver,
+            "output": self.output.stats(),
+            "startup_ms": round(self.startup_ms, 1),
+            "channels": {name: {"channel": h.channel, "bank": h.bank, "program": h.program}
+                         for name, h in self.channels.items()},
+        }
+
+    def delete(self):
+        self.all_notes_off()
+        self.output.close()
+        self.synth.delete()
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_synth_engine(sf2_path: str = SF2_PATH, driver: str = AUDIO_DRIVER) -> SynthEngine:
+    """The process-wide engine, created on first use."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = SynthEngine(sf2_path, driver)
+        elif os.path.normpath(sf2_path) != os.path.normpath(_engine.sf2_path):
+            print(f"⚠️ Synth engine already loaded {_engine.sf2_path}, ignoring {sf2_path}")
+        return _engine
@@ -0,0 +1,187 @@
+"""
+Direct-to-disk recording of the synth output bus.
+
+The recorder registers a tap on the playback engine (the shared synth's
+render output, or the sample bank player), so it captures exactly the blocks
+that go to the speakers, with no microphone and no ffmpeg process. The tap
+only does a non-blocking put on a bounded queue. A writer thread drains the
+queue into a 16-bit WAV, and blocks are counted as dropped if the writer
+falls behind. Start and stop are instant because stop() just detaches the
+tap; the writer finishes the file in the background.
+
+Every recording gets a JSON sidecar (<name>.wav.json) tagged with the
+instrument and session.
+
+Outputs that play straight through a native FluidSynth driver cannot be
+tapped; starting a recording on one raises before any file is created.
+The instrument engine process (scripts/main.py) has its own synth, so it
+records itself on request over the engine control socket.
+"""
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+import wave
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+RECORDINGS_DIR = "recordings"
+SAMPLE_RATE = 44100
+QUEUE_BLOCKS = 512  # ~6 s of 512-frame blocks
+
+_STOP = object()
+
+
+def to_pcm16(block: np.ndarray) -> np.ndarray:
+    """Output blocks are int16 interleaved (synth) or float32 (frames, 2) (sample bank)."""
+    if block.dtype == np.int16:
+        return block
+    return (np.clip(block, -1.0, 1.0) * 32767).astype(np.int16)
+
+
+def sidecar_path(filepath: str) -> str:
+    return f"{filepath}.json"
+
+
+def read_tags(filepath: str) -> dict:
+    try:
+        with open(sidecar_path(filepath)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+class Recording:
+    """One take: a tap feeding a bounded queue, drained by a writer thread."""
+
+    def __init__(self, source, filepath: str, tags: dict, sample_rate: int = SAMPLE_RATE,
+                 queue_blocks: int = QUEUE_BLOCKS):
+        self.source = source
+        self.filepath = filepath
+        self.tags = tags
+        self.sample_rate = sample_rate
+        self._queue = queue.Queue(maxsize=queue_blocks)
+        self.frames = 0
+        self.blocks = 0
+        self.dropped_blocks = 0
+        self.writer_cpu_seconds = 0.0
+        self.started = time.time()
+        self.stopped: Optional[float] = None
+
+        source.add_tap(self.tap)  # Raises for untappable outputs, before anything is created
+        try:
+            self._wav = wave.open(filepath, "wb")
+            self._wav.setnchannels(2)
+            self._wav.setsampwidth(2)
+            self._wav.setframerate(sample_rate)
+        except Exception:
+            source.remove_tap(self.tap)
+            if os.path.exists(filepath):
+                os.remove(filepath)
+            raise
+        self._writer = threading.Thread(target=self._write, name="synth-recorder", daemon=True)
+        self._writer.start()
+
+    def tap(self, block: np.ndarray):
+        """Called on the audio thread: never blocks."""
+        try:
+            self._queue.put_nowait(block)
+        except queue.Full:
+            self.dropped_blocks += 1
+
+    def _write(self):
+        while True:
+            block = self._queue.get()
+            if block is _STOP:
+                break
+            started = time.thread_time()
+            pcm = to_pcm16(block)
+            self._wav.writeframes(pcm.tobytes())
+            self.frames += pcm.size // 2
+            self.blocks += 1
+            self.writer_cpu_seconds += time.thread_time() - started
+        self._wav.close()
+        self._write_sidecar()
+
+    def _write_sidecar(self):
+        tags = {**self.tags, "duration_seconds": round(self.frames / self.sample_rate, 3),
+                "dropped_blocks": self.dropped_blocks}
+        with open(sidecar_path(self.filepath), "w") as f:
+            json.dump(tags, f)
+
+    def stop(self):
+        """Detach the tap; the writer drains what is queued and closes the file."""
+        self.source.remove_tap(self.tap)
+        self.stopped = time.time()
+        self._queue.put(_STOP)
+
+    def wait(self, timeout: float = None):
+        self._writer.join(timeout)
+
+    def stats(self) -> dict:
+        elapsed = (self.stopped or time.time()) - self.started
+        return {
+            "filename": os.path.basename(self.filepath),
+            **self.tags,
+            "recording": self.stopped is None,
+            "seconds_written": round(self.frames / self.sample_rate, 3),
+            "blocks_written": self.blocks,
+            "dropped_blocks": self.dropped_blocks,
+            "queued_blocks": self._queue.qsize(),
+            "writer_cpu_ms": round(self.writer_cpu_seconds * 1000, 3),
+            "writer_load": round(self.writer_cpu_seconds / elapsed, 5) if elapsed > 0 else 0.0,
+        }
+
+
+class SynthRecorder:
+    """Starts and stops recordings of the playback engine's output (one take at a time)."""
+
+    def __init__(self, directory: str = RECORDINGS_DIR):
+        self.directory = directory
+        self.current: Optional[Recording] = None
+        self.last: Optional[Recording] = None
+        self._lock = threading.Lock()
+
+    def start(self, source, instrument: str, session: Optional[str] = None) -> Recording:
+        """Record ``source`` (anything with add_tap/remove_tap) into a new tagged WAV."""
+        os.makedirs(self.directory, exist_ok=True)
+        now = datetime.now()
+        filename = f"recording_{instrument}_{now.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}.wav"
+        tags = {
+            "instrument": instrument,
+            "session": session or uuid.uuid4().hex,
+            "started": now.isoformat(),
+            "sample_rate": SAMPLE_RATE,
+            "source": "synth",
+        }
+        with self._lock:
+            if self.current is not None:
+                self.current.stop()
+                self.last, self.current = self.current, None
+            self.current = Recording(source, os.path.join(self.directory, filename), tags)
+            logger.info(f"🎙️ Recording synth output to {filename}")
+            return self.current
+
+    def stop(self) -> Optional[Recording]:
+        with self._lock:
+            recording, self.current = self.current, None
+            if recording is not None:
+                recording.stop()
+                self.last = recording
+                logger.info(f"⏹️ Stopped recording {os.path.basename(recording.filepath)}")
+            return recording
+
+    def stats(self) -> dict:
+        recording = self.current or self.last
+        return recording.stats() if recording else {"recording": False}
+
+
+# Global recorder used by the /recording endpoints
+synth_recorder = SynthRecorder()
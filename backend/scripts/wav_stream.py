@@ -0,0 +1,186 @@
+# wav_stream.py
+"""
+Incremental WAV recording with constant memory.
+
+The audio callback pushes blocks into a preallocated single-producer /
+single-consumer ring buffer. It takes no lock: only the producer moves the
+write index and only the consumer moves the read index. A writer thread
+drains the ring to disk, so memory stays at the ring's size however long the
+take runs.
+
+StreamingWavWriter writes a header with placeholder sizes and patches the
+RIFF and data chunk sizes on close. In crash-safe mode it also patches and
+fsyncs them every ``sync_seconds``, so a killed process still leaves a
+readable file. Long sessions can be split into parts of ``rotate_seconds``
+each.
+"""
+import os
+import struct
+import threading
+import time
+from typing import List, Optional
+
+import numpy as np
+
+HEADER_SIZE = 44
+
+
+class RingBuffer:
+    """Lock-free SPSC ring of audio frames (one producer thread, one consumer thread)."""
+
+    def __init__(self, capacity: int, channels: int, dtype=np.int16):
+        self.capacity = capacity
+        self._buffer = np.zeros((capacity, channels), dtype=dtype)
+        self._write = 0  # Total frames written (producer only)
+        self._read = 0   # Total frames read (consumer only)
+        self.dropped_frames = 0
+
+    def available(self) -> int:
+        return self._write - self._read
+
+    def push(self, frames: np.ndarray) -> bool:
+        """Copy ``frames`` in; drops the whole block (and counts it) if it does not fit."""
+        count = len(frames)
+        if count > self.capacity - (self._write - self._read):
+            self.dropped_frames += count
+            return False
+        start = self._write % self.capacity
+        first = min(count, self.capacity - start)
+        self._buffer[start:start + first] = frames[:first]
+        self._buffer[:count - first] = frames[first:]
+        self._write += count  # Publish only after the copy
+        return True
+
+    def pop(self) -> List[np.ndarray]:
+        """Views of everything available (at most two, at the wrap point); call consume() when done."""
+        count = self._write - self._read
+        start = self._read % self.capacity
+        first = min(count, self.capacity - start)
+        views = [self._buffer[start:start + first]]
+        if count > first:
+            views.append(self._buffer[:count - first])
+        return views
+
+    def consume(self, count: int):
+        self._read += count
+
+
+class StreamingWavWriter:
+    """PCM WAV file written block by block, with sizes patched on close (or periodically)."""
+
+    def __init__(self, path: str, sample_rate: int, channels: int, sample_width: int = 2,
+                 crash_safe: bool = False, sync_seconds: float = 1.0):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sample_width = sample_width
+        self.crash_safe = crash_safe
+        self.sync_seconds = sync_seconds
+        self.data_bytes = 0
+        self._last_sync = time.monotonic()
+        self._file = open(path, "wb")
+        self._file.write(self._header(0))
+
+    @property
+    def frames(self) -> int:
+        return self.data_bytes // (self.channels * self.sample_width)
+
+    def _header(self, data_bytes: int) -> bytes:
+        block_align = self.channels * self.sample_width
+        return (b"RIFF" + struct.pack("<I", 36 + data_bytes) + b"WAVE"
+                + b"fmt " + struct.pack("<IHHIIHH", 16, 1, self.channels, self.sample_rate,
+                                        self.sample_rate * block_align, block_align, self.sample_width * 8)
+                + b"data" + struct.pack("<I", data_bytes))
+
+    def write(self, frames: np.ndarray):
+        data = frames.tobytes()
+        self._file.write(data)
+        self.data_bytes += len(data)
+        if self.crash_safe and time.monotonic() - self._last_sync >= self.sync_seconds:
+            self.sync()
+
+    def _patch_sizes(self):
+        position = self._file.tell()
+        self._file.seek(4)
+        self._file.write(struct.pack("<I", 36 + self.data_bytes))
+        self._file.seek(40)
+        self._file.write(struct.pack("<I", self.data_bytes))
+        self._file.seek(position)
+
+    def sync(self):
+        """Make the file readable as-is: patch sizes, flush and fsync."""
+        self._patch_sizes()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._patch_sizes()
+        self._file.close()
+
+
+class StreamingRecorder:
+    """Ring buffer + writer thread feeding StreamingWavWriter, with optional rotation into parts."""
+
+    def __init__(self, path: str, sample_rate: int, channels: int, ring_seconds: float = 2.0,
+                 rotate_seconds: Optional[float] = None, crash_safe: bool = False, poll_seconds: float = 0.05):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.rotate_frames = int(rotate_seconds * sample_rate) if rotate_seconds else None
+        self.crash_safe = crash_safe
+        self.poll_seconds = poll_seconds
+        self.ring = RingBuffer(int(ring_seconds * sample_rate), channels)
+        self.paths = []
+        self.total_frames = 0
+        self._writer = None
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="wav-writer", daemon=True)
+        self._open_part()
+        self._thread.start()
+
+    def _part_path(self, part: int) -> str:
+        if part == 1:
+            return self.path
+        root, ext = os.path.splitext(self.path)
+        return f"{root}_part{part:03d}{ext}"
+
+    def _open_part(self):
+        if self._writer is not None:
+            self._writer.close()
+        path = self._part_path(len(self.paths) + 1)
+        self._writer = StreamingWavWriter(path, self.sample_rate, self.channels, crash_safe=self.crash_safe)
+        self.paths.append(path)
+
+    def push(self, frames: np.ndarray) -> bool:
+        """Audio callback side: never blocks, never allocates."""
+        return self.ring.push(frames)
+
+    def _drain(self):
+        for view in self.ring.pop():
+            while len(view):
+                if self.rotate_frames and self._writer.frames >= self.rotate_frames:
+                    self._open_part()
+                room = self.rotate_frames - self._writer.frames if self.rotate_frames else len(view)
+                chunk = view[:room]
+                self._writer.write(chunk)
+                self.ring.consume(len(chunk))
+                self.total_frames += len(chunk)
+                view = view[len(chunk):]
+
+    def _run(self):
+        while self._running:
+            if self.ring.available():
+                self._drain()
+            else:
+                time.sleep(self.poll_seconds)
+        self._drain()
+
+    def close(self) -> List[str]:
+        """Drain what is buffered, patch the header and return the written file(s)."""
+        self._running = False
+        self._thread.join()
+        self._writer.close()
+        return self.paths
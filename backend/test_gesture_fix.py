@@ -4,6 +4,8 @@ import cv2
 import mediapipe as mp
 import time
 
+from scripts.hand_classifier import count_extended_fingers, landmarks_to_array
+
 print("🎥 Testing Gesture Recognition Fix")
 print("=" * 50)
 
@@ -45,12 +47,11 @@ def test_webcam_display():
                 print("✅ Hands detected!")
                 hands_detected = True
                 
-            for hand_landmarks in results.multi_hand_landmarks:
+            # Count fingers for gesture recognition test (all hands at once)
+            finger_counts = count_extended_fingers(landmarks_to_array(results.multi_hand_landmarks))
+            for hand_landmarks, finger_count in zip(results.multi_hand_landmarks, finger_counts.tolist()):
                 mp_draw.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
                 
-                # Count fingers for gesture recognition test
-                finger_count = count_extended_fingers(hand_landmarks)
-                
                 # Display finger count
                 cv2.putText(frame, f"Fingers: {finger_count}", (10, 60),
                            cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
@@ -84,24 +85,6 @@ def test_webcam_display():
     
     return hands_detected
 
-def count_extended_fingers(hand_landmarks):
-    """Count number of extended fingers"""
-    tips = [8, 12, 16, 20]  # Index, Middle, Ring, Pinky
-    count = 0
-    
-    # Check 4 fingers
-    for tip_id in tips:
-        tip = hand_landmarks.landmark[tip_id]
-        pip = hand_landmarks.landmark[tip_id - 2]
-        if tip.y < pip.y:  # Finger is up
-            count += 1
-    
-    # Check thumb
-    if hand_landmarks.landmark[4].x < hand_landmarks.landmark[3].x:
-        count += 1
-    
-    return count
-
 def main():
     print("🔧 This test will:")
     print("1. Check if webcam displays your hands")
@@ -6,11 +6,23 @@ import numpy as np
 import mediapipe as mp
 from fastapi import WebSocket, WebSocketDisconnect
 import logging
+import time
 from typing import Dict, List, Optional
 from datetime import datetime
 import io
 from PIL import Image
 
+from frame_protocol import (
+    FrameProtocolError, MSG_VIDEO_FRAME, PROTOCOL_BINARY,
+    decode_frame, describe_protocol, negotiate_protocol,
+)
+from inference_pool import InferencePool, LatencyStats
+from scripts.hand_classifier import gesture_results, landmarks_to_array
+from landmark_codec import (
+    FORMAT_JSON, TRANSPORT_BINARY, LandmarkEncoder, landmarks_to_dicts, pack_result_message,
+)
+from note_dispatch import note_dispatcher
+
 logger = logging.getLogger(__name__)
 
 class GestureDetector:
@@ -32,124 +44,103 @@ class GestureDetector:
             rgb_image = cv2.cvtColor(image_array, cv2.COLOR_BGR2RGB)
             results = self.hands.process(rgb_image)
             
-            gestures = []
-            landmarks_data = []
-            
-            if results.multi_hand_landmarks:
-                for i, hand_landmarks in enumerate(results.multi_hand_landmarks):
-                    # Convert landmarks to serializable format
-                    landmarks_list = []
-                    for landmark in hand_landmarks.landmark:
-                        landmarks_list.append({
-                            "x": landmark.x,
-                            "y": landmark.y,
-                            "z": landmark.z
-                        })
-                    
-                    landmarks_data.append(landmarks_list)
-                    
-                    # Classify gesture with confidence
-                    gesture = self._classify_gesture_improved(hand_landmarks)
-                    if gesture and gesture["confidence"] > 0.4:  # Lower threshold for more responsive detection
-                        gestures.append(gesture)
+            # All hands converted and classified in one vectorized pass
+            landmarks = landmarks_to_array(results.multi_hand_landmarks)
+            gestures = gesture_results(landmarks, min_confidence=0.4)  # Lower threshold for more responsive detection
             
             return {
                 "gestures": gestures,
-                "landmarks": landmarks_data
+                "landmarks": landmarks
             }
         except Exception as e:
             logger.error(f"Gesture detection error: {e}")
-            return {"gestures": [], "landmarks": []}
-    
-    def _classify_gesture_improved(self, landmarks):
-        """Improved gesture classification with better confidence"""
-        try:
-            # Get landmark positions
-            points = []
-            for lm in landmarks.landmark:
-                points.append([lm.x, lm.y])
-            
-            # Finger tip and base indices
-            FINGER_TIPS = [4, 8, 12, 16, 20]  # Thumb, Index, Middle, Ring, Pinky
-            FINGER_BASES = [3, 6, 10, 14, 18]  # Base joints for comparison
-            
-            extended_fingers = []
-            confidence = 0.0
-            
-            # Check each finger
-            for i, (tip_idx, base_idx) in enumerate(zip(FINGER_TIPS, FINGER_BASES)):
-                tip = points[tip_idx]
-                base = points[base_idx]
-                
-                # Different logic for thumb vs fingers
-                if i == 0:  # Thumb
-                    # Thumb extended if tip is further right than base (for right hand)
-                    wrist = points[0]
-                    if abs(tip[0] - wrist[0]) > abs(base[0] - wrist[0]) * 1.2:
-                        extended_fingers.append(i)
-                        confidence += 0.15
-                else:  # Other fingers
-                    # Finger extended if tip is above base (more lenient)
-                    if tip[1] < base[1] - 0.02:  # Less strict threshold
-                        extended_fingers.append(i)
-                        confidence += 0.2
-            
-            finger_count = len(extended_fingers)
-            
-            # Only return gesture if confidence is high enough (lowered threshold)
-            if confidence < 0.2:
-                return None
-                
-            # Map to gesture names with improved logic
-            if finger_count == 0:
-                gesture_name = "fist"
-                confidence = min(confidence + 0.3, 1.0)
-            elif finger_count == 1:
-                if 1 in extended_fingers:  # Index finger
-                    gesture_name = "point"
-                else:
-                    gesture_name = "point"  # Default for single finger
-            elif finger_count == 2:
-                if 1 in extended_fingers and 2 in extended_fingers:  # Index + Middle
-                    gesture_name = "peace"
-                else:
-                    gesture_name = "peace"  # Default for two fingers
-            elif finger_count == 3:
-                gesture_name = "three"
-            elif finger_count == 4:
-                gesture_name = "four"
-            else:  # 5 fingers
-                gesture_name = "open_hand"
-                confidence = min(confidence + 0.2, 1.0)
-            
-            gesture_result = {
-                "name": gesture_name,
-                "fingers": extended_fingers,
-                "count": finger_count,
-                "confidence": min(confidence, 1.0)
-            }
-            
-            # Only log high-confidence gestures to reduce spam
-            if confidence > 0.7:
-                logger.debug(f"High confidence gesture: {gesture_name} ({confidence:.2f})")
-            
-            return gesture_result
-            
-        except Exception as e:
-            logger.error(f"Gesture classification error: {e}")
+            return {"gestures": [], "landmarks": np.zeros((0, 21, 3), dtype=np.float32)}
+
+class FrameIngest:
+    """Per-connection ingest slot: only the newest pending frame is kept"""
+
+    MIN_FPS = 2
+    MAX_FPS = 15
+    HINT_HEADROOM = 1.25      # Ask for frames slightly slower than we can process them
+    HINT_INTERVAL = 2.0       # Minimum seconds between rate hints
+    EWMA_ALPHA = 0.2
+
+    def __init__(self):
+        self.pending = None  # (kind, payload, received_at)
+        self.ready = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.received = 0
+        self.processed = 0
+        self.dropped = 0
+        self.processing_ms = None  # EWMA of per-frame processing time
+        self.server_latency = LatencyStats()  # Receive -> response sent
+        self.client_latency = LatencyStats()  # Client capture timestamp -> response sent
+        self.hint_fps = None
+        self.last_hint_at = 0.0
+
+    def put(self, kind: str, payload):
+        """Store a frame, replacing (and counting) any frame not yet picked up"""
+        self.received += 1
+        if self.pending is not None:
+            self.dropped += 1
+        self.pending = (kind, payload, time.perf_counter())
+        self.ready.set()
+
+    async def take(self):
+        await self.ready.wait()
+        self.ready.clear()
+        item, self.pending = self.pending, None
+        return item
+
+    def record(self, processing_ms: float, latency_ms: float):
+        self.processed += 1
+        self.server_latency.add(latency_ms)
+        if self.processing_ms is None:
+            self.processing_ms = processing_ms
+        else:
+            self.processing_ms += self.EWMA_ALPHA * (processing_ms - self.processing_ms)
+
+    def next_hint(self) -> Optional[int]:
+        """Return a new target fps if it changed and the hint interval elapsed"""
+        if self.processing_ms is None or time.monotonic() - self.last_hint_at < self.HINT_INTERVAL:
+            return None
+        fps = int(1000 / (max(self.processing_ms, 1.0) * self.HINT_HEADROOM))
+        fps = max(self.MIN_FPS, min(self.MAX_FPS, fps))
+        if fps == self.hint_fps:
             return None
+        self.hint_fps = fps
+        self.last_hint_at = time.monotonic()
+        return fps
+
+    def stats(self) -> dict:
+        return {
+            "received": self.received,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "processing_ms": round(self.processing_ms or 0.0, 3),
+            "hint_fps": self.hint_fps,
+            "server_latency": self.server_latency.summary(),
+            "client_latency": self.client_latency.summary(),
+        }
 
 class ConnectionManager:
     def __init__(self):
         self.active_connections: List[WebSocket] = []
-        self.gesture_detector = GestureDetector()
+        self.inference_pool = InferencePool(GestureDetector)  # One GestureDetector per worker
         self.last_gesture_state = {}  # Track last gesture per connection
-        self.gesture_debounce_time = 1.0  # Minimum time between same gesture (seconds)
+        self.gesture_debounce_time = 0.8  # Minimum time between same gesture (seconds), matches the frontend
+        self.server_playback = set()  # Connections whose gestures play on the server synth directly
         self.connection_instruments = {}  # Track current instrument per connection
+        self.connection_protocols = {}  # Negotiated frame protocol per connection (json/binary)
+        self.ingests: Dict[int, FrameIngest] = {}  # Latest-frame-wins slot per connection
+        self.landmark_encoders: Dict[int, LandmarkEncoder] = {}  # Compact landmark format per connection
         
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
         self.active_connections.append(websocket)
+        ingest = FrameIngest()
+        ingest.task = asyncio.create_task(self.run_ingest(websocket, ingest))
+        self.ingests[id(websocket)] = ingest
         logger.info(f"WebSocket connected. Total connections: {len(self.active_connections)}")
         
     def disconnect(self, websocket: WebSocket):
@@ -162,6 +153,13 @@ class ConnectionManager:
         # Clean up instrument state
         if connection_id in self.connection_instruments:
             del self.connection_instruments[connection_id]
+        self.connection_protocols.pop(connection_id, None)
+        self.landmark_encoders.pop(connection_id, None)
+        self.server_playback.discard(connection_id)
+        self.inference_pool.release(connection_id)
+        ingest = self.ingests.pop(connection_id, None)
+        if ingest and ingest.task:
+            ingest.task.cancel()
         logger.info(f"WebSocket disconnected. Total connections: {len(self.active_connections)}")
         
     async def send_personal_message(self, message: str, websocket: WebSocket):
@@ -171,6 +169,13 @@ class ConnectionManager:
             logger.error(f"Error sending message: {e}")
             self.disconnect(websocket)
             
+    async def send_personal_bytes(self, message: bytes, websocket: WebSocket):
+        try:
+            await websocket.send_bytes(message)
+        except Exception as e:
+            logger.error(f"Error sending message: {e}")
+            self.disconnect(websocket)
+            
     async def broadcast(self, message: str):
         disconnected = []
         for connection in self.active_connections:
@@ -184,50 +189,155 @@ class ConnectionManager:
         for connection in disconnected:
             self.disconnect(connection)
     
+    def ingest_frame(self, websocket: WebSocket, kind: str, payload):
+        """Queue a frame for processing; an older unprocessed frame is dropped"""
+        ingest = self.ingests.get(id(websocket))
+        if ingest:
+            ingest.put(kind, payload)
+
+    async def run_ingest(self, websocket: WebSocket, ingest: FrameIngest):
+        """Process the newest frame for one connection, one at a time"""
+        while True:
+            kind, payload, received_at = await ingest.take()
+            started = time.perf_counter()
+            if kind == PROTOCOL_BINARY:
+                await self.process_binary_frame(websocket, payload)
+            else:
+                await self.process_video_frame(websocket, payload)
+            finished = time.perf_counter()
+            ingest.record((finished - started) * 1000, (finished - received_at) * 1000)
+
+            fps = ingest.next_hint()
+            if fps is not None:
+                hint = {"type": "rate_hint", "fps": fps, "processing_ms": round(ingest.processing_ms, 1)}
+                await self.send_personal_message(json.dumps(hint), websocket)
+
+    def stats(self) -> dict:
+        """Inference pool and per-connection ingest statistics"""
+        return {
+            "inference": self.inference_pool.stats(),
+            "connections": [{
+                "connection_id": connection_id,
+                "instrument": self.connection_instruments.get(connection_id, "piano"),
+                "protocol": self.connection_protocols.get(connection_id, "json"),
+                **ingest.stats(),
+            } for connection_id, ingest in self.ingests.items()],
+        }
+
+    def negotiate(self, websocket: WebSocket, data: dict) -> str:
+        """Record the frame protocol for this connection from the client's hello"""
+        protocol = negotiate_protocol(data.get("protocols"))
+        self.connection_protocols[id(websocket)] = protocol
+        logger.info(f"Negotiated {protocol} frame protocol")
+
+        # Opt-in: play detected gestures here instead of a POST /play per gesture
+        if data.get("server_playback"):
+            self.server_playback.add(id(websocket))
+        else:
+            self.server_playback.discard(id(websocket))
+
+        # Optional compact landmark format (json stays the default)
+        self.landmark_encoders.pop(id(websocket), None)
+        landmark_format = data.get("landmark_format", FORMAT_JSON)
+        if landmark_format != FORMAT_JSON:
+            try:
+                self.landmark_encoders[id(websocket)] = LandmarkEncoder(
+                    landmark_format,
+                    data.get("landmark_transport", "base64"),
+                    data.get("delta_threshold"),
+                )
+            except ValueError as e:
+                logger.warning(f"{e}, using json landmarks")
+        return protocol
+
+    def should_play(self, connection_id: int, gesture: str, instrument: str) -> bool:
+        """Debounce: play when the gesture or instrument changed, or the same gesture is held long enough"""
+        now = time.monotonic()
+        last = self.last_gesture_state.get(connection_id)
+        if last and last[:2] == (gesture, instrument) and now - last[2] <= self.gesture_debounce_time:
+            return False
+        self.last_gesture_state[connection_id] = (gesture, instrument, now)
+        return True
+
     async def process_video_frame(self, websocket: WebSocket, data: dict):
-        """Process incoming video frame for gesture detection"""
+        """Process incoming JSON video frame (base64 data-URL) for gesture detection"""
         try:
             # Decode base64 image
             image_data = data.get("image", "").split(",")[1]  # Remove data:image/jpeg;base64,
             image_bytes = base64.b64decode(image_data)
-            
-            # Convert to OpenCV format
             nparr = np.frombuffer(image_bytes, np.uint8)
-            image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-            
-            if image is None:
-                return
-                
-            # Detect gestures with hand landmarks
-            results = self.gesture_detector.detect_gesture_with_landmarks(image)
-            
-            # Send results back with hand skeleton data (simplified - no debouncing)
-            if results and len(results["gestures"]) > 0:
-                connection_id = id(websocket)
-                current_gesture = results["gestures"][0]["name"]
-                
-                # Get current instrument for this connection
-                current_instrument = self.connection_instruments.get(connection_id, "piano")
-                
-                response = {
-                    "type": "gesture_detected", 
-                    "gestures": results["gestures"],
-                    "landmarks": results["landmarks"],  # Hand skeleton data
-                    "image_width": image.shape[1],
-                    "image_height": image.shape[0],
-                    "instrument": current_instrument,
-                    "timestamp": data.get("timestamp", datetime.now().isoformat()),
-                    "gesture": current_gesture
-                }
-                
-                await self.send_personal_message(json.dumps(response), websocket)
-                # Only log occasionally to reduce spam
-                if datetime.now().timestamp() % 2 < 0.1:  # Log roughly every 2 seconds
-                    logger.info(f"Gesture: {current_gesture} on {current_instrument}")
-                
+
+            await self.process_encoded_frame(websocket, nparr, data.get("timestamp"))
         except Exception as e:
             logger.error(f"Error processing video frame: {e}")
 
+    async def process_binary_frame(self, websocket: WebSocket, message: bytes):
+        """Process incoming binary video frame (header + raw JPEG/WebP bytes)"""
+        try:
+            frame = decode_frame(message)
+            if frame.message_type != MSG_VIDEO_FRAME:
+                logger.warning(f"Ignoring binary message type {frame.message_type}")
+                return
+
+            await self.process_encoded_frame(websocket, frame.payload, frame.timestamp)
+        except FrameProtocolError as e:
+            logger.warning(f"Invalid binary frame: {e}")
+        except Exception as e:
+            logger.error(f"Error processing binary frame: {e}")
+
+    async def process_encoded_frame(self, websocket: WebSocket, nparr: np.ndarray, timestamp=None):
+        """Decode an encoded image buffer and send back detected gestures"""
+        # Decode and detect gestures on this connection's inference worker
+        frame_result = await self.inference_pool.submit(id(websocket), nparr)
+
+        if frame_result is None:
+            return
+
+        results = frame_result.results
+
+        # Send results back with hand skeleton data (simplified - no debouncing)
+        if results and len(results["gestures"]) > 0:
+            connection_id = id(websocket)
+            current_gesture = results["gestures"][0]["name"]
+
+            # Get current instrument for this connection
+            current_instrument = self.connection_instruments.get(connection_id, "piano")
+
+            played = False
+            if connection_id in self.server_playback and self.should_play(connection_id, current_gesture, current_instrument):
+                note_dispatcher.submit(current_gesture, current_instrument, source="ws")
+                played = True
+
+            response = {
+                "type": "gesture_detected",
+                "gestures": results["gestures"],
+                "image_width": frame_result.width,
+                "image_height": frame_result.height,
+                "instrument": current_instrument,
+                "timestamp": timestamp if timestamp is not None else datetime.now().isoformat(),
+                "gesture": current_gesture,
+                "played": played
+            }
+
+            encoder = self.landmark_encoders.get(connection_id)
+            if encoder is None:
+                response["landmarks"] = landmarks_to_dicts(results["landmarks"])  # Hand skeleton data
+                await self.send_personal_message(json.dumps(response), websocket)
+            elif encoder.transport == TRANSPORT_BINARY:
+                response["landmark_format"] = encoder.format
+                blob = encoder.encode(results["landmarks"])
+                await self.send_personal_bytes(pack_result_message(json.dumps(response).encode(), blob), websocket)
+            else:
+                response["landmark_format"] = encoder.format
+                response["landmarks_packed"] = encoder.encode_base64(results["landmarks"])
+                await self.send_personal_message(json.dumps(response), websocket)
+            if isinstance(timestamp, (int, float)) and connection_id in self.ingests:
+                # Client timestamps are epoch milliseconds (Date.now())
+                self.ingests[connection_id].client_latency.add(time.time() * 1000 - timestamp)
+            # Only log occasionally to reduce spam
+            if datetime.now().timestamp() % 2 < 0.1:  # Log roughly every 2 seconds
+                logger.info(f"Gesture: {current_gesture} on {current_instrument}")
+
 # Global connection manager
 manager = ConnectionManager()
 
@@ -237,15 +347,43 @@ async def websocket_endpoint(websocket: WebSocket):
     
     try:
         while True:
-            # Receive message from client
-            data = await websocket.receive_text()
-            message = json.loads(data)
+            # Receive message from client (text JSON or binary frame)
+            received = await websocket.receive()
+            if received["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(received.get("code", 1000))
+
+            if received.get("bytes") is not None:
+                # Binary frames are only accepted after negotiation
+                if manager.connection_protocols.get(id(websocket)) == PROTOCOL_BINARY:
+                    manager.ingest_frame(websocket, PROTOCOL_BINARY, received["bytes"])
+                else:
+                    logger.warning("Binary frame received before protocol negotiation")
+                continue
+
+            message = json.loads(received["text"])
             
             message_type = message.get("type")
             
-            if message_type == "video_frame":
-                # Process video frame for gesture detection
-                await manager.process_video_frame(websocket, message)
+            if message_type == "hello":
+                # Negotiate frame protocol; clients that never say hello stay on JSON
+                protocol = manager.negotiate(websocket, message)
+                response = {
+                    "type": "hello_ack",
+                    "protocol": protocol,
+                    "timestamp": datetime.now().isoformat()
+                }
+                if protocol == PROTOCOL_BINARY:
+                    response["binary_format"] = describe_protocol()
+                response["server_playback"] = id(websocket) in manager.server_playback
+                encoder = manager.landmark_encoders.get(id(websocket))
+                response["landmark_format"] = encoder.format if encoder else FORMAT_JSON
+                if encoder:
+                    response["landmark_transport"] = encoder.transport
+                await manager.send_personal_message(json.dumps(response), websocket)
+
+            elif message_type == "video_frame":
+                # Hand off to the ingest stage; stale frames are dropped there
+                manager.ingest_frame(websocket, "json", message)
                 
             elif message_type == "instrument_change":
                 # Handle instrument change
@@ -13,6 +13,10 @@ export default function WebcamGestureControl({ onGestureDetected }: WebcamGestur
   const videoRef = useRef<HTMLVideoElement>(null)
   const canvasRef = useRef<HTMLCanvasElement>(null)
   const wsRef = useRef<WebSocket | null>(null)
+  const frameProtocolRef = useRef<"json" | "binary">("json")
+  const frameSeqRef = useRef(0)
+  const frameIntervalRef = useRef(125)  // ms between frames, adjusted by server rate hints
+  const serverPlaybackRef = useRef(false)  // Server plays gestures itself (negotiated in hello)
   
   const [isActive, setIsActive] = useState(false)
   const [currentInstrument, setCurrentInstrument] = useState("piano")
@@ -81,14 +85,27 @@ export default function WebcamGestureControl({ onGestureDetected }: WebcamGestur
     try {
       wsRef.current = new WebSocket('ws://localhost:8000/ws/gesture')
       
+      wsRef.current.binaryType = "arraybuffer"
+      frameProtocolRef.current = "json"
+      
       wsRef.current.onopen = () => {
         setConnectionStatus("connected")
         console.log("WebSocket connected")
+        // Ask for the binary frame protocol; server falls back to JSON if unsupported.
+        // With server_playback the server plays detected gestures itself (no POST /play per gesture)
+        wsRef.current?.send(JSON.stringify({ type: "hello", protocols: ["binary", "json"], server_playback: true }))
       }
       
       wsRef.current.onmessage = (event) => {
         const data = JSON.parse(event.data)
-        if (data.type === "gesture_detected") {
+        if (data.type === "hello_ack") {
+          frameProtocolRef.current = data.protocol === "binary" ? "binary" : "json"
+          serverPlaybackRef.current = data.server_playback === true
+          console.log(`Frame protocol: ${frameProtocolRef.current}`)
+        } else if (data.type === "rate_hint") {
+          // Server measured its processing time and asks for a sustainable frame rate
+          frameIntervalRef.current = Math.round(1000 / Math.max(1, data.fps))
+        } else if (data.type === "gesture_detected") {
           // Simple frontend debouncing like the gesture detection system
           const now = Date.now()
           const current = {gesture: data.gesture, instrument: data.instrument, timestamp: now}
@@ -116,6 +133,9 @@ export default function WebcamGestureControl({ onGestureDetected }: WebcamGestur
             
             onGestureDetected?.(data.gesture, data.instrument)
             
+            // The server already played it when server-side playback was negotiated
+            if (serverPlaybackRef.current) return
+            
             // Trigger sound via existing API with the correct instrument from WebSocket
             fetch('http://localhost:8000/play', {
               method: 'POST',
@@ -158,6 +178,24 @@ export default function WebcamGestureControl({ onGestureDetected }: WebcamGestur
         canvas.height = videoRef.current.videoHeight
         ctx.drawImage(videoRef.current, 0, 0)
         
+        if (frameProtocolRef.current === "binary") {
+          // Binary frame: 16-byte header (version, type, codec, flags, seq, timestamp) + JPEG bytes
+          canvas.toBlob(async (blob) => {
+            if (!blob || wsRef.current?.readyState !== WebSocket.OPEN) return
+            const jpeg = await blob.arrayBuffer()
+            const message = new Uint8Array(16 + jpeg.byteLength)
+            const header = new DataView(message.buffer)
+            header.setUint8(0, 1)  // protocol version
+            header.setUint8(1, 1)  // video frame
+            header.setUint8(2, 1)  // jpeg
+            header.setUint32(4, frameSeqRef.current++ >>> 0, true)
+            header.setFloat64(8, Date.now(), true)
+            message.set(new Uint8Array(jpeg), 16)
+            wsRef.current.send(message)
+          }, 'image/jpeg', 0.5)
+          return
+        }
+        
         // Convert to base64 and send
         const imageData = canvas.toDataURL('image/jpeg', 0.5)
         wsRef.current.send(JSON.stringify({
@@ -169,10 +207,15 @@ export default function WebcamGestureControl({ onGestureDetected }: WebcamGestur
       }
     }
 
-    // Send frames at 8 FPS for better stability and performance
-    const intervalId = setInterval(sendFrame, 125)
+    // Start at 8 FPS; the interval follows the server's rate hints
+    let timeoutId: ReturnType<typeof setTimeout>
+    const loop = () => {
+      sendFrame()
+      timeoutId = setTimeout(loop, frameIntervalRef.current)
+    }
+    timeoutId = setTimeout(loop, frameIntervalRef.current)
     
-    return () => clearInterval(intervalId)
+    return () => clearTimeout(timeoutId)
   }
 
   // Draw hand skeleton on canvas (anti-flicker version)
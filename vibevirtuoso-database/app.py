@@ -3,23 +3,28 @@ Simple VibeVirtuoso Database Layer
 Clean, minimal FastAPI app for database operations only.
 """
 import logging
+import os
 from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Union
 
-import bcrypt
 import jwt
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, Query, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, EmailStr
 
 from database import db_manager
+from database.indexes import run_migrations
+from database.pool_monitor import pool_metrics
+from database.pagination import MAX_PAGE_SIZE, InvalidCursor
 from database.simple_db import simple_db
+from database.user_cache import ClaimsState, user_cache
 from database.models.user_simple import User, UserCreate
 from database.models.session_simple import SessionCreate, InstrumentType
 from database.models.composition_simple import CompositionCreate
 from database.models.recording_simple import RecordingCreate
+from password_hashing import password_hasher, PasswordHasherBusy
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -29,6 +34,10 @@ logger = logging.getLogger(__name__)
 SECRET_KEY = "your-secret-key-change-in-production"  # Change this!
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_HOURS = 24
+# Trust the user_id/is_active claims in tokens on hot endpoints. Each worker re-reads the
+# user's is_active/claims_changed_at at most once per USER_CACHE_TTL_SECONDS, so a
+# deactivation made through another worker (or before a restart) applies within that TTL.
+JWT_CLAIMS_AUTH = os.getenv("JWT_CLAIMS_AUTH", "false").lower() in ("1", "true", "yes")
 
 security = HTTPBearer()
 
@@ -41,6 +50,8 @@ async def lifespan(app: FastAPI):
     try:
         await db_manager.connect()
         simple_db.initialize_collections()
+        await run_migrations()
+        password_hasher.start()
         logger.info("✅ Database connected")
         logger.info("🎵 Ready for operations")
         
@@ -51,6 +62,7 @@ async def lifespan(app: FastAPI):
     yield
     
     logger.info("🛑 Shutting down...")
+    password_hasher.shutdown()
     try:
         await db_manager.disconnect()
         logger.info("✅ Database disconnected")
@@ -75,48 +87,109 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
 # ==================== AUTH HELPERS ====================
 
-def hash_password(password: str) -> str:
-    """Hash password."""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+async def hash_password(password: str) -> str:
+    """Hash password (on the password worker pool)."""
+    try:
+        return await password_hasher.hash(password)
+    except PasswordHasherBusy:
+        raise HTTPException(status_code=503, detail="Server busy, try again")
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify password (on the password worker pool)."""
+    try:
+        return await password_hasher.verify(plain_password, hashed_password)
+    except PasswordHasherBusy:
+        raise HTTPException(status_code=503, detail="Server busy, try again")
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify password."""
-    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+class TokenUser(BaseModel):
+    """User identity taken from token claims (no database lookup)."""
+    id: str
+    username: str
+    is_active: bool
 
 
 def create_access_token(data: dict) -> str:
     """Create JWT token."""
     to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(hours=ACCESS_TOKEN_EXPIRE_HOURS)
-    to_encode.update({"exp": expire})
+    now = datetime.utcnow()
+    expire = now + timedelta(hours=ACCESS_TOKEN_EXPIRE_HOURS)
+    to_encode.update({"exp": expire, "iat": now})
     
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> User:
-    """Get current user from token."""
+def decode_token(credentials: HTTPAuthorizationCredentials) -> dict:
+    """Decode and validate JWT token."""
     try:
         payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise HTTPException(status_code=401, detail="Invalid token")
-            
     except jwt.PyJWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
     
-    user = await simple_db.get_user_by_username(username)
+    if payload.get("sub") is None:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    return payload
+
+
+async def load_user(username: str) -> User:
+    """Get user by username through the user cache."""
+    user = user_cache.get(username)
     if user is None:
-        raise HTTPException(status_code=401, detail="User not found")
+        generation = user_cache.generation()
+        user = await simple_db.get_user_by_username(username)
+        if user is None:
+            raise HTTPException(status_code=401, detail="User not found")
+        user_cache.put(username, user, generation)
     
+    if not user.is_active:
+        raise HTTPException(status_code=401, detail="Account disabled")
     return user
 
 
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> User:
+    """Get current user from token."""
+    return await load_user(decode_token(credentials)["sub"])
+
+
+async def load_claims_state(user_id: str) -> ClaimsState:
+    """Get user's is_active/claims_changed_at through the user cache."""
+    state = user_cache.get_claims(user_id)
+    if state is None:
+        generation = user_cache.generation()
+        doc = await simple_db.get_user_claims_state(user_id)
+        if doc is None:
+            raise HTTPException(status_code=401, detail="User not found")
+        state = ClaimsState.from_doc(doc)
+        user_cache.put_claims(user_id, state, generation)
+    return state
+
+
+async def get_token_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Union[User, TokenUser]:
+    """Get current user for hot endpoints: from token claims when JWT_CLAIMS_AUTH is on.
+    
+    Falls back to the cached lookup for tokens without claims, or issued
+    before the user's profile or activation last changed.
+    """
+    payload = decode_token(credentials)
+    user_id, is_active = payload.get("user_id"), payload.get("is_active")
+    
+    if JWT_CLAIMS_AUTH and user_id is not None and is_active is not None:
+        state = await load_claims_state(user_id)
+        if not state.is_active or not is_active:
+            raise HTTPException(status_code=401, detail="Account disabled")
+        if state.changed_at < payload.get("iat", 0):
+            return TokenUser(id=user_id, username=payload["sub"], is_active=True)
+    
+    return await load_user(payload["sub"])
+
+
 # ==================== REQUEST/RESPONSE MODELS ====================
 
 class RegisterRequest(BaseModel):
@@ -150,6 +223,20 @@ class RecordingRequest(BaseModel):
     file_path: str
 
 
+# ==================== PAGINATION ====================
+
+async def fetch_page(fetch, user_id: str, limit: int, after: Optional[str], response: Response) -> list:
+    """Run a SimpleDB list query; the next page's cursor goes in the X-Next-Cursor header."""
+    try:
+        docs, next_cursor = await fetch(user_id, limit=limit, after=after)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return docs
+
+
 # ==================== ENDPOINTS ====================
 
 @app.get("/health")
@@ -158,6 +245,27 @@ async def health():
     return {"status": "healthy", "timestamp": datetime.utcnow()}
 
 
+@app.get("/health/pool")
+async def health_pool():
+    """Health check with database connection pool metrics."""
+    pool = await db_manager.pool_health()
+    return {
+        "status": "healthy" if pool["connected"] else "unhealthy",
+        "timestamp": datetime.utcnow(),
+        "database": pool
+    }
+
+
+@app.get("/metrics")
+async def metrics():
+    """Service metrics."""
+    return {
+        "password_hashing": password_hasher.stats(),
+        "database_pool": pool_metrics.stats(),
+        "user_cache": {**user_cache.stats(), "jwt_claims_auth": JWT_CLAIMS_AUTH}
+    }
+
+
 # ==================== USER ENDPOINTS ====================
 
 @app.post("/register")
@@ -178,7 +286,7 @@ async def register(request: RegisterRequest):
         full_name=request.full_name
     )
     
-    hashed_password = hash_password(request.password)
+    hashed_password = await hash_password(request.password)
     user = await simple_db.create_user(user_data, hashed_password)
     
     return {
@@ -193,17 +301,25 @@ async def login(request: LoginRequest):
     """Login user."""
     user = await simple_db.get_user_by_username(request.username)
     
-    if not user or not verify_password(request.password, user.hashed_password):
+    if not user or not await verify_password(request.password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     if not user.is_active:
         raise HTTPException(status_code=401, detail="Account disabled")
     
+    # Upgrade hashes made with a lower cost factor
+    if password_hasher.needs_rehash(user.hashed_password):
+        await simple_db.update_user_password_hash(str(user.id), await hash_password(request.password))
+    
     # Update last login
     await simple_db.update_user_login(str(user.id))
     
     # Create token
-    access_token = create_access_token(data={"sub": user.username})
+    access_token = create_access_token(data={
+        "sub": user.username,
+        "user_id": str(user.id),
+        "is_active": user.is_active
+    })
     
     return {
         "access_token": access_token,
@@ -273,17 +389,22 @@ async def end_session(
 
 
 @app.get("/sessions")
-async def get_sessions(current_user: User = Depends(get_current_user)):
-    """Get user's sessions."""
-    sessions = await simple_db.get_user_sessions(str(current_user.id))
+async def get_sessions(
+    response: Response,
+    limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    current_user: Union[User, TokenUser] = Depends(get_token_user)
+):
+    """Get user's sessions (newest first; pass X-Next-Cursor back as `after` for the next page)."""
+    sessions = await fetch_page(simple_db.get_user_sessions, str(current_user.id), limit, after, response)
     
     return [{
-        "session_id": str(session.id),
-        "name": session.session_name,
-        "instrument": session.primary_instrument,
-        "status": session.status,
-        "duration_seconds": session.duration_seconds,
-        "created_at": session.created_at
+        "session_id": str(session["_id"]),
+        "name": session["session_name"],
+        "instrument": session["primary_instrument"],
+        "status": session["status"],
+        "duration_seconds": session.get("duration_seconds"),
+        "created_at": session["created_at"]
     } for session in sessions]
 
 
@@ -311,16 +432,21 @@ async def save_composition(
 
 
 @app.get("/compositions")
-async def get_compositions(current_user: User = Depends(get_current_user)):
-    """Get user's compositions."""
-    compositions = await simple_db.get_user_compositions(str(current_user.id))
+async def get_compositions(
+    response: Response,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    current_user: Union[User, TokenUser] = Depends(get_token_user)
+):
+    """Get user's compositions (recently updated first; paged like /sessions)."""
+    compositions = await fetch_page(simple_db.get_user_compositions, str(current_user.id), limit, after, response)
     
     return [{
-        "composition_id": str(comp.id),
-        "title": comp.title,
-        "description": comp.description,
-        "created_at": comp.created_at,
-        "updated_at": comp.updated_at
+        "composition_id": str(comp["_id"]),
+        "title": comp["title"],
+        "description": comp.get("description"),
+        "created_at": comp["created_at"],
+        "updated_at": comp["updated_at"]
     } for comp in compositions]
 
 
@@ -329,7 +455,7 @@ async def get_compositions(current_user: User = Depends(get_current_user)):
 @app.post("/recording/save")
 async def save_recording(
     request: RecordingRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: Union[User, TokenUser] = Depends(get_token_user)
 ):
     """Save recording metadata."""
     try:
@@ -354,17 +480,22 @@ async def save_recording(
 
 
 @app.get("/recordings")
-async def get_recordings(current_user: User = Depends(get_current_user)):
-    """Get user's recordings."""
-    recordings = await simple_db.get_user_recordings(str(current_user.id))
+async def get_recordings(
+    response: Response,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    current_user: Union[User, TokenUser] = Depends(get_token_user)
+):
+    """Get user's recordings (newest first; paged like /sessions)."""
+    recordings = await fetch_page(simple_db.get_user_recordings, str(current_user.id), limit, after, response)
     
     return [{
-        "recording_id": str(rec.id),
-        "filename": rec.filename,
-        "instrument": rec.instrument,
-        "duration_seconds": rec.duration_seconds,
-        "file_path": rec.file_path,
-        "created_at": rec.created_at
+        "recording_id": str(rec["_id"]),
+        "filename": rec["filename"],
+        "instrument": rec["instrument"],
+        "duration_seconds": rec["duration_seconds"],
+        "file_path": rec["file_path"],
+        "created_at": rec["created_at"]
     } for rec in recordings]
 
 
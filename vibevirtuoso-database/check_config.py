@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Check that every setting documented in README.md and .env.example is honoured.
+
+pydantic-settings reads a field from the upper-cased field name and ignores
+Field(env=...), so a documented variable can silently do nothing. This sets
+each documented variable to a sample value and checks that the settings
+object picks it up.
+"""
+import os
+import re
+import sys
+from pathlib import Path
+
+# Documented variable -> a valid sample value different from the default
+SAMPLES = {
+    "MONGODB_URL": "mongodb://check-config:27017",
+    "DATABASE_NAME": "check_config",
+    "MONGODB_MAX_POOL_SIZE": "7",
+    "MONGODB_MIN_POOL_SIZE": "2",
+    "MONGODB_MAX_IDLE_TIME_MS": "12345",
+    "MONGODB_WAIT_QUEUE_TIMEOUT_MS": "2345",
+    "MONGODB_SERVER_SELECTION_TIMEOUT_MS": "3456",
+    "MONGODB_CONNECT_TIMEOUT_MS": "4567",
+    "MONGODB_COMPRESSORS": "zlib",
+    "MONGODB_READ_PREFERENCE": "nearest",
+    "USER_CACHE_TTL_SECONDS": "17.5",
+    "USER_CACHE_MAX_ENTRIES": "33",
+    "BCRYPT_ROUNDS": "5",
+    "PASSWORD_WORKERS": "3",
+    "PASSWORD_EXECUTOR": "process",
+    "PASSWORD_MAX_CONCURRENCY": "9",
+    "PASSWORD_QUEUE_TIMEOUT": "1.5",
+}
+
+# Read directly by app.py with os.getenv, not through a settings class
+READ_BY_APP = {"JWT_CLAIMS_AUTH"}
+
+_DOCUMENTED = re.compile(r"\b((?:MONGODB|DATABASE|USER_CACHE|BCRYPT|PASSWORD|JWT)_[A-Z_]+)\b")
+
+
+def documented_names(script_dir: Path) -> set:
+    names = set()
+    for doc in ("README.md", ".env.example"):
+        names |= set(_DOCUMENTED.findall((script_dir / doc).read_text()))
+    return names
+
+
+def main():
+    script_dir = Path(__file__).parent
+    os.chdir(script_dir)
+    sys.path.insert(0, str(script_dir))
+
+    names = documented_names(script_dir) - READ_BY_APP
+    missing = sorted(names - SAMPLES.keys())
+    if missing:
+        print(f"❌ No sample value for documented settings: {', '.join(missing)}")
+        return 1
+
+    for name in names:
+        os.environ[name] = SAMPLES[name]
+
+    from database.config import DatabaseConfig
+    from password_hashing import PasswordConfig
+
+    values = {}
+    for config in (DatabaseConfig(_env_file=None), PasswordConfig(_env_file=None)):
+        values.update({field.upper(): value for field, value in config.model_dump().items()})
+
+    failed = 0
+    for name in sorted(names):
+        value = values.get(name)
+        if value is None or str(value) != SAMPLES[name]:
+            print(f"❌ {name} is documented but not read (got {value!r})")
+            failed += 1
+        else:
+            print(f"✅ {name}")
+
+    print(f"\n{'🎉 All documented settings are honoured' if not failed else f'⚠️ {failed} settings ignored'}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -23,6 +23,82 @@ class DatabaseConfig(BaseSettings):
         description="Database name"
     )
     
+    # Connection pool (per uvicorn worker). pydantic-settings reads each field from
+    # the upper-cased field name, so the fields carry the MONGODB_ prefix themselves
+    mongodb_max_pool_size: int = Field(
+        default=100,
+        env="MONGODB_MAX_POOL_SIZE",
+        description="Most connections per server in the pool"
+    )
+    
+    mongodb_min_pool_size: int = Field(
+        default=0,
+        env="MONGODB_MIN_POOL_SIZE",
+        description="Connections kept open even when idle"
+    )
+    
+    mongodb_max_idle_time_ms: Optional[int] = Field(
+        default=None,
+        env="MONGODB_MAX_IDLE_TIME_MS",
+        description="Close pooled connections idle for longer than this"
+    )
+    
+    mongodb_wait_queue_timeout_ms: Optional[int] = Field(
+        default=None,
+        env="MONGODB_WAIT_QUEUE_TIMEOUT_MS",
+        description="Fail an operation that waits longer than this for a connection"
+    )
+    
+    mongodb_server_selection_timeout_ms: int = Field(
+        default=30000,
+        env="MONGODB_SERVER_SELECTION_TIMEOUT_MS",
+        description="How long to look for a suitable server before failing"
+    )
+    
+    mongodb_connect_timeout_ms: int = Field(
+        default=20000,
+        env="MONGODB_CONNECT_TIMEOUT_MS",
+        description="Timeout for opening a connection"
+    )
+    
+    mongodb_compressors: Optional[str] = Field(
+        default=None,
+        env="MONGODB_COMPRESSORS",
+        description="Wire compression, e.g. zstd,snappy,zlib (in preference order)"
+    )
+    
+    mongodb_read_preference: str = Field(
+        default="primary",
+        env="MONGODB_READ_PREFERENCE",
+        description="primary, primaryPreferred, secondary, secondaryPreferred or nearest"
+    )
+    
+    # Authenticated user cache
+    user_cache_ttl_seconds: float = Field(
+        default=60.0,
+        env="USER_CACHE_TTL_SECONDS",
+        description="How long a looked-up user is reused (0 disables the cache)"
+    )
+    
+    user_cache_max_entries: int = Field(
+        default=1024,
+        env="USER_CACHE_MAX_ENTRIES",
+        description="Most users kept in the cache"
+    )
+    
+    def client_options(self) -> dict:
+        """Keyword arguments for AsyncIOMotorClient (unset options keep driver defaults)."""
+        options = {
+            "maxPoolSize": self.mongodb_max_pool_size,
+            "minPoolSize": self.mongodb_min_pool_size,
+            "maxIdleTimeMS": self.mongodb_max_idle_time_ms,
+            "waitQueueTimeoutMS": self.mongodb_wait_queue_timeout_ms,
+            "serverSelectionTimeoutMS": self.mongodb_server_selection_timeout_ms,
+            "connectTimeoutMS": self.mongodb_connect_timeout_ms,
+            "compressors": self.mongodb_compressors,
+            "readPreference": self.mongodb_read_preference,
+        }
+        return {key: value for key, value in options.items() if value is not None}
     
     model_config = {
         "env_file": ".env",
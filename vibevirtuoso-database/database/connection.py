@@ -2,11 +2,13 @@
 MongoDB connection manager for VibeVirtuoso using Motor (async).
 """
 import logging
+import time
 from typing import Optional
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
 
 from .config import db_config
+from .pool_monitor import pool_metrics
 
 logger = logging.getLogger(__name__)
 
@@ -24,10 +26,15 @@ class DatabaseManager:
         try:
             logger.info(f"Connecting to MongoDB: {db_config.database_name}")
             
-            # Create client with simple configuration
+            # Pool size, timeouts, compression and read preference come from DatabaseConfig
+            options = db_config.client_options()
             self.client = AsyncIOMotorClient(
-                db_config.mongodb_url
+                db_config.mongodb_url,
+                event_listeners=[pool_metrics],
+                **options
             )
+            logger.info(f"🔧 Pool: max {options['maxPoolSize']}, min {options['minPoolSize']}, "
+                        f"read preference {options['readPreference']}")
             
             # Get database reference
             self.database = self.client[db_config.database_name]
@@ -66,6 +73,17 @@ class DatabaseManager:
             logger.error(f"❌ MongoDB ping failed: {e}")
             return False
     
+    async def pool_health(self) -> dict:
+        """Ping round trip plus connection pool settings and metrics."""
+        start = time.perf_counter()
+        reachable = await self.ping()
+        return {
+            "connected": reachable,
+            "ping_ms": round(1000 * (time.perf_counter() - start), 2),
+            "config": db_config.client_options(),
+            "pool": pool_metrics.stats()
+        }
+    
     def is_connected(self) -> bool:
         """Check if database is connected."""
         return self._connected and self.client is not None
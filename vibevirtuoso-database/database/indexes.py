@@ -0,0 +1,162 @@
+"""
+Index management and query plan checks for SimpleDB collections.
+
+Indexes are created by numbered migrations, run at startup. Applied
+migrations are recorded in the ``schema_migrations`` collection and only
+new ones run; each is also safe to re-run (create_index is a no-op when
+the index already exists). A migration that fails (e.g. duplicate
+usernames block a unique index) is logged and retried on the next start.
+
+``explain_queries`` runs explain() on every query SimpleDB issues and flags
+collection scans (COLLSCAN) and in-memory sorts (SORT):
+
+    python -m database.indexes --explain
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import PyMongoError
+
+from .connection import db_manager
+from .pagination import encode_cursor, keyset_query, keyset_sort
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_COLLECTION = "schema_migrations"
+
+
+async def _initial_indexes(db):
+    await db.users.create_indexes([
+        IndexModel([("username", ASCENDING)], name="username_unique", unique=True),
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ])
+    await db.sessions.create_indexes([
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)], name="user_created"),
+    ])
+    await db.compositions.create_indexes([
+        IndexModel([("user_id", ASCENDING), ("updated_at", DESCENDING)], name="user_updated"),
+    ])
+    await db.recordings.create_indexes([
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)], name="user_created"),
+    ])
+
+
+async def _keyset_indexes(db):
+    """Add _id to the list indexes so keyset pages ((sort field, _id) < cursor) are pure index scans."""
+    for collection, field in (("sessions", "created_at"), ("compositions", "updated_at"),
+                              ("recordings", "created_at")):
+        await db[collection].create_index(
+            [("user_id", ASCENDING), (field, DESCENDING), ("_id", DESCENDING)],
+            name=f"user_{field.split('_')[0]}_id"
+        )
+        existing = await db[collection].index_information()
+        old_name = "user_updated" if field == "updated_at" else "user_created"
+        if old_name in existing:  # Prefix of the new index
+            await db[collection].drop_index(old_name)
+
+
+# (version, description, migration) - append only, never renumber
+MIGRATIONS = [
+    (1, "Unique username/email and per-user list indexes", _initial_indexes),
+    (2, "Keyset pagination indexes (user_id, date desc, _id desc)", _keyset_indexes),
+]
+
+
+async def run_migrations() -> List[int]:
+    """Apply migrations not yet recorded; returns the versions applied now."""
+    db = db_manager.get_database()
+    applied_collection = db[MIGRATIONS_COLLECTION]
+    done = {doc["_id"] async for doc in applied_collection.find({}, {"_id": 1})}
+
+    applied = []
+    for version, description, migration in MIGRATIONS:
+        if version in done:
+            continue
+        try:
+            await migration(db)
+        except PyMongoError as e:
+            logger.error(f"❌ Migration {version} ({description}) failed: {e}")
+            break  # Later migrations may depend on this one
+        await applied_collection.update_one(
+            {"_id": version},
+            {"$set": {"description": description, "applied_at": datetime.utcnow()}},
+            upsert=True
+        )
+        applied.append(version)
+        logger.info(f"🗂️ Applied migration {version}: {description}")
+    return applied
+
+
+# The queries SimpleDB issues: (name, collection, filter, sort)
+_SAMPLE_ID = ObjectId("000000000000000000000000")
+_SAMPLE_USER = str(_SAMPLE_ID)
+_SAMPLE_CURSOR = encode_cursor(datetime(2024, 1, 1), _SAMPLE_ID)
+
+QUERIES = [
+    ("get_user_by_username", "users", {"username": "explain-check"}, None),
+    ("get_user_by_email", "users", {"email": "explain-check@example.com"}, None),
+    ("get_user_by_id", "users", {"_id": _SAMPLE_ID}, None),
+    ("end_session", "sessions", {"_id": _SAMPLE_ID}, None),
+    ("get_user_sessions", "sessions", {"user_id": _SAMPLE_USER}, keyset_sort("created_at")),
+    ("get_user_sessions (page 2)", "sessions",
+     keyset_query({"user_id": _SAMPLE_USER}, "created_at", _SAMPLE_CURSOR), keyset_sort("created_at")),
+    ("get_user_compositions", "compositions", {"user_id": _SAMPLE_USER}, keyset_sort("updated_at")),
+    ("get_composition", "compositions", {"_id": _SAMPLE_ID, "user_id": _SAMPLE_USER}, None),
+    ("get_user_recordings", "recordings", {"user_id": _SAMPLE_USER}, keyset_sort("created_at")),
+    ("get_user_recordings (page 2)", "recordings",
+     keyset_query({"user_id": _SAMPLE_USER}, "created_at", _SAMPLE_CURSOR), keyset_sort("created_at")),
+]
+
+
+def _plan_stages(plan: Any) -> List[str]:
+    """All stage names in a winning plan (classic or slot-based engine)."""
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for key in ("inputStage", "queryPlan", "outerStage", "innerStage"):
+            stages.extend(_plan_stages(plan.get(key)))
+        for child in plan.get("inputStages", []):
+            stages.extend(_plan_stages(child))
+    return stages
+
+
+async def explain_queries() -> List[Dict[str, Any]]:
+    """Explain every SimpleDB query; flags COLLSCAN and in-memory SORT stages."""
+    db = db_manager.get_database()
+    report = []
+    for name, collection, query, sort in QUERIES:
+        cursor = db[collection].find(query).limit(20)
+        if sort:
+            cursor = cursor.sort(sort)
+        explain = await cursor.explain()
+        winning = explain.get("queryPlanner", {}).get("winningPlan", {})
+        stages = _plan_stages(winning)
+        problems = [stage for stage in ("COLLSCAN", "SORT") if stage in stages]
+        report.append({"query": name, "collection": collection, "stages": stages, "problems": problems})
+    return report
+
+
+async def _main(explain: bool):
+    await db_manager.connect()
+    try:
+        applied = await run_migrations()
+        print(f"🗂️ Migrations applied: {applied or 'none (up to date)'}")
+        if explain:
+            for entry in await explain_queries():
+                status = f"⚠️ {', '.join(entry['problems'])}" if entry["problems"] else "✅"
+                print(f"{status} {entry['query']:<30} {' <- '.join(entry['stages'])}")
+    finally:
+        await db_manager.disconnect()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Apply index migrations and check query plans")
+    parser.add_argument("--explain", action="store_true", help="explain every SimpleDB query")
+    asyncio.run(_main(parser.parse_args().explain))
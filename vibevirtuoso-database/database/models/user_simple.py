@@ -29,4 +29,5 @@ class User(BaseDocument):
     hashed_password: str
     full_name: Optional[str] = None
     is_active: bool = True
-    last_login_at: Optional[datetime] = None
\ No newline at end of file
+    last_login_at: Optional[datetime] = None
+    claims_changed_at: Optional[datetime] = None  # Tokens issued before this carry stale claims
\ No newline at end of file
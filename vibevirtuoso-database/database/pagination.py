@@ -0,0 +1,64 @@
+"""
+Keyset (cursor) pagination helpers.
+
+Lists are sorted newest first on (sort field, _id). A page ends with an
+opaque cursor holding the last document's sort value and _id; the next
+page asks for documents strictly after that pair. With a
+(user_id, sort field desc, _id desc) index every page is a bounded index
+scan, however many documents the user has, unlike skip/offset.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import DESCENDING
+
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    """Raised for a cursor that was not produced by encode_cursor."""
+
+
+def encode_cursor(value: datetime, doc_id: ObjectId) -> str:
+    raw = json.dumps({"v": value.isoformat(), "id": str(doc_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        return datetime.fromisoformat(data["v"]), ObjectId(data["id"])
+    except (ValueError, KeyError, TypeError, InvalidId):
+        raise InvalidCursor("Invalid pagination cursor")
+
+
+def keyset_query(query: Dict[str, Any], sort_field: str, after: Optional[str]) -> Dict[str, Any]:
+    """``query`` restricted to documents after the cursor in (sort_field, _id) descending order."""
+    if not after:
+        return query
+    value, doc_id = decode_cursor(after)
+    return {**query, "$or": [
+        {sort_field: {"$lt": value}},
+        {sort_field: value, "_id": {"$lt": doc_id}},
+    ]}
+
+
+def keyset_sort(sort_field: str) -> List[Tuple[str, int]]:
+    return [(sort_field, DESCENDING), ("_id", DESCENDING)]
+
+
+async def read_page(cursor: AsyncIterator[dict], sort_field: str,
+                    limit: int) -> Tuple[List[dict], Optional[str]]:
+    """Stream up to ``limit`` documents (the cursor must be limited to limit + 1) and the next cursor."""
+    items = []
+    async for doc in cursor:
+        if len(items) == limit:  # The extra document only tells us there is another page
+            last = items[-1]
+            return items, encode_cursor(last[sort_field], last["_id"])
+        items.append(doc)
+    return items, None
@@ -0,0 +1,113 @@
+"""
+Connection pool metrics from pymongo's monitoring hooks.
+
+PoolMetrics is registered as an event listener on the Motor client. It
+counts open and checked-out connections, how many operations are waiting
+for a connection (the wait queue), and how long checkouts wait. Motor runs
+each operation on a worker thread and a checkout starts and ends on the
+same thread, so the wait is timed per thread.
+
+Sizing: if checked_out keeps reaching max_pool_size and wait times grow,
+the pool is too small for the request concurrency of this worker. Each
+uvicorn worker has its own pool, so the server can open up to
+max_pool_size x workers connections.
+"""
+import threading
+import time
+from collections import deque
+
+from pymongo import monitoring
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Aggregated connection pool counters and checkout wait times."""
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._waits = deque(maxlen=window)
+        self.open_connections = 0
+        self.checked_out = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.pool_clears = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    # Listener hooks (called on Motor's worker threads)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open_connections += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open_connections -= 1
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+        with self._lock:
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+
+    def connection_check_out_failed(self, event):
+        self._local.started = None
+        with self._lock:
+            self.waiting -= 1
+            self.checkout_failures += 1
+
+    def connection_checked_out(self, event):
+        started = getattr(self._local, "started", None)
+        self._local.started = None
+        waited = time.perf_counter() - started if started is not None else 0.0
+        with self._lock:
+            self.waiting -= 1
+            self.checked_out += 1
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+            self._waits.append(waited)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            recent = sorted(self._waits)
+            return {
+                "open_connections": self.open_connections,
+                "checked_out": self.checked_out,
+                "wait_queue": self.waiting,
+                "max_wait_queue": self.max_waiting,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "pool_clears": self.pool_clears,
+                "wait_ms": {
+                    "avg": round(1000 * self.wait_total / self.checkouts, 3) if self.checkouts else 0.0,
+                    "p95": round(1000 * recent[int(0.95 * (len(recent) - 1))], 3) if recent else 0.0,
+                    "max": round(1000 * self.wait_max, 3),
+                },
+            }
+
+
+# Global pool metrics (registered on the client by DatabaseManager)
+pool_metrics = PoolMetrics()
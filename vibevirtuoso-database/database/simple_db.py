@@ -2,17 +2,26 @@
 Simple database operations for VibeVirtuoso.
 Just basic CRUD - no complex features.
 """
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from datetime import datetime
 from bson import ObjectId
 from bson.errors import InvalidId
 
+from pymongo import ReturnDocument
+
 from .connection import db_manager
+from .pagination import MAX_PAGE_SIZE, keyset_query, keyset_sort, read_page
+from .user_cache import user_cache
 from .models.user_simple import User, UserCreate, UserUpdate
 from .models.session_simple import Session, SessionCreate
 from .models.composition_simple import Composition, CompositionCreate
 from .models.recording_simple import Recording, RecordingCreate
 
+# Fields returned by the list endpoints (list queries project only these)
+SESSION_LIST_FIELDS = ["session_name", "primary_instrument", "status", "duration_seconds", "created_at"]
+COMPOSITION_LIST_FIELDS = ["title", "description", "created_at", "updated_at"]
+RECORDING_LIST_FIELDS = ["filename", "instrument", "duration_seconds", "file_path", "created_at"]
+
 
 class SimpleDB:
     """Simple database operations."""
@@ -30,8 +39,19 @@ class SimpleDB:
         except InvalidId:
             return None
     
+    async def _list_page(self, collection, user_id: str, sort_field: str, fields: List[str],
+                         limit: int, after: Optional[str]) -> Tuple[List[dict], Optional[str]]:
+        """One keyset page of a user's documents, newest first, as projected raw documents."""
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        cursor = collection.find(
+            keyset_query({"user_id": user_id}, sort_field, after),
+            {field: 1 for field in fields}
+        ).sort(keyset_sort(sort_field)).limit(limit + 1).batch_size(limit + 1)
+        
+        return await read_page(cursor, sort_field, limit)
+    
     def initialize_collections(self):
-        """Initialize collections after database connection."""
+        """Initialize collections after database connection (indexes: see indexes.py)."""
         self.users = db_manager.get_collection("users")
         self.sessions = db_manager.get_collection("sessions")
         self.compositions = db_manager.get_collection("compositions")
@@ -75,14 +95,67 @@ class SimpleDB:
         doc = await self.users.find_one({"_id": obj_id})
         return User(**doc) if doc else None
     
+    async def get_user_claims_state(self, user_id: str) -> Optional[dict]:
+        """Just is_active and claims_changed_at, for checking token claims."""
+        obj_id = self._to_object_id(user_id)
+        if not obj_id:
+            return None
+        return await self.users.find_one({"_id": obj_id}, {"is_active": 1, "claims_changed_at": 1})
+    
     async def update_user_login(self, user_id: str):
         """Update user's last login time."""
         obj_id = self._to_object_id(user_id)
+        if obj_id:
+            now = datetime.utcnow()
+            await self.users.update_one(
+                {"_id": obj_id},
+                {"$set": {"last_login_at": now}}
+            )
+            user_cache.update(user_id, last_login_at=now)  # Nothing auth depends on changed
+    
+    async def update_user_password_hash(self, user_id: str, hashed_password: str):
+        """Replace user's password hash (e.g. after raising the bcrypt cost)."""
+        obj_id = self._to_object_id(user_id)
         if obj_id:
             await self.users.update_one(
                 {"_id": obj_id},
-                {"$set": {"last_login_at": datetime.utcnow()}}
+                {"$set": {"hashed_password": hashed_password, "updated_at": datetime.utcnow()}}
             )
+            user_cache.invalidate(user_id)
+    
+    async def update_user(self, user_id: str, update_data: UserUpdate) -> Optional[User]:
+        """Update user's profile fields."""
+        obj_id = self._to_object_id(user_id)
+        if not obj_id:
+            return None
+        
+        changes = update_data.model_dump(exclude_none=True)
+        if "email" in changes:
+            changes["email"] = changes["email"].lower()
+        changes["updated_at"] = changes["claims_changed_at"] = datetime.utcnow()
+        
+        doc = await self.users.find_one_and_update(
+            {"_id": obj_id},
+            {"$set": changes},
+            return_document=ReturnDocument.AFTER
+        )
+        user_cache.invalidate(user_id)
+        return User(**doc) if doc else None
+    
+    async def set_user_active(self, user_id: str, is_active: bool) -> Optional[User]:
+        """Activate or deactivate a user (tokens issued before now stop being trusted)."""
+        obj_id = self._to_object_id(user_id)
+        if not obj_id:
+            return None
+        
+        now = datetime.utcnow()
+        doc = await self.users.find_one_and_update(
+            {"_id": obj_id},
+            {"$set": {"is_active": is_active, "updated_at": now, "claims_changed_at": now}},
+            return_document=ReturnDocument.AFTER
+        )
+        user_cache.invalidate(user_id)
+        return User(**doc) if doc else None
     
     # ==================== SESSION OPERATIONS ====================
     
@@ -132,14 +205,10 @@ class SimpleDB:
         updated_doc = await self.sessions.find_one({"_id": obj_id})
         return Session(**updated_doc)
     
-    async def get_user_sessions(self, user_id: str, limit: int = 10) -> List[Session]:
-        """Get user's recent sessions."""
-        cursor = self.sessions.find(
-            {"user_id": user_id}
-        ).sort("created_at", -1).limit(limit)
-        
-        docs = await cursor.to_list(length=limit)
-        return [Session(**doc) for doc in docs]
+    async def get_user_sessions(self, user_id: str, limit: int = 10,
+                                after: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+        """Get a page of user's recent sessions and the cursor of the next page."""
+        return await self._list_page(self.sessions, user_id, "created_at", SESSION_LIST_FIELDS, limit, after)
     
     # ==================== COMPOSITION OPERATIONS ====================
     
@@ -159,14 +228,10 @@ class SimpleDB:
         
         return Composition(**doc_data)
     
-    async def get_user_compositions(self, user_id: str, limit: int = 20) -> List[Composition]:
-        """Get user's compositions."""
-        cursor = self.compositions.find(
-            {"user_id": user_id}
-        ).sort("updated_at", -1).limit(limit)
-        
-        docs = await cursor.to_list(length=limit)
-        return [Composition(**doc) for doc in docs]
+    async def get_user_compositions(self, user_id: str, limit: int = 20,
+                                    after: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+        """Get a page of user's compositions (recently updated first, without composition_data)."""
+        return await self._list_page(self.compositions, user_id, "updated_at", COMPOSITION_LIST_FIELDS, limit, after)
     
     async def get_composition(self, composition_id: str, user_id: str) -> Optional[Composition]:
         """Get a specific composition (user must own it)."""
@@ -198,14 +263,10 @@ class SimpleDB:
         
         return Recording(**doc_data)
     
-    async def get_user_recordings(self, user_id: str, limit: int = 20) -> List[Recording]:
-        """Get user's recordings."""
-        cursor = self.recordings.find(
-            {"user_id": user_id}
-        ).sort("created_at", -1).limit(limit)
-        
-        docs = await cursor.to_list(length=limit)
-        return [Recording(**doc) for doc in docs]
+    async def get_user_recordings(self, user_id: str, limit: int = 20,
+                                  after: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+        """Get a page of user's recordings and the cursor of the next page."""
+        return await self._list_page(self.recordings, user_id, "created_at", RECORDING_LIST_FIELDS, limit, after)
 
 
 # Global database instance
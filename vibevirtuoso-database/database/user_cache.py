@@ -0,0 +1,177 @@
+"""
+In-memory TTL + LRU cache of users for token authentication.
+
+Every authenticated request used to do a find_one plus a User model build.
+Users are cached by username (the JWT subject) for USER_CACHE_TTL_SECONDS,
+keeping at most USER_CACHE_MAX_ENTRIES (least recently used go first).
+
+SimpleDB invalidates a user whenever it changes one (a login only updates
+last_login_at on the cached entry). Invalidation is O(1) through a
+user ID -> username index. A lookup started before that user was
+invalidated is not cached, so a slow read cannot put a stale user back;
+invalidating one user does not drop reads in flight for others.
+
+Tokens that carry their own claims are checked against a second, smaller
+cache keyed by user ID: the user's is_active flag and claims_changed_at
+(stored on the user document, so every worker and restart sees it). The
+cache is per process, so a change made through another worker takes
+effect here within USER_CACHE_TTL_SECONDS.
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, NamedTuple, Optional
+
+from .config import db_config
+from .models.user_simple import User
+
+
+class ClaimsState(NamedTuple):
+    """What a token's claims are checked against."""
+    is_active: bool
+    changed_at: float  # Epoch seconds of the last claims change (0 if never)
+
+    @classmethod
+    def from_doc(cls, doc: dict) -> "ClaimsState":
+        changed = doc.get("claims_changed_at")
+        changed_at = changed.replace(tzinfo=timezone.utc).timestamp() if isinstance(changed, datetime) else 0.0
+        return cls(doc.get("is_active", True), changed_at)
+
+
+class UserCache:
+    """TTL + LRU cache of User documents keyed by username."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # username -> (user, expires_at)
+        self._usernames = {}  # user ID -> username of its entry in _entries
+        self._claims: "OrderedDict[str, tuple]" = OrderedDict()  # user ID -> (ClaimsState, expires_at)
+        self._generation = 0  # Bumped by every invalidation
+        self._invalidated: "OrderedDict[str, int]" = OrderedDict()  # user ID -> generation of its last invalidation
+        self._forgotten_before = 0  # Invalidations older than this were trimmed from _invalidated
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evicted = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def generation(self) -> int:
+        """Take before a database read; pass to put() so a read that raced an invalidation is dropped."""
+        return self._generation
+
+    def _stale_locked(self, user_id: str, generation: Optional[int]) -> bool:
+        """True if ``user_id`` was invalidated after ``generation`` was taken."""
+        if generation is None:
+            return False
+        if generation < self._forgotten_before:
+            return True  # Too old to tell; don't risk it
+        return self._invalidated.get(user_id, -1) > generation
+
+    def _remove_locked(self, entries: OrderedDict, key: str):
+        value, _ = entries.pop(key)
+        if entries is self._entries and self._usernames.get(str(value.id)) == key:
+            del self._usernames[str(value.id)]
+
+    def _get(self, entries: OrderedDict, key: str):
+        with self._lock:
+            entry = entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove_locked(entries, key)
+                self.expired += 1
+                self.misses += 1
+                return None
+            entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def _put(self, entries: OrderedDict, key: str, value, user_id: str, generation: Optional[int]):
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._stale_locked(user_id, generation):
+                return  # This user changed while it was being read
+            entries[key] = (value, time.monotonic() + self.ttl_seconds)
+            entries.move_to_end(key)
+            if entries is self._entries:
+                self._usernames[user_id] = key
+            while len(entries) > self.max_entries:
+                self._remove_locked(entries, next(iter(entries)))
+                self.evicted += 1
+
+    def get(self, username: str) -> Optional[User]:
+        return self._get(self._entries, username)
+
+    def put(self, username: str, user: User, generation: Optional[int] = None):
+        self._put(self._entries, username, user, str(user.id), generation)
+
+    def get_claims(self, user_id: str) -> Optional[ClaimsState]:
+        return self._get(self._claims, user_id)
+
+    def put_claims(self, user_id: str, state: ClaimsState, generation: Optional[int] = None):
+        self._put(self._claims, user_id, state, user_id, generation)
+
+    def update(self, user_id: str, **fields: Any):
+        """Change fields of a cached user in place (for writes that do not affect auth, e.g. last_login_at)."""
+        with self._lock:
+            username = self._usernames.get(user_id)
+            if username is None:
+                return
+            user, expires_at = self._entries[username]
+            self._entries[username] = (user.model_copy(update=fields), expires_at)
+
+    def invalidate(self, user_id: str, username: Optional[str] = None):
+        """Drop a user after it changed (by ID, and by username when known)."""
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+            self._invalidated[user_id] = self._generation
+            self._invalidated.move_to_end(user_id)
+            while len(self._invalidated) > self.max_entries:
+                _, generation = self._invalidated.popitem(last=False)
+                self._forgotten_before = generation
+
+            cached_username = self._usernames.get(user_id)
+            if cached_username is not None:
+                self._remove_locked(self._entries, cached_username)
+            if username is not None and username.lower() in self._entries:
+                self._remove_locked(self._entries, username.lower())
+            self._claims.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._usernames.clear()
+            self._claims.clear()
+            self._invalidated.clear()
+            self._generation += 1
+            self._forgotten_before = self._generation
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "claims_size": len(self._claims),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "invalidations": self.invalidations,
+        }
+
+
+# Global user cache
+user_cache = UserCache(db_config.user_cache_ttl_seconds, db_config.user_cache_max_entries)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Login throughput load test.
+
+Default mode runs the password hasher in-process: for 1, 2, 4 ... up to
+the number of cores it verifies --logins passwords concurrently and
+reports logins/s and the worst event-loop stall. Throughput should grow
+with the worker count while the stall stays near zero.
+
+With --url it instead fires concurrent /login requests at a running
+server (start it with different PASSWORD_WORKERS values to compare).
+"""
+import argparse
+import asyncio
+import os
+import time
+import uuid
+
+from password_hashing import PasswordConfig, PasswordHasher
+
+PASSWORD = "load-test-password"
+
+
+async def _loop_stall(stop: asyncio.Event) -> float:
+    """Largest delay seen by a 10 ms ticker while the test runs."""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        worst = max(worst, time.perf_counter() - start - 0.01)
+    return worst
+
+
+async def run_in_process(workers: int, logins: int, rounds: int) -> dict:
+    hasher = PasswordHasher(PasswordConfig(password_workers=workers, bcrypt_rounds=rounds,
+                                           password_max_concurrency=logins, password_queue_timeout=3600))
+    hashed = await hasher.hash(PASSWORD)
+
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_loop_stall(stop))
+    start = time.perf_counter()
+    results = await asyncio.gather(*(hasher.verify(PASSWORD, hashed) for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    stall = await ticker
+    hasher.shutdown()
+
+    assert all(results)
+    return {"logins_per_second": logins / elapsed, "stall_ms": 1000 * stall,
+            "verify_ms": hasher.stats()["verify"]["avg_ms"]}
+
+
+async def run_http(url: str, logins: int, concurrency: int) -> dict:
+    import aiohttp
+
+    username = f"load_{uuid.uuid4().hex[:8]}"
+    async with aiohttp.ClientSession() as session:
+        await session.post(f"{url}/register", json={"username": username, "email": f"{username}@example.com",
+                                                    "password": PASSWORD})
+        limit = asyncio.Semaphore(concurrency)
+
+        async def login():
+            async with limit:
+                async with session.post(f"{url}/login", json={"username": username, "password": PASSWORD}) as r:
+                    return r.status
+
+        start = time.perf_counter()
+        statuses = await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - start
+        async with session.get(f"{url}/metrics") as r:
+            metrics = await r.json()
+
+    return {"logins_per_second": logins / elapsed, "ok": statuses.count(200), "errors": len(statuses) - statuses.count(200),
+            "metrics": metrics.get("password_hashing", {})}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost (in-process mode)")
+    parser.add_argument("--url", help="test a running server instead, e.g. http://127.0.0.1:8001")
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent requests (--url mode)")
+    args = parser.parse_args()
+
+    if args.url:
+        print(f"📊 {args.logins} logins against {args.url} ({args.concurrency} at a time)")
+        result = asyncio.run(run_http(args.url, args.logins, args.concurrency))
+        print(f"   {result['logins_per_second']:.1f} logins/s, {result['ok']} ok, {result['errors']} errors")
+        print(f"   server: {result['metrics']}")
+        return
+
+    cores = os.cpu_count() or 1
+    counts = sorted({1, cores} | {2 ** i for i in range(cores.bit_length()) if 2 ** i <= cores})
+    print(f"📊 {args.logins} concurrent logins, bcrypt cost {args.rounds}, {cores} cores")
+    print(f"{'workers':>8} {'logins/s':>10} {'speedup':>8} {'verify ms':>10} {'loop stall ms':>14}")
+    baseline = None
+    for workers in counts:
+        result = asyncio.run(run_in_process(workers, args.logins, args.rounds))
+        baseline = baseline or result["logins_per_second"]
+        print(f"{workers:>8} {result['logins_per_second']:>10.1f} {result['logins_per_second'] / baseline:>7.2f}x "
+              f"{result['verify_ms']:>10.1f} {result['stall_ms']:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Password hashing off the event loop.
+
+bcrypt is deliberately slow (~100-300 ms per call at cost 12). Calling it
+inside an async handler blocks uvicorn's single event loop for that long,
+so a burst of logins stalls every other request. PasswordHasher runs
+hashpw/checkpw on a bounded executor instead:
+
+- a thread pool by default: bcrypt releases the GIL while hashing, so
+  threads use every core; set PASSWORD_EXECUTOR=process to use processes
+- at most PASSWORD_MAX_CONCURRENCY calls in flight; the rest wait, and a
+  call that waits longer than PASSWORD_QUEUE_TIMEOUT seconds raises
+  PasswordHasherBusy (the API answers 503)
+- new hashes use BCRYPT_ROUNDS; stored hashes keep their own cost, and
+  needs_rehash() tells when one is weaker than configured
+
+Queue wait and hash time are recorded for /metrics.
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+import bcrypt
+from pydantic import Field
+from pydantic_settings import BaseSettings
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordConfig(BaseSettings):
+    """Password hashing settings."""
+
+    bcrypt_rounds: int = Field(default=12, ge=4, le=31, env="BCRYPT_ROUNDS",
+                               description="bcrypt cost factor for new hashes")
+    password_workers: int = Field(default=os.cpu_count() or 1, ge=1, env="PASSWORD_WORKERS",
+                                  description="Executor size")
+    password_executor: str = Field(default="thread", env="PASSWORD_EXECUTOR",
+                                   description="thread or process")
+    password_max_concurrency: int = Field(default=0, ge=0, env="PASSWORD_MAX_CONCURRENCY",
+                                          description="Calls in flight (0 = 2 x workers)")
+    password_queue_timeout: float = Field(default=5.0, gt=0, env="PASSWORD_QUEUE_TIMEOUT",
+                                          description="Max seconds to wait for a slot")
+
+    model_config = {
+        "env_file": ".env",
+        "case_sensitive": False,
+        "extra": "ignore"
+    }
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when a call waits longer than the queue timeout."""
+
+
+def _timed_hashpw(password: bytes, rounds: int):
+    start = time.perf_counter()
+    hashed = bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+    return hashed, time.perf_counter() - start
+
+
+def _timed_checkpw(password: bytes, hashed: bytes):
+    start = time.perf_counter()
+    matches = bcrypt.checkpw(password, hashed)
+    return matches, time.perf_counter() - start
+
+
+class _Timings:
+    """Count, mean, max and p95 over a window of recent samples."""
+
+    def __init__(self, window: int = 1000):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float):
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def summary(self) -> dict:
+        recent = sorted(self.samples)
+        return {
+            "count": self.count,
+            "avg_ms": round(1000 * self.total / self.count, 2) if self.count else 0.0,
+            "p95_ms": round(1000 * recent[int(0.95 * (len(recent) - 1))], 2) if recent else 0.0,
+            "max_ms": round(1000 * self.max, 2),
+        }
+
+
+class PasswordHasher:
+    """Runs bcrypt on a bounded executor with a concurrency limit."""
+
+    def __init__(self, config: Optional[PasswordConfig] = None):
+        self.config = config or PasswordConfig()
+        self.max_concurrency = self.config.password_max_concurrency or 2 * self.config.password_workers
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.waiting = 0
+        self.in_flight = 0
+        self.rejected = 0
+        self.queue_wait = _Timings()
+        self.hash_time = _Timings()
+        self.verify_time = _Timings()
+
+    def start(self):
+        if self._executor is not None:
+            return
+        if self.config.password_executor == "process":
+            self._executor = ProcessPoolExecutor(max_workers=self.config.password_workers)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=self.config.password_workers,
+                                                thread_name_prefix="bcrypt")
+        logger.info(f"🔐 Password hashing on {self.config.password_workers} "
+                    f"{self.config.password_executor} workers (cost {self.config.bcrypt_rounds})")
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _run(self, fn, *args):
+        self.start()
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        queued = time.perf_counter()
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.config.password_queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise PasswordHasherBusy("Too many password operations in progress")
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        try:
+            value, seconds = await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+            # Everything but the bcrypt call itself (slot, executor worker) counts as queue wait
+            self.queue_wait.add(max(0.0, time.perf_counter() - queued - seconds))
+            return value, seconds
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    async def hash(self, password: str) -> str:
+        hashed, seconds = await self._run(_timed_hashpw, password.encode('utf-8'), self.config.bcrypt_rounds)
+        self.hash_time.add(seconds)
+        return hashed.decode('utf-8')
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        matches, seconds = await self._run(_timed_checkpw, password.encode('utf-8'),
+                                           hashed_password.encode('utf-8'))
+        self.verify_time.add(seconds)
+        return matches
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """True if the stored hash uses a lower cost than BCRYPT_ROUNDS ($2b$<cost>$...)."""
+        try:
+            return int(hashed_password.split("$")[2]) < self.config.bcrypt_rounds
+        except (IndexError, ValueError):
+            return True
+
+    def stats(self) -> dict:
+        return {
+            "executor": self.config.password_executor,
+            "workers": self.config.password_workers,
+            "bcrypt_rounds": self.config.bcrypt_rounds,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+            "queue_wait": self.queue_wait.summary(),
+            "hash": self.hash_time.summary(),
+            "verify": self.verify_time.summary(),
+        }
+
+
+# Global password hasher
+password_hasher = PasswordHasher()